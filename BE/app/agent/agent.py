@@ -8,93 +8,11 @@ from pathlib import Path
 from typing import Dict, List, Tuple
 from collections import defaultdict
 from schema.response import KeyframeServiceReponse
+from common.coco import COCO_CLASS
 import os
 from llama_index.core.llms import ChatMessage, ImageBlock, TextBlock, MessageRole
 
 
-COCO_CLASS = """
-person
-bicycle
-car
-motorcycle
-airplane
-bus
-train
-truck
-boat
-traffic light
-fire hydrant
-stop sign
-parking meter
-bench
-bird
-cat
-dog
-horse
-sheep
-cow
-elephant
-bear
-zebra
-giraffe
-backpack
-umbrella
-handbag
-tie
-suitcase
-frisbee
-skis
-snowboard
-sports ball
-kite
-baseball bat
-baseball glove
-skateboard
-surfboard
-tennis racket
-bottle
-wine glass
-cup
-fork
-knife
-spoon
-bowl
-banana
-apple
-sandwich
-orange
-broccoli
-carrot
-hot dog
-pizza
-donut
-cake
-chair
-couch
-potted plant
-bed
-dining table
-toilet
-tv
-laptop
-mouse
-remote
-keyboard
-cell phone
-microwave
-oven
-toaster
-sink
-refrigerator
-book
-clock
-vase
-scissors
-teddy bear
-hair drier
-toothbrush
-"""
-
 class VisualEventExtractor:
     
     def __init__(self, llm: LLM):
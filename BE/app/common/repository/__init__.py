@@ -1 +1 @@
-from .base import MilvusBaseRepository, MongoBaseRepository
\ No newline at end of file
+from .base import MilvusBaseRepository, MongoBaseRepository, VectorBaseRepository
\ No newline at end of file
@@ -1,17 +1,21 @@
 from typing import TypeVar, Any, Generic, Type, List, Optional
 from abc import ABC, abstractmethod
+import asyncio
 from beanie import Document 
 import torch
 import numpy as np
 from pydantic import BaseModel, Field
 from pymilvus import connections
 from pymilvus import Collection as MilvusCollection
+from index import IdBitmap
 
 
 
 
 
 BeanieDocument = TypeVar('BeanieDocument', bound=Document)
+RAW_BATCH_SIZE = 1000
+
 class MongoBaseRepository(Generic[BeanieDocument]):
     def __init__(self, collection: Type[BeanieDocument]):
         self.collection = collection
@@ -23,6 +27,27 @@ class MongoBaseRepository(Generic[BeanieDocument]):
         return await self.collection.find(*args, **kwargs).to_list(length=None)
     
 
+    def raw_collection(self):
+        """
+        The driver-level collection behind the Beanie document (Beanie 2 names it pymongo, 1.x motor)
+        """
+        getter = getattr(self.collection, "get_pymongo_collection", None) or self.collection.get_motor_collection
+        return getter()
+
+    async def find_raw(
+        self,
+        filter: dict[str, Any],
+        projection: dict[str, Any],
+        limit: int = 0,
+        batch_size: int = RAW_BATCH_SIZE
+    ) -> list[dict[str, Any]]:
+        """
+        Projected find straight on the driver cursor, skipping Beanie document validation.
+        Returns plain dicts holding only the projected fields.
+        """
+        cursor = self.raw_collection().find(filter, projection, limit=limit, batch_size=batch_size)
+        return await cursor.to_list(length=None)
+
     async def find_pipeline(self, pipeline: list[dict[str, Any]]) -> list[BeanieDocument]:
         """
         Find documents using an aggregation pipeline.
@@ -42,7 +67,44 @@ class MongoBaseRepository(Generic[BeanieDocument]):
 
 
 
-class MilvusBaseRepository(ABC):
+class VectorBaseRepository(ABC):
+    """
+    Contract shared by every vector search backend (Milvus, usearch, FAISS, ...)
+    """
+    supports_scalar_filter: bool = False
+
+    @abstractmethod
+    async def search_by_embedding(self, request: Any) -> Any:
+        """
+        Search the top_k nearest keyframes of request.embedding, returns a MilvusSearchResponse
+        """
+
+    async def search_by_embeddings(self, requests: list[Any]) -> list[Any]:
+        """
+        Answer several search requests, backends that support multi-vector search override this
+        """
+        return list(await asyncio.gather(*[self.search_by_embedding(request) for request in requests]))
+
+    @abstractmethod
+    def get_all_id(self) -> IdBitmap:
+        """
+        All keyframe ids stored in the index, as a run-compressed IdBitmap that is never expanded into a list
+        """
+
+    @property
+    def num_entities(self) -> int:
+        """
+        Number of stored vectors, backends override this with a cheaper count
+        """
+        return len(self.get_all_id())
+
+    def refresh_stats(self):
+        """
+        Drop cached collection statistics, called after new vectors are ingested
+        """
+
+
+class MilvusBaseRepository(VectorBaseRepository):
     
     def __init__(
         self,
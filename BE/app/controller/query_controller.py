@@ -1,4 +1,6 @@
 from pathlib import Path
+from typing import Awaitable, Callable
+import asyncio
 import json
 
 import os
@@ -11,8 +13,10 @@ ROOT_DIR = os.path.abspath(
 
 sys.path.insert(0, ROOT_DIR)
 
-from service import ModelService, KeyframeQueryService
-from schema.response import KeyframeServiceReponse
+from service import ModelService, KeyframeQueryService, EmbeddingBatcher
+from index import KeyframeTable, VideoIntervalIndex
+from schema.response import KeyframeServiceReponse, HybridPlanReport
+from schema.interface import KeyframeScalarFilter
 
 
 class QueryController:
@@ -22,12 +26,86 @@ class QueryController:
         data_folder: Path,
         id2index_path: Path,
         model_service: ModelService,
-        keyframe_service: KeyframeQueryService
+        keyframe_service: KeyframeQueryService,
+        embedding_batcher: EmbeddingBatcher | None = None,
+        ocr_text_encoder=None,  # OcrTextEncoder, embeds ocr_query for semantic OCR search
     ):
         self.data_folder = data_folder
-        self.id2index = json.load(open(id2index_path, 'r'))
+        self.id2index_path = id2index_path
+        # Reloads may only read mapping files next to the one configured at startup
+        self.mapping_dir = Path(id2index_path).resolve().parent
         self.model_service = model_service
         self.keyframe_service = keyframe_service
+        self.embedding_batcher = embedding_batcher or EmbeddingBatcher(model_service)
+        self.ocr_text_encoder = ocr_text_encoder
+        self._reload_lock = asyncio.Lock()
+        self._reload_hooks: list[Callable[[], Awaitable[None]]] = []
+        self.set_keyframe_table(self._load_keyframe_table(id2index_path))
+
+
+    @staticmethod
+    def _load_keyframe_table(id2index_path: Path) -> KeyframeTable:
+        with open(id2index_path, 'r') as f:
+            return KeyframeTable.from_id2index(json.load(f))
+
+
+    def set_keyframe_table(self, keyframe_table: KeyframeTable) -> VideoIntervalIndex:
+        """
+        Publish a keyframe table (and the interval index derived from it) to the controller and the service
+        """
+        video_index = VideoIntervalIndex.from_keyframe_table(keyframe_table)
+        self.keyframe_table = keyframe_table
+        self.video_index = video_index
+        self.keyframe_service.keyframe_table = keyframe_table
+        return video_index
+
+
+    def add_reload_hook(self, hook: Callable[[], Awaitable[None]]):
+        """
+        Await hook() on every mapping reload, after the new table is published and still under the reload lock,
+        to bring the indexes derived from the keyframes (OCR, object counts) up to date with it
+        """
+        if hook not in self._reload_hooks:
+            self._reload_hooks.append(hook)
+
+
+    def _resolve_mapping_path(self, id2index_path: Path | str) -> Path:
+        """
+        id2index_path resolved inside mapping_dir (relative paths are taken from it), PermissionError for
+        anything else than a .json file there
+        """
+        path = (self.mapping_dir / id2index_path).resolve()
+        if path.parent != self.mapping_dir or path.suffix != ".json":
+            raise PermissionError(f"{id2index_path} is not a .json file in {self.mapping_dir}")
+        return path
+
+
+    async def reload_mapping(self, id2index_path: Path | str | None = None) -> VideoIntervalIndex:
+        """
+        Re-read the id2index mapping and swap it in. The new table is fully built off the event loop
+        before plain attribute assignments publish it, so in-flight requests keep the old one.
+        id2index_path must name a .json file in the directory of the startup mapping.
+        """
+        async with self._reload_lock:
+            path = self._resolve_mapping_path(id2index_path) if id2index_path is not None else self.id2index_path
+            keyframe_table = await asyncio.to_thread(self._load_keyframe_table, path)
+            # A new mapping means new vectors were ingested, re-read the cached collection statistics
+            await asyncio.to_thread(self.keyframe_service.keyframe_vector_repo.refresh_stats)
+            self.id2index_path = path
+            video_index = self.set_keyframe_table(keyframe_table)
+            for hook in self._reload_hooks:
+                await hook()
+            return video_index
+
+
+    async def _embed(self, query: str) -> list[float]:
+        embedding = await self.embedding_batcher.embed(query)
+        return embedding.tolist()[0]
+
+
+    async def _embed_ocr(self, ocr_query: str) -> list[float]:
+        embedding = await asyncio.to_thread(self.ocr_text_encoder.encode, [ocr_query])
+        return embedding.tolist()[0]
 
 
     def convert_model_to_path(
@@ -37,18 +115,31 @@ class QueryController:
         return os.path.join(self.data_folder, f"Keyframes_L{model.group_num:02d}/L{model.group_num:02d}_V{model.video_num:03d}/{model.keyframe_num:03d}.jpg"), model.confidence_score
 
 
+
     async def search_text(
         self,
         query: str,
         top_k: int,
         score_threshold: float
     ):
-        embedding = self.model_service.embedding(query).tolist()[0]
+        embedding = await self._embed(query)
 
         result = await self.keyframe_service.search_by_text(embedding, top_k, score_threshold)
         return result
 
 
+    async def search_text_batch(
+        self,
+        queries: list[str],
+        top_ks: list[int],
+        score_thresholds: list[float]
+    ) -> list[list[KeyframeServiceReponse]]:
+        embeddings = await self.embedding_batcher.embed_many(queries)
+
+        result = await self.keyframe_service.search_by_text_batch(embeddings.tolist(), top_ks, score_thresholds)
+        return result
+
+
     async def search_text_with_exlude_group(
         self,
         query: str,
@@ -56,15 +147,19 @@ class QueryController:
         score_threshold: float,
         list_group_exlude: list[int]
     ):
-        exclude_ids = [
-            int(k) for k, v in self.id2index.items()
-            if int(v.split('/')[0]) in list_group_exlude
-        ]
+        embedding = await self._embed(query)
 
+        if self.keyframe_service.supports_scalar_filter:
+            scalar_filter = KeyframeScalarFilter(exclude_groups=list_group_exlude)
+            return await self.keyframe_service.search_by_text_scalar_filter(embedding, top_k, score_threshold, scalar_filter)
 
+        if len(list_group_exlude) == 0:
+            return await self.keyframe_service.search_by_text(embedding, top_k, score_threshold)
 
-        embedding = self.model_service.embedding(query).tolist()[0]
-        result = await self.keyframe_service.search_by_text_exclude_ids(embedding, top_k, score_threshold, exclude_ids)
+        # Everything outside the excluded groups, as run containers instead of a list of excluded ids.
+        # Only ids present in the mapping belong to a group, ids missing from it are not searched.
+        id_filter = self.video_index.matching_bitmap(groups=list_group_exlude, invert=True)
+        result = await self.keyframe_service.search_by_text_id_filter(embedding, top_k, score_threshold, id_filter)
         return result
 
 
@@ -76,49 +171,39 @@ class QueryController:
         list_of_include_groups: list[int]  ,
         list_of_include_videos: list[int]
     ):
+        embedding = await self._embed(query)
+
+        if self.keyframe_service.supports_scalar_filter:
+            scalar_filter = KeyframeScalarFilter(
+                include_groups=list_of_include_groups,
+                include_videos=list_of_include_videos
+            )
+            return await self.keyframe_service.search_by_text_scalar_filter(embedding, top_k, score_threshold, scalar_filter)
 
+        if len(list_of_include_groups) == 0 and len(list_of_include_videos) == 0:
+            return await self.keyframe_service.search_by_text(embedding, top_k, score_threshold)
 
-        exclude_ids = None
-        if len(list_of_include_groups) > 0   and len(list_of_include_videos) == 0:
-            print("hi")
-            exclude_ids = [
-                int(k) for k, v in self.id2index.items()
-                if int(v.split('/')[0]) not in list_of_include_groups
-            ]
-
-        elif len(list_of_include_groups) == 0   and len(list_of_include_videos) >0 :
-            exclude_ids = [
-                int(k) for k, v in self.id2index.items()
-                if int(v.split('/')[1]) not in list_of_include_videos
-            ]
-
-        elif len(list_of_include_groups) == 0  and len(list_of_include_videos) == 0 :
-            exclude_ids = []
-        else:
-            exclude_ids = [
-                int(k) for k, v in self.id2index.items()
-                if (
-                    int(v.split('/')[0]) not in list_of_include_groups or
-                    int(v.split('/')[1]) not in list_of_include_videos
-                )
-            ]
-
-
-        embedding = self.model_service.embedding(query).tolist()[0]
-        result = await self.keyframe_service.search_by_text_exclude_ids(embedding, top_k, score_threshold, exclude_ids)
+        # Built from the mapping, so ids missing from it are not searched
+        id_filter = self.video_index.matching_bitmap(
+            groups=list_of_include_groups or None,
+            videos=list_of_include_videos or None
+        )
+        result = await self.keyframe_service.search_by_text_id_filter(embedding, top_k, score_threshold, id_filter)
         return result
 
     async def search_by_metadata_only(
         self,
         ocr_query: str,
         top_k: int = 10,
-        case_sensitive: bool = False
+        case_sensitive: bool = False,
+        fuzzy: bool = False
     ) -> list[KeyframeServiceReponse]:
         """Search keyframes by OCR metadata only"""
         result = await self.keyframe_service.search_by_metadata_only(
             ocr_query=ocr_query,
             top_k=top_k,
-            case_sensitive=case_sensitive
+            case_sensitive=case_sensitive,
+            fuzzy=fuzzy
         )
         return result
 
@@ -131,24 +216,35 @@ class QueryController:
         score_threshold: float | None = 0.5,
         embedding_weight: float = 0.7,
         metadata_weight: float = 0.3,
-        case_sensitive: bool = False
-    ) -> list[KeyframeServiceReponse]:
-        """Enhanced hybrid search combining text embedding, OCR metadata, and object detection"""
+        case_sensitive: bool = False,
+        fuzzy: bool = False,
+        semantic_ocr: bool = False
+    ) -> tuple[list[KeyframeServiceReponse], HybridPlanReport]:
+        """Enhanced hybrid search combining text embedding, OCR metadata, and object detection, with its plan"""
         
-        # Only generate embedding if query is provided
-        text_embedding = None
+        # Only generate embedding if query is provided. ocr_query goes through the multilingual OCR encoder,
+        # concurrently with the CLIP query
+        encodings = {}
         if query and query.strip():
-            text_embedding = self.model_service.embedding(query).tolist()[0]
+            encodings["query"] = self._embed(query)
+        if (
+            semantic_ocr and ocr_query and ocr_query.strip()
+            and self.ocr_text_encoder is not None and self.keyframe_service.supports_semantic_ocr
+        ):
+            encodings["ocr_query"] = self._embed_ocr(ocr_query)
+        embeddings = dict(zip(encodings, await asyncio.gather(*encodings.values())))
         
         result = await self.keyframe_service.search_by_hybrid(
-            text_embedding=text_embedding,
+            text_embedding=embeddings.get("query"),
             ocr_query=ocr_query,
             object_filters=object_filters,
             top_k=top_k,
             score_threshold=score_threshold,
             embedding_weight=embedding_weight,
             metadata_weight=metadata_weight,
-            case_sensitive=case_sensitive
+            case_sensitive=case_sensitive,
+            fuzzy=fuzzy,
+            ocr_embedding=embeddings.get("ocr_query")
         )
         return result
 
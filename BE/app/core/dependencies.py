@@ -2,7 +2,6 @@
 from pathlib import Path
 from fastapi import Depends, Request, HTTPException
 from functools import lru_cache
-import json
 
 import os
 import sys
@@ -178,40 +177,19 @@ def get_milvus_repository(service_factory: ServiceFactory = Depends(get_service_
         )
 
 
-def get_query_controller(
-    model_service: ModelService = Depends(get_model_service),
-    keyframe_service: KeyframeQueryService = Depends(get_keyframe_service),
-    app_settings: AppSettings = Depends(get_app_settings)
-) -> QueryController:
-    """Get query controller instance"""
+def get_query_controller(service_factory: ServiceFactory = Depends(get_service_factory)) -> QueryController:
+    """Get the shared query controller from ServiceFactory"""
     try:
-        logger.info("Creating query controller...")
-
-        data_folder = Path(app_settings.DATA_FOLDER)
-        id2index_path = Path(app_settings.ID2INDEX_PATH)
-
-        if not data_folder.exists():
-            logger.warning(f"Data folder does not exist: {data_folder}")
-            data_folder.mkdir(parents=True, exist_ok=True)
-
-        if not id2index_path.exists():
-            logger.warning(f"ID2Index file does not exist: {id2index_path}")
-            id2index_path.parent.mkdir(parents=True, exist_ok=True)
-            with open(id2index_path, 'w') as f:
-                json.dump({}, f)
-
-        controller = QueryController(
-            data_folder=data_folder,
-            id2index_path=id2index_path,
-            model_service=model_service,
-            keyframe_service=keyframe_service
-        )
-
-        logger.info("Query controller created successfully")
+        controller = service_factory.get_query_controller()
+        if controller is None:
+            logger.error("Query controller not available from factory")
+            raise HTTPException(
+                status_code=503,
+                detail="Query controller not available"
+            )
         return controller
-
     except Exception as e:
-        logger.error(f"Failed to create query controller: {str(e)}")
+        logger.error(f"Failed to get query controller: {str(e)}")
         raise HTTPException(
             status_code=503,
             detail=f"Query controller initialization failed: {str(e)}"
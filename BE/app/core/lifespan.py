@@ -15,7 +15,7 @@ ROOT_DIR = os.path.abspath(
 sys.path.insert(0, ROOT_DIR)
 
 
-from core.settings import MongoDBSettings, KeyFrameIndexMilvusSetting, AppSettings
+from core.settings import MongoDBSettings, KeyFrameIndexMilvusSetting, AppSettings, IndexPathSettings
 from models.keyframe import Keyframe
 from factory.factory import ServiceFactory
 from core.logger import SimpleLogger
@@ -36,6 +36,7 @@ async def lifespan(app: FastAPI):
         mongo_settings = MongoDBSettings()
         milvus_settings = KeyFrameIndexMilvusSetting()
         appsetting = AppSettings()
+        index_path_settings = IndexPathSettings()
         global mongo_client
         mongo_connection_string = (
             f"mongodb://{mongo_settings.MONGO_USER}:{mongo_settings.MONGO_PASSWORD}"
@@ -67,10 +68,43 @@ async def lifespan(app: FastAPI):
             milvus_user="",  
             milvus_password="",  
             milvus_search_params=milvus_search_params,
+            milvus_pool_size=milvus_settings.CONNECTION_POOL_SIZE,
+            milvus_stats_ttl_s=milvus_settings.STATS_TTL_S,
             model_name=appsetting.MODEL_NAME,
+            embedding_cache_size=appsetting.EMBEDDING_CACHE_SIZE,
+            text_encoder_backend=appsetting.TEXT_ENCODER_BACKEND,
+            onnx_text_encoder_path=appsetting.ONNX_TEXT_ENCODER_PATH,
+            embedding_batch_size=appsetting.EMBEDDING_BATCH_SIZE,
+            embedding_batch_wait_ms=appsetting.EMBEDDING_BATCH_WAIT_MS,
+            encoder_executor=appsetting.ENCODER_EXECUTOR,
+            encoder_workers=appsetting.ENCODER_WORKERS,
+            encoder_queue_size=appsetting.ENCODER_QUEUE_SIZE,
+            oversample_budget_ms=appsetting.OVERSAMPLE_BUDGET_MS,
+            data_folder=appsetting.DATA_FOLDER,
+            id2index_path=appsetting.ID2INDEX_PATH,
+            vector_backend=index_path_settings.VECTOR_BACKEND,
+            usearch_index_path=index_path_settings.USEARCH_INDEX_PATH,
+            faiss_index_path=index_path_settings.FAISS_INDEX_PATH,
+            numpy_embedding_path=index_path_settings.NUMPY_EMBEDDING_PATH,
+            numpy_search_threads=index_path_settings.NUMPY_SEARCH_THREADS,
+            ocr_vector_backend=index_path_settings.OCR_VECTOR_BACKEND,
+            ocr_collection_name=milvus_settings.OCR_COLLECTION_NAME,
+            ocr_index_path=index_path_settings.OCR_INDEX_PATH,
+            ocr_line_keys_path=index_path_settings.OCR_LINE_KEYS_PATH,
+            ocr_text_model=appsetting.OCR_TEXT_MODEL,
             mongo_collection=Keyframe
         )
         logger.info("Service factory initialized successfully")
+
+        if appsetting.KEYFRAME_TABLE_SOURCE == "mongo":
+            await service_factory.load_keyframe_table_from_mongo()
+        elif appsetting.KEYFRAME_TABLE_SOURCE != "mapping":
+            raise ValueError(f"Unknown keyframe table source: {appsetting.KEYFRAME_TABLE_SOURCE}")
+
+        if appsetting.OCR_INDEX_ENABLED:
+            await service_factory.load_ocr_index()
+        if appsetting.OBJECT_INDEX_ENABLED:
+            await service_factory.load_object_index()
         
         app.state.service_factory = service_factory
         app.state.mongo_client = mongo_client
@@ -87,6 +121,10 @@ async def lifespan(app: FastAPI):
     logger.info("Shutting down application...")
     
     try:
+        if service_factory:
+            service_factory.shutdown()
+            logger.info("Service factory shut down")
+
         if mongo_client:
             mongo_client.close()
             logger.info("MongoDB connection closed")
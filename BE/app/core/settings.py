@@ -13,21 +13,46 @@ class MongoDBSettings(BaseSettings):
 
 
 class IndexPathSettings(BaseSettings):
-    FAISS_INDEX_PATH: str | None
-    USEARCH_INDEX_PATH: str | None
+    VECTOR_BACKEND: str = "milvus"  # milvus | usearch | faiss | numpy
+    FAISS_INDEX_PATH: str | None = None
+    USEARCH_INDEX_PATH: str | None = None
+    NUMPY_EMBEDDING_PATH: str | None = None
+    NUMPY_SEARCH_THREADS: int | None = None
+    # Embedded OCR lines, built by migration/ocr_embedding_migration.py
+    OCR_VECTOR_BACKEND: str | None = None  # milvus | usearch | faiss | numpy, None disables semantic OCR search
+    OCR_INDEX_PATH: str | None = None  # usearch/faiss index or .npy matrix of the local backends
+    OCR_LINE_KEYS_PATH: str | None = None
 
 class KeyFrameIndexMilvusSetting(BaseSettings):
     COLLECTION_NAME: str = "keyframe"
+    OCR_COLLECTION_NAME: str = "keyframe_ocr"
     HOST: str = 'localhost'
     PORT: str = '19530'
     METRIC_TYPE: str = 'COSINE'
     INDEX_TYPE: str = 'FLAT'
     BATCH_SIZE: int =10000
+    NUM_PARTITIONS: int = 16
+    CONNECTION_POOL_SIZE: int = 4
+    STATS_TTL_S: float = 60.0
     SEARCH_PARAMS: dict = {}
 
 class AppSettings(BaseSettings):
     DATA_FOLDER: str  = "/media/"
     ID2INDEX_PATH: str = "/media/lam/SEAGATE/archive/AIC25-Batch1/TestFolder/V1/mapping.json"
     MODEL_NAME: str = "ViT-B-32"
+    EMBEDDING_CACHE_SIZE: int = 4096
+    TEXT_ENCODER_BACKEND: str = "torch"  # torch | onnx
+    ONNX_TEXT_ENCODER_PATH: str | None = None
+    EMBEDDING_BATCH_SIZE: int = 32
+    EMBEDDING_BATCH_WAIT_MS: float = 5.0
+    ENCODER_EXECUTOR: str = "thread"  # thread | process
+    ENCODER_WORKERS: int = 1
+    ENCODER_QUEUE_SIZE: int = 64
+    KEYFRAME_TABLE_SOURCE: str = "mapping"  # mapping | mongo
+    OCR_INDEX_ENABLED: bool = True
+    OBJECT_INDEX_ENABLED: bool = True
+    OVERSAMPLE_BUDGET_MS: float = 200.0
+    # Multilingual sentence encoder of the OCR line collection (ocr_embedding_migration.py must use the same)
+    OCR_TEXT_MODEL: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2"
     FRAME2OBJECT: str = '/media/tinhanhnguyen/Data3/Projects/HCMAI2025_Baseline/app/data/detections.json'
     ASR_PATH: str = '/media/tinhanhnguyen/Data3/Projects/HCMAI2025_Baseline/app/data/asr_proc.json'
@@ -9,14 +9,24 @@ ROOT_DIR = os.path.abspath(
 sys.path.insert(0, ROOT_DIR)
 
 
+from pathlib import Path
+import asyncio
+import json
 
 from repository.mongo import KeyframeRepository
 from repository.milvus import KeyframeVectorRepository
-from service import KeyframeQueryService, ModelService
+from repository.local_index import USearchVectorRepository, FaissVectorRepository
+from repository.numpy_index import NumpyVectorRepository
+from repository.ocr_vector import OcrLineVectorRepository
+from service import KeyframeQueryService, ModelService, EmbeddingBatcher, EncoderExecutor
+from controller.query_controller import QueryController
+from index import KeyframeTable, ObjectCountMatrix, OcrBm25Index, OcrTrigramIndex, SymSpellIndex
 from models.keyframe import Keyframe
+from core.logger import SimpleLogger
 import open_clip
 from pymilvus import connections, Collection as MilvusCollection
 
+logger = SimpleLogger(__name__)
 
 class ServiceFactory:
     def __init__(
@@ -28,27 +38,128 @@ class ServiceFactory:
         milvus_password: str ,
         milvus_search_params: dict,
         model_name: str ,
+        data_folder: str,
+        id2index_path: str,
         milvus_db_name: str = "default",
         milvus_alias: str = "default",
+        milvus_pool_size: int = 1,
+        milvus_stats_ttl_s: float = 60.0,
+        vector_backend: str = "milvus",
+        usearch_index_path: str | None = None,
+        faiss_index_path: str | None = None,
+        numpy_embedding_path: str | None = None,
+        numpy_search_threads: int | None = None,
+        embedding_cache_size: int = 4096,
+        text_encoder_backend: str = "torch",
+        onnx_text_encoder_path: str | None = None,
+        embedding_batch_size: int = 32,
+        embedding_batch_wait_ms: float = 5.0,
+        encoder_executor: str = "thread",
+        encoder_workers: int = 1,
+        encoder_queue_size: int = 64,
+        oversample_budget_ms: float = 200.0,
+        ocr_vector_backend: str | None = None,
+        ocr_collection_name: str = "keyframe_ocr",
+        ocr_index_path: str | None = None,
+        ocr_line_keys_path: str | None = None,
+        ocr_text_model: str = "sentence-transformers/paraphrase-multilingual-MiniLM-L12-v2",
         mongo_collection=Keyframe,
     ):
         self._mongo_keyframe_repo = KeyframeRepository(collection=mongo_collection)
-        self._milvus_keyframe_repo = self._init_milvus_repo(
-            search_params=milvus_search_params,
-            collection_name=milvus_collection_name,
-            host=milvus_host,
-            port=milvus_port,
-            user=milvus_user,
-            password=milvus_password,
-            db_name=milvus_db_name,
-            alias=milvus_alias
-        )
 
-        self._model_service = self._init_model_service(model_name)
+        self._milvus_keyframe_repo = None
+        if vector_backend == "milvus":
+            self._milvus_keyframe_repo = self._init_milvus_repo(
+                search_params=milvus_search_params,
+                collection_name=milvus_collection_name,
+                host=milvus_host,
+                port=milvus_port,
+                user=milvus_user,
+                password=milvus_password,
+                db_name=milvus_db_name,
+                alias=milvus_alias,
+                pool_size=milvus_pool_size,
+                stats_ttl_s=milvus_stats_ttl_s
+            )
+            self._keyframe_vector_repo = self._milvus_keyframe_repo
+        else:
+            self._keyframe_vector_repo = self._init_local_vector_repo(
+                backend=vector_backend,
+                usearch_index_path=usearch_index_path,
+                faiss_index_path=faiss_index_path,
+                numpy_embedding_path=numpy_embedding_path,
+                numpy_search_threads=numpy_search_threads
+            )
+        logger.info(f"Vector backend: {vector_backend}")
+
+        # Second collection of embedded OCR lines, searched alongside the keyframes by semantic OCR queries
+        self._milvus_ocr_repo = None
+        self._ocr_vector_repo = None
+        self._ocr_text_encoder = None
+        if ocr_vector_backend is not None:
+            if not ocr_line_keys_path:
+                raise ValueError("OCR_LINE_KEYS_PATH must be set when OCR_VECTOR_BACKEND is set")
+            if ocr_vector_backend == "milvus":
+                self._milvus_ocr_repo = self._init_milvus_repo(
+                    search_params=milvus_search_params,
+                    collection_name=ocr_collection_name,
+                    host=milvus_host,
+                    port=milvus_port,
+                    user=milvus_user,
+                    password=milvus_password,
+                    db_name=milvus_db_name,
+                    alias=f"{milvus_alias}_ocr",
+                    pool_size=milvus_pool_size,
+                    stats_ttl_s=milvus_stats_ttl_s
+                )
+                line_repo = self._milvus_ocr_repo
+            else:
+                if not ocr_index_path:
+                    raise ValueError(f"OCR_INDEX_PATH must be set when OCR_VECTOR_BACKEND={ocr_vector_backend}")
+                line_repo = self._init_local_vector_repo(
+                    backend=ocr_vector_backend,
+                    usearch_index_path=ocr_index_path,
+                    faiss_index_path=ocr_index_path,
+                    numpy_embedding_path=ocr_index_path,
+                    numpy_search_threads=numpy_search_threads
+                )
+            self._ocr_vector_repo = OcrLineVectorRepository.from_path(line_repo, ocr_line_keys_path)
+            from service.ocr_text_encoder import OcrTextEncoder
+            self._ocr_text_encoder = OcrTextEncoder(ocr_text_model)
+            logger.info(
+                f"OCR vector backend: {ocr_vector_backend}, {len(self._ocr_vector_repo)} lines, "
+                f"encoder {ocr_text_model}"
+            )
+
+        self._model_service = self._init_model_service(
+            model_name,
+            embedding_cache_size,
+            text_encoder_backend=text_encoder_backend,
+            onnx_text_encoder_path=onnx_text_encoder_path
+        )
+        self._encoder_executor = EncoderExecutor(
+            model_service=self._model_service,
+            kind=encoder_executor,
+            max_workers=encoder_workers,
+            max_queue_size=encoder_queue_size
+        )
+        self._embedding_batcher = EmbeddingBatcher(
+            model_service=self._model_service,
+            max_batch_size=embedding_batch_size,
+            max_wait_ms=embedding_batch_wait_ms,
+            encoder=self._encoder_executor
+        )
 
         self._keyframe_query_service = KeyframeQueryService(
             keyframe_mongo_repo=self._mongo_keyframe_repo,
-            keyframe_vector_repo=self._milvus_keyframe_repo
+            keyframe_vector_repo=self._keyframe_vector_repo,
+            ocr_vector_repo=self._ocr_vector_repo,
+            oversample_budget_ms=oversample_budget_ms
+        )
+
+        self._query_controller = self._init_query_controller(
+            data_folder=Path(data_folder),
+            id2index_path=Path(id2index_path)
         )
 
     def _init_milvus_repo(
@@ -60,11 +171,10 @@ class ServiceFactory:
         user: str,
         password: str,
         db_name: str = "default",
-        alias: str = "default"
+        alias: str = "default",
+        pool_size: int = 1,
+        stats_ttl_s: float = 60.0
     ):
-        if connections.has_connection(alias):
-            connections.remove_connection(alias)
-
         conn_params = {
             "host": host,
             "port": port,
@@ -75,15 +185,131 @@ class ServiceFactory:
             conn_params["user"] = user
             conn_params["password"] = password
 
-        connections.connect(alias=alias, **conn_params)
-        collection = MilvusCollection(collection_name, using=alias)
+        # One gRPC channel per alias, the repository spreads concurrent searches over them
+        pool = []
+        for i in range(max(pool_size, 1)):
+            pool_alias = alias if i == 0 else f"{alias}_{i}"
+            if connections.has_connection(pool_alias):
+                connections.remove_connection(pool_alias)
+            connections.connect(alias=pool_alias, **conn_params)
+            pool.append(MilvusCollection(collection_name, using=pool_alias))
 
-        return KeyframeVectorRepository(collection=collection, search_params=search_params)
+        return KeyframeVectorRepository(
+            collection=pool[0], search_params=search_params, pool=pool, stats_ttl_s=stats_ttl_s
+        )
+
+    def _init_local_vector_repo(
+        self,
+        backend: str,
+        usearch_index_path: str | None,
+        faiss_index_path: str | None,
+        numpy_embedding_path: str | None = None,
+        numpy_search_threads: int | None = None
+    ):
+        if backend == "usearch":
+            if not usearch_index_path:
+                raise ValueError("USEARCH_INDEX_PATH must be set when VECTOR_BACKEND=usearch")
+            return USearchVectorRepository.from_path(usearch_index_path)
 
-    def _init_model_service(self, model_name: str):
+        if backend == "faiss":
+            if not faiss_index_path:
+                raise ValueError("FAISS_INDEX_PATH must be set when VECTOR_BACKEND=faiss")
+            return FaissVectorRepository.from_path(faiss_index_path)
+
+        if backend == "numpy":
+            if not numpy_embedding_path:
+                raise ValueError("NUMPY_EMBEDDING_PATH must be set when VECTOR_BACKEND=numpy")
+            return NumpyVectorRepository.from_path(numpy_embedding_path, num_threads=numpy_search_threads)
+
+        raise ValueError(f"Unknown vector backend: {backend}")
+
+    def _init_model_service(
+        self,
+        model_name: str,
+        cache_size: int = 4096,
+        text_encoder_backend: str = "torch",
+        onnx_text_encoder_path: str | None = None
+    ):
         model, _, preprocess = open_clip.create_model_and_transforms(model_name, pretrained="openai")
         tokenizer = open_clip.get_tokenizer(model_name)
-        return ModelService(model=model, preprocess=preprocess, tokenizer=tokenizer)
+
+        text_encoder = None
+        if text_encoder_backend == "onnx":
+            if not onnx_text_encoder_path:
+                raise ValueError("ONNX_TEXT_ENCODER_PATH must be set when TEXT_ENCODER_BACKEND=onnx")
+            from service.onnx_text_encoder import OnnxTextEncoder
+            text_encoder = OnnxTextEncoder(onnx_text_encoder_path)
+        elif text_encoder_backend != "torch":
+            raise ValueError(f"Unknown text encoder backend: {text_encoder_backend}")
+
+        return ModelService(
+            model=model,
+            preprocess=preprocess,
+            tokenizer=tokenizer,
+            model_name=model_name,
+            cache_size=cache_size,
+            text_encoder=text_encoder
+        )
+
+    def _init_query_controller(self, data_folder: Path, id2index_path: Path):
+        if not data_folder.exists():
+            logger.warning(f"Data folder does not exist: {data_folder}")
+            data_folder.mkdir(parents=True, exist_ok=True)
+
+        if not id2index_path.exists():
+            logger.warning(f"ID2Index file does not exist: {id2index_path}")
+            id2index_path.parent.mkdir(parents=True, exist_ok=True)
+            with open(id2index_path, 'w') as f:
+                json.dump({}, f)
+
+        return QueryController(
+            data_folder=data_folder,
+            id2index_path=id2index_path,
+            model_service=self._model_service,
+            keyframe_service=self._keyframe_query_service,
+            embedding_batcher=self._embedding_batcher,
+            ocr_text_encoder=self._ocr_text_encoder
+        )
+
+    async def load_keyframe_table_from_mongo(self):
+        """
+        Replace the mapping.json keyframe table with one read from the Mongo keyframe collection
+        """
+        rows = await self._mongo_keyframe_repo.get_all_keyframe_rows()
+        keyframe_table = KeyframeTable.from_rows(rows)
+        self._query_controller.set_keyframe_table(keyframe_table)
+        logger.info(f"Keyframe table loaded from Mongo: {keyframe_table.num_keyframes} keyframes")
+
+    async def load_ocr_index(self):
+        """
+        Build the OCR trigram (matching), BM25 (ranking) and deletion dictionary (fuzzy matching) indexes
+        from Mongo. Calling it again only indexes keyframes with a key above the highest one already indexed,
+        so newly ingested keyframes are picked up incrementally, which every mapping reload does.
+        """
+        ocr_index = self._keyframe_query_service.ocr_index or OcrTrigramIndex()
+        ocr_bm25 = self._keyframe_query_service.ocr_bm25 or OcrBm25Index()
+        ocr_symspell = self._keyframe_query_service.ocr_symspell or SymSpellIndex()
+        documents = await self._mongo_keyframe_repo.get_ocr_documents(min_key=ocr_index.max_key)
+        await asyncio.to_thread(ocr_index.add_many, documents)
+        await asyncio.to_thread(ocr_bm25.add_many, documents)
+        await asyncio.to_thread(ocr_symspell.add_many, documents)
+        self._keyframe_query_service.ocr_index = ocr_index
+        self._keyframe_query_service.ocr_bm25 = ocr_bm25
+        self._keyframe_query_service.ocr_symspell = ocr_symspell
+        logger.info(f"OCR index: {len(documents)} keyframes added, {len(ocr_index)} indexed")
+        self._query_controller.add_reload_hook(self.load_ocr_index)
+
+    async def load_object_index(self):
+        """
+        Build the N x 80 object-count matrix from Mongo, one row per key of the keyframe table. Every mapping
+        reload rebuilds it, sized to the new table.
+        """
+        documents = await self._mongo_keyframe_repo.get_object_count_documents()
+        num_rows = len(self._query_controller.keyframe_table)
+        object_index = await asyncio.to_thread(ObjectCountMatrix.from_rows, documents, num_rows)
+        self._keyframe_query_service.object_index = object_index
+        logger.info(f"Object index: {len(documents)} keyframes with detections, {len(object_index)} rows")
+        self._query_controller.add_reload_hook(self.load_object_index)
 
     def get_mongo_keyframe_repo(self):
         return self._mongo_keyframe_repo
@@ -91,8 +317,27 @@ class ServiceFactory:
     def get_milvus_keyframe_repo(self):
         return self._milvus_keyframe_repo
 
+    def get_keyframe_vector_repo(self):
+        return self._keyframe_vector_repo
+
+    def get_ocr_vector_repo(self):
+        return self._ocr_vector_repo
+
     def get_model_service(self):
         return self._model_service
 
+    def get_embedding_batcher(self):
+        return self._embedding_batcher
+
     def get_keyframe_query_service(self):
         return self._keyframe_query_service
+
+    def get_query_controller(self):
+        return self._query_controller
+
+    def shutdown(self):
+        self._encoder_executor.shutdown()
+        if self._milvus_keyframe_repo is not None:
+            self._milvus_keyframe_repo.close()
+        if self._milvus_ocr_repo is not None:
+            self._milvus_ocr_repo.close()
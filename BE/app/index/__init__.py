@@ -0,0 +1,7 @@
+from .keyframe_table import KeyframeTable
+from .video_interval import VideoIntervalIndex, merge_intervals, ids_from_intervals
+from .ocr_trigram import OcrTrigramIndex, fold_text
+from .ocr_bm25 import OcrBm25Index, syllables, tokenize
+from .ocr_symspell import SymSpellIndex
+from .object_counts import ObjectCountMatrix
+from .id_bitmap import IdBitmap
@@ -0,0 +1,380 @@
+"""
+Compressed id bitmap (Roaring-style) shared by every id-set filter.
+
+Ids are split into 2^16-wide chunks keyed by their high bits. Each chunk keeps whichever container is
+smallest for its content:
+
+    array   sorted uint16 low bits            sparse chunks (OCR / object candidates)
+    bitmap  1024 uint64 words (8 KiB)         dense, scattered chunks
+    run     int32 [start, end) pairs          contiguous chunks (videos, groups, id ranges)
+
+Filter sources (video intervals, id ranges, OCR hits, object masks) build IdBitmaps, AND/OR/NOT combine
+them, and each vector engine consumes the result as a Milvus expression, a NumPy mask or explicit ids.
+"""
+
+from typing import Iterable, Iterator
+import numpy as np
+
+
+CHUNK_BITS = 16
+CHUNK_SIZE = 1 << CHUNK_BITS
+ARRAY_MAX = 4096
+WORDS = CHUNK_SIZE // 64
+
+ARRAY, BITMAP, RUN = "array", "bitmap", "run"
+
+Container = tuple[str, np.ndarray]
+
+
+def _from_bools(bools: np.ndarray) -> Container | None:
+    """Pick the smallest container for a CHUNK_SIZE boolean vector, None when it is empty"""
+    cardinality = int(np.count_nonzero(bools))
+    if cardinality == 0:
+        return None
+
+    edges = np.flatnonzero(np.diff(np.concatenate(([False], bools, [False]))))
+    runs = edges.reshape(-1, 2).astype(np.int32)
+    if len(runs) * 8 <= min(cardinality * 2, WORDS * 8):
+        return RUN, runs
+    if cardinality <= ARRAY_MAX:
+        return ARRAY, np.flatnonzero(bools).astype(np.uint16)
+    return BITMAP, np.packbits(bools, bitorder="little").view(np.uint64)
+
+
+def _from_runs(runs: np.ndarray) -> Container | None:
+    if len(runs) == 0:
+        return None
+    cardinality = int((runs[:, 1] - runs[:, 0]).sum())
+    if len(runs) * 8 <= min(cardinality * 2, WORDS * 8):
+        return RUN, runs
+    return _from_bools(_to_bools((RUN, runs)))
+
+
+def _from_values(values: np.ndarray) -> Container | None:
+    """values: sorted unique low bits of one chunk"""
+    if len(values) == 0:
+        return None
+    if len(values) <= 64:
+        # Too small for the representation choice to matter, skip the dense round trip
+        return ARRAY, values.astype(np.uint16)
+    bools = np.zeros(CHUNK_SIZE, dtype=bool)
+    bools[values] = True
+    return _from_bools(bools)
+
+
+def _to_bools(container: Container) -> np.ndarray:
+    kind, data = container
+    if kind == BITMAP:
+        return np.unpackbits(data.view(np.uint8), bitorder="little").astype(bool)
+    if kind == RUN and len(data) > 64:
+        # +1 at every run start, -1 at every end, the running sum is positive inside the runs
+        edges = np.bincount(data[:, 0], minlength=CHUNK_SIZE + 1) - np.bincount(data[:, 1], minlength=CHUNK_SIZE + 1)
+        return np.cumsum(edges[:CHUNK_SIZE]) > 0
+    bools = np.zeros(CHUNK_SIZE, dtype=bool)
+    if kind == ARRAY:
+        bools[data] = True
+    else:
+        for start, end in data:
+            bools[start:end] = True
+    return bools
+
+
+def _to_values(container: Container) -> np.ndarray:
+    kind, data = container
+    if kind == ARRAY:
+        return data.astype(np.int64)
+    if kind == RUN:
+        return np.concatenate([np.arange(start, end, dtype=np.int64) for start, end in data])
+    return np.flatnonzero(_to_bools(container))
+
+
+def _cardinality(container: Container) -> int:
+    kind, data = container
+    if kind == ARRAY:
+        return len(data)
+    if kind == RUN:
+        return int((data[:, 1] - data[:, 0]).sum())
+    return int(np.bitwise_count(data).sum())
+
+
+def _contains(container: Container, values: np.ndarray) -> np.ndarray:
+    """Vectorized membership test of low bits against one container"""
+    kind, data = container
+    values = values.astype(np.int64)
+    if kind == ARRAY:
+        position = np.minimum(np.searchsorted(data, values), len(data) - 1)
+        return data[position] == values
+    if kind == RUN:
+        position = np.searchsorted(data[:, 0], values, side="right") - 1
+        return (position >= 0) & (values < data[np.maximum(position, 0), 1])
+    return ((data[values >> 6] >> (values & 63).astype(np.uint64)) & np.uint64(1)).astype(bool)
+
+
+def _and(a: Container, b: Container) -> Container | None:
+    if a[0] == ARRAY or b[0] == ARRAY:
+        values, other = (a[1], b) if a[0] == ARRAY else (b[1], a)
+        return _from_values_array(values[_contains(other, values)])
+    if a[0] == RUN and b[0] == RUN:
+        return _from_runs(_intersect_runs(a[1], b[1]))
+    return _from_bools(_to_bools(a) & _to_bools(b))
+
+
+def _or(a: Container, b: Container) -> Container | None:
+    if a[0] == ARRAY and b[0] == ARRAY and len(a[1]) + len(b[1]) <= ARRAY_MAX:
+        return ARRAY, np.union1d(a[1], b[1])
+    return _from_bools(_to_bools(a) | _to_bools(b))
+
+
+def _andnot(a: Container, b: Container) -> Container | None:
+    if a[0] == ARRAY:
+        return _from_values_array(a[1][~_contains(b, a[1])])
+    return _from_bools(_to_bools(a) & ~_to_bools(b))
+
+
+def _from_values_array(values: np.ndarray) -> Container | None:
+    return (ARRAY, values) if len(values) else None
+
+
+def _intersect_runs(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    result, i, j = [], 0, 0
+    while i < len(a) and j < len(b):
+        start, end = max(a[i, 0], b[j, 0]), min(a[i, 1], b[j, 1])
+        if start < end:
+            result.append((start, end))
+        if a[i, 1] < b[j, 1]:
+            i += 1
+        else:
+            j += 1
+    return np.asarray(result, dtype=np.int32).reshape(-1, 2)
+
+
+class IdBitmap:
+    def __init__(self, containers: dict[int, Container] | None = None):
+        self.containers: dict[int, Container] = dict(sorted((containers or {}).items()))
+        self._cardinality: int | None = None
+
+    # ---- construction -------------------------------------------------------------------------------
+
+    @classmethod
+    def from_ids(cls, ids: Iterable[int] | np.ndarray) -> "IdBitmap":
+        ids = np.unique(np.asarray(ids if isinstance(ids, np.ndarray) else list(ids), dtype=np.int64))
+        ids = ids[ids >= 0]
+        containers = {}
+        if len(ids):
+            highs = ids >> CHUNK_BITS
+            bounds = np.flatnonzero(np.diff(highs)) + 1
+            for chunk in np.split(ids, bounds):
+                container = _from_values(chunk & (CHUNK_SIZE - 1))
+                if container is not None:
+                    containers[int(chunk[0] >> CHUNK_BITS)] = container
+        return cls(containers)
+
+    @classmethod
+    def from_mask(cls, mask: np.ndarray) -> "IdBitmap":
+        """Boolean mask indexed by id"""
+        containers = {}
+        for high, start in enumerate(range(0, len(mask), CHUNK_SIZE)):
+            chunk = np.zeros(CHUNK_SIZE, dtype=bool)
+            part = mask[start:start + CHUNK_SIZE]
+            chunk[:len(part)] = part
+            container = _from_bools(chunk)
+            if container is not None:
+                containers[high] = container
+        return cls(containers)
+
+    @classmethod
+    def from_intervals(cls, intervals: Iterable[tuple[int, int]]) -> "IdBitmap":
+        """Half-open [start, end) intervals, overlapping ones are fine"""
+        runs: dict[int, list[tuple[int, int]]] = {}
+        for start, end in sorted(intervals):
+            start = max(int(start), 0)
+            while start < end:
+                high = start >> CHUNK_BITS
+                chunk_end = min(int(end), (high + 1) << CHUNK_BITS)
+                low_start, low_end = start - (high << CHUNK_BITS), chunk_end - (high << CHUNK_BITS)
+                chunk_runs = runs.setdefault(high, [])
+                if chunk_runs and low_start <= chunk_runs[-1][1]:
+                    chunk_runs[-1] = (chunk_runs[-1][0], max(chunk_runs[-1][1], low_end))
+                else:
+                    chunk_runs.append((low_start, low_end))
+                start = chunk_end
+
+        containers = {}
+        for high, chunk_runs in runs.items():
+            container = _from_runs(np.asarray(chunk_runs, dtype=np.int32).reshape(-1, 2))
+            if container is not None:
+                containers[high] = container
+        return cls(containers)
+
+    @classmethod
+    def from_runs(cls, starts: np.ndarray, ends: np.ndarray) -> "IdBitmap":
+        """
+        Half-open [starts[i], ends[i]) runs, sorted and non-overlapping, touching runs are merged. Vectorized
+        counterpart of from_intervals for many runs, the only Python loop is over the chunks.
+        """
+        starts = np.maximum(np.asarray(starts, dtype=np.int64), 0)
+        ends = np.asarray(ends, dtype=np.int64)
+        nonempty = ends > starts
+        starts, ends = starts[nonempty], ends[nonempty]
+        if len(starts) == 0:
+            return cls()
+
+        first = np.concatenate(([True], starts[1:] != ends[:-1]))
+        starts, ends = starts[first], ends[np.append(first[1:], True)]
+
+        # Cut every run at the chunk boundaries it crosses, one piece per chunk
+        first_high, last_high = starts >> CHUNK_BITS, (ends - 1) >> CHUNK_BITS
+        num_pieces = last_high - first_high + 1
+        run_of_piece = np.repeat(np.arange(len(starts)), num_pieces)
+        piece_offsets = np.arange(len(run_of_piece)) - np.repeat(np.cumsum(num_pieces) - num_pieces, num_pieces)
+        highs = first_high[run_of_piece] + piece_offsets
+        bases = highs << CHUNK_BITS
+        pieces = np.stack((
+            np.maximum(starts[run_of_piece], bases) - bases,
+            np.minimum(ends[run_of_piece], bases + CHUNK_SIZE) - bases
+        ), axis=1).astype(np.int32)
+
+        containers = {}
+        bounds = np.flatnonzero(np.diff(highs)) + 1
+        for chunk_highs, chunk_runs in zip(np.split(highs, bounds), np.split(pieces, bounds)):
+            container = _from_runs(chunk_runs)
+            if container is not None:
+                containers[int(chunk_highs[0])] = container
+        return cls(containers)
+
+    @classmethod
+    def full(cls, num_entities: int) -> "IdBitmap":
+        return cls.from_intervals([(0, num_entities)])
+
+    # ---- set algebra --------------------------------------------------------------------------------
+
+    def __and__(self, other: "IdBitmap") -> "IdBitmap":
+        containers = {}
+        for high in self.containers.keys() & other.containers.keys():
+            container = _and(self.containers[high], other.containers[high])
+            if container is not None:
+                containers[high] = container
+        return IdBitmap(containers)
+
+    def __or__(self, other: "IdBitmap") -> "IdBitmap":
+        containers = dict(self.containers)
+        for high, container in other.containers.items():
+            containers[high] = container if high not in containers else _or(containers[high], container)
+        return IdBitmap(containers)
+
+    def __sub__(self, other: "IdBitmap") -> "IdBitmap":
+        containers = {}
+        for high, container in self.containers.items():
+            if high in other.containers:
+                container = _andnot(container, other.containers[high])
+            if container is not None:
+                containers[high] = container
+        return IdBitmap(containers)
+
+    def complement(self, num_entities: int) -> "IdBitmap":
+        """NOT within the id space [0, num_entities)"""
+        return IdBitmap.full(num_entities) - self
+
+    # ---- inspection ---------------------------------------------------------------------------------
+
+    def __len__(self) -> int:
+        if self._cardinality is None:
+            self._cardinality = sum(_cardinality(container) for container in self.containers.values())
+        return self._cardinality
+
+    def __bool__(self) -> bool:
+        return bool(self.containers)
+
+    def __contains__(self, id_: int) -> bool:
+        container = self.containers.get(id_ >> CHUNK_BITS)
+        if container is None or id_ < 0:
+            return False
+        return bool(_contains(container, np.array([id_ & (CHUNK_SIZE - 1)]))[0])
+
+    def __iter__(self) -> Iterator[int]:
+        for high, container in self.containers.items():
+            yield from (int(value) + (high << CHUNK_BITS) for value in _to_values(container))
+
+    def __eq__(self, other: object) -> bool:
+        return isinstance(other, IdBitmap) and np.array_equal(self.to_ids(), other.to_ids())
+
+    def __repr__(self) -> str:
+        kinds = [kind for kind, _ in self.containers.values()]
+        return f"IdBitmap({len(self)} ids, " + ", ".join(f"{kinds.count(k)} {k}" for k in (ARRAY, BITMAP, RUN)) + ")"
+
+    @property
+    def nbytes(self) -> int:
+        return sum(data.nbytes for _, data in self.containers.values())
+
+    def contains_many(self, ids: np.ndarray) -> np.ndarray:
+        """Vectorized membership test, aligned with ids"""
+        ids = np.asarray(ids, dtype=np.int64)
+        result = np.zeros(len(ids), dtype=bool)
+        highs = ids >> CHUNK_BITS
+        for high, container in self.containers.items():
+            selected = (highs == high) & (ids >= 0)
+            if selected.any():
+                result[selected] = _contains(container, ids[selected] & (CHUNK_SIZE - 1))
+        return result
+
+    # ---- conversion ---------------------------------------------------------------------------------
+
+    def to_ids(self) -> np.ndarray:
+        if not self.containers:
+            return np.empty(0, dtype=np.int64)
+        return np.concatenate([
+            _to_values(container) + (high << CHUNK_BITS) for high, container in self.containers.items()
+        ])
+
+    def to_mask(self, num_entities: int) -> np.ndarray:
+        mask = np.zeros(num_entities, dtype=bool)
+        for high, container in self.containers.items():
+            start = high << CHUNK_BITS
+            if start >= num_entities:
+                break
+            mask[start:start + CHUNK_SIZE] = _to_bools(container)[:num_entities - start]
+        return mask
+
+    def to_intervals(self) -> list[tuple[int, int]]:
+        """Maximal half-open runs, merged across chunk boundaries"""
+        intervals: list[tuple[int, int]] = []
+        for high, container in self.containers.items():
+            base = high << CHUNK_BITS
+            if container[0] == RUN:
+                runs = container[1]
+            else:
+                edges = np.flatnonzero(np.diff(np.concatenate(([False], _to_bools(container), [False]))))
+                runs = edges.reshape(-1, 2)
+            for start, end in runs:
+                start, end = int(start) + base, int(end) + base
+                if intervals and intervals[-1][1] == start:
+                    intervals[-1] = (intervals[-1][0], end)
+                else:
+                    intervals.append((start, end))
+        return intervals
+
+    def to_milvus_expr(self, field: str = "id") -> str:
+        """
+        Boolean expression selecting exactly these ids, written from whichever form is shortest:
+        an `in` list, `>= / <=` range predicates, or the span between the lowest and highest id minus a
+        `not in` list of its gaps. Every form is bounded by the bitmap itself, never by a collection size,
+        so the expression stays exact while the collection grows.
+        """
+        if not self.containers:
+            return f"{field} < 0"
+
+        cardinality = len(self)
+        intervals = self.to_intervals()
+        low, high = intervals[0][0], intervals[-1][1]
+        candidates = {"in": cardinality, "ranges": 3 * len(intervals), "not_in": high - low - cardinality + 2}
+
+        form = min(candidates, key=candidates.get)
+        if form == "ranges":
+            return " or ".join(f"({field} >= {start} and {field} <= {end - 1})" for start, end in intervals)
+        if form == "not_in":
+            gaps = [
+                id_ for (_, end), (start, _) in zip(intervals, intervals[1:]) for id_ in range(end, start)
+            ]
+            span = f"{field} >= {low} and {field} <= {high - 1}"
+            return f"{span} and {field} not in {gaps}" if gaps else span
+        return f"{field} in {self.to_ids().tolist()}"
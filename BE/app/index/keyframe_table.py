@@ -0,0 +1,60 @@
+"""
+Array-backed key -> (group_num, video_num, keyframe_num) table.
+
+Three int32 arrays indexed by keyframe key replace the per-query Mongo `$in` lookup: resolving the ids of
+a search result is a single vectorized gather. Missing keys are stored as -1.
+"""
+
+from typing import Iterable
+import numpy as np
+
+
+MISSING = -1
+
+
+class KeyframeTable:
+    def __init__(self, group_nums: np.ndarray, video_nums: np.ndarray, keyframe_nums: np.ndarray):
+        self.group_nums = group_nums
+        self.video_nums = video_nums
+        self.keyframe_nums = keyframe_nums
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple[int, int, int, int]]) -> "KeyframeTable":
+        """
+        rows: (key, group_num, video_num, keyframe_num) tuples
+        """
+        data = np.asarray(list(rows), dtype=np.int64).reshape(-1, 4)
+        size = int(data[:, 0].max()) + 1 if len(data) else 0
+
+        columns = np.full((3, size), MISSING, dtype=np.int32)
+        columns[:, data[:, 0]] = data[:, 1:].T
+        return cls(*columns)
+
+    @classmethod
+    def from_id2index(cls, id2index: dict[str, str]) -> "KeyframeTable":
+        """
+        Build the table from the id2index mapping ({"0": "group/video/keyframe", ...})
+        """
+        return cls.from_rows(
+            (int(k), *map(int, v.split('/'))) for k, v in id2index.items()
+        )
+
+    def __len__(self) -> int:
+        return len(self.group_nums)
+
+    @property
+    def num_keyframes(self) -> int:
+        return int((self.group_nums != MISSING).sum())
+
+    def lookup(self, keys: np.ndarray) -> tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+        """
+        Vectorized lookup of many keys at once
+        Returns (found mask, group_nums, video_nums, keyframe_nums) aligned with keys
+        """
+        keys = np.asarray(keys, dtype=np.int64)
+        in_range = (keys >= 0) & (keys < len(self))
+        safe_keys = np.where(in_range, keys, 0)
+
+        group_nums = self.group_nums[safe_keys]
+        found = in_range & (group_nums != MISSING)
+        return found, group_nums, self.video_nums[safe_keys], self.keyframe_nums[safe_keys]
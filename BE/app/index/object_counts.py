@@ -0,0 +1,116 @@
+"""
+Columnar object-count matrix: row = keyframe key, column = COCO class (see common.coco), uint8 counts.
+
+`search_by_objects` filters on `object_counts.<name>`, a nested field Mongo cannot index. Here a
+multi-object min_count filter is one vectorized comparison per class column, producing a boolean mask
+over the key space that is handed to the vector search as an IdBitmap filter.
+"""
+
+from typing import Iterable
+import numpy as np
+
+from common.coco import COCO_CLASSES, COCO_CLASS_TO_COLUMN
+from .id_bitmap import IdBitmap
+
+
+MAX_COUNT = np.iinfo(np.uint8).max
+
+
+def _normalize_name(name: str) -> str:
+    return name.strip().lower()
+
+
+class ObjectCountMatrix:
+    def __init__(self, counts: np.ndarray):
+        self.counts = counts
+        self._at_least: np.ndarray | None = None
+
+    @classmethod
+    def from_rows(cls, rows: Iterable[tuple[int, dict[str, int]]], num_rows: int = 0) -> "ObjectCountMatrix":
+        """
+        rows: (key, object_counts) pairs. Class names are matched case-insensitively like the filters, names
+        outside COCO are ignored, counts saturate at 255.
+        num_rows pads the matrix to the size of the key space, keys without detections keep zero counts.
+        """
+        keys, columns, values = [], [], []
+        for key, object_counts in rows:
+            for name, count in object_counts.items():
+                column = COCO_CLASS_TO_COLUMN.get(_normalize_name(name))
+                if column is not None and count > 0:
+                    keys.append(key)
+                    columns.append(column)
+                    values.append(min(count, MAX_COUNT))
+
+        size = max(num_rows, max(keys) + 1 if keys else 0)
+        counts = np.zeros((size, len(COCO_CLASSES)), dtype=np.uint8)
+        counts[keys, columns] = values
+        return cls(counts)
+
+    def __len__(self) -> int:
+        return len(self.counts)
+
+    @staticmethod
+    def _columns(object_filters: dict[str, int]) -> list[tuple[int, int]] | None:
+        """
+        (column, min_count) per active filter, None when one of them can never match. A min_count <= 0 filter
+        is dropped, it matches every key, including keys without that class (the request schemas reject it).
+        """
+        columns = []
+        for name, min_count in object_filters.items():
+            if min_count <= 0:
+                continue
+            column = COCO_CLASS_TO_COLUMN.get(_normalize_name(name))
+            if column is None or min_count > MAX_COUNT:
+                return None
+            columns.append((column, min_count))
+        return columns
+
+    @staticmethod
+    def _match(counts: np.ndarray, columns: list[tuple[int, int]] | None) -> np.ndarray:
+        mask = np.full(len(counts), columns is not None, dtype=bool)
+        for column, min_count in columns or ():
+            mask &= counts[:, column] >= min_count
+        return mask
+
+    def mask(self, object_filters: dict[str, int]) -> np.ndarray:
+        """
+        Boolean mask over keys with at least min_count of every requested object, e.g. {"person": 2, "car": 1}.
+        Like the Mongo query, an unknown object with min_count > 0 matches nothing.
+        """
+        return self._match(self.counts, self._columns(object_filters))
+
+    def matches(self, keys: np.ndarray, object_filters: dict[str, int]) -> np.ndarray:
+        """mask restricted to keys (aligned with them), keys outside the matrix have no detections"""
+        keys = np.asarray(keys, dtype=np.int64)
+        in_range = (keys >= 0) & (keys < len(self))
+        rows = self.counts[np.where(in_range, keys, 0)]
+        rows[~in_range] = 0
+        return self._match(rows, self._columns(object_filters))
+
+    def estimate(self, object_filters: dict[str, int]) -> int:
+        """
+        Expected number of matching keys from per-class count histograms, treating classes as independent.
+        Exact for a single class, the histograms are built once and cost 80 x 256 ints.
+        """
+        columns = self._columns(object_filters)
+        if columns is None or len(self) == 0:
+            return 0
+        if self._at_least is None:
+            histograms = np.stack([
+                np.bincount(self.counts[:, column], minlength=MAX_COUNT + 1)
+                for column in range(self.counts.shape[1])
+            ], axis=1)
+            # _at_least[c, column]: keys with at least c objects of that class
+            self._at_least = histograms[::-1].cumsum(axis=0)[::-1]
+
+        selectivity = 1.0
+        for column, min_count in columns:
+            selectivity *= self._at_least[min_count, column] / len(self)
+        return int(round(selectivity * len(self)))
+
+    def keys(self, object_filters: dict[str, int], limit: int | None = None) -> np.ndarray:
+        """Matching keys in ascending order"""
+        return np.flatnonzero(self.mask(object_filters))[:limit]
+
+    def bitmap(self, object_filters: dict[str, int]) -> IdBitmap:
+        return IdBitmap.from_mask(self.mask(object_filters))
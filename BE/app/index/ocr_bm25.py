@@ -0,0 +1,158 @@
+"""
+BM25 index over tokenized, diacritic-folded OCR text.
+
+The trigram index decides which keyframes match an OCR query, this one ranks them. Vietnamese writes one
+syllable per space-separated token and most words are one or two syllables, so instead of depending on a
+word segmenter every line is indexed as its folded syllables plus each pair of adjacent syllables
+("hom nay troi" -> hom, nay, troi, hom_nay, nay_troi). A query matching a whole word then also matches
+its bigram and outranks keyframes that only share the loose syllables.
+
+Postings are sorted key arrays with aligned term frequencies, so scoring any set of keys (OCR matches or
+the hits of a vector search) is a few searchsorted calls per query term.
+"""
+
+from collections import Counter, defaultdict
+from typing import Iterable
+import math
+import re
+import numpy as np
+
+from .ocr_trigram import fold_text
+
+
+_SYLLABLE = re.compile(r"[a-z0-9]+")
+K1 = 1.2
+B = 0.75
+
+
+def syllables(text: str) -> list[str]:
+    """Folded alphanumeric syllables of text"""
+    return _SYLLABLE.findall(fold_text(text))
+
+
+def tokenize(text: str) -> list[str]:
+    """Folded syllables of every line, followed by the adjacent syllable bigrams joined with '_'"""
+    tokens = []
+    for line in text.splitlines():
+        line_syllables = syllables(line)
+        tokens.extend(line_syllables)
+        tokens.extend(f"{left}_{right}" for left, right in zip(line_syllables, line_syllables[1:]))
+    return tokens
+
+
+class OcrBm25Index:
+    def __init__(self):
+        self.postings: dict[str, tuple[np.ndarray, np.ndarray]] = {}
+        self.doc_lens = np.zeros(0, dtype=np.float32)
+        self._pending: dict[str, list[tuple[int, int]]] = defaultdict(list)
+        self._num_docs = 0
+        self._total_len = 0
+        self.max_key = -1
+
+    def __len__(self) -> int:
+        return self._num_docs
+
+    def add(self, key: int, lines: Iterable[str]):
+        """Index the OCR lines of one keyframe, each key is expected once"""
+        tokens = tokenize("\n".join(line for line in lines if line))
+        if not tokens:
+            return
+
+        if key >= len(self.doc_lens):
+            doc_lens = np.zeros(max(key + 1, 2 * len(self.doc_lens)), dtype=np.float32)
+            doc_lens[:len(self.doc_lens)] = self.doc_lens
+            self.doc_lens = doc_lens
+        self.doc_lens[key] = len(tokens)
+        self._num_docs += 1
+        self._total_len += len(tokens)
+        self.max_key = max(self.max_key, key)
+
+        for term, tf in Counter(tokens).items():
+            self._pending[term].append((key, tf))
+
+    def add_many(self, documents: Iterable[tuple[int, list[str]]]):
+        for key, lines in documents:
+            self.add(key, lines)
+        self._compact()
+
+    def _compact(self):
+        """Merge keys added since the last compaction into the sorted posting arrays"""
+        for term, entries in self._pending.items():
+            new_keys, new_tfs = np.asarray(entries, dtype=np.int64).T
+            existing = self.postings.get(term)
+            if existing is not None:
+                new_keys = np.concatenate((existing[0], new_keys))
+                new_tfs = np.concatenate((existing[1], new_tfs))
+            order = np.argsort(new_keys, kind="stable")
+            self.postings[term] = (new_keys[order], new_tfs[order].astype(np.float32))
+        self._pending.clear()
+
+    def keys(self, term: str) -> np.ndarray:
+        """Sorted keys of the keyframes containing term"""
+        if self._pending:
+            self._compact()
+        posting = self.postings.get(term)
+        return posting[0] if posting is not None else np.empty(0, dtype=np.int64)
+
+    def matching_keys(self, term_groups: Iterable[Iterable[str]]) -> np.ndarray:
+        """Sorted keys containing at least one term of every group"""
+        matches = None
+        for terms in term_groups:
+            group_keys = np.unique(np.concatenate([self.keys(term) for term in terms] or [np.empty(0, dtype=np.int64)]))
+            matches = group_keys if matches is None else np.intersect1d(matches, group_keys, assume_unique=True)
+            if len(matches) == 0:
+                break
+        return matches if matches is not None else np.empty(0, dtype=np.int64)
+
+    def score(self, query: str, keys: Iterable[int]) -> np.ndarray:
+        """
+        BM25 of query against every key, aligned with keys and divided by the query's maximum attainable
+        score, so it lies in [0, 1) and can be mixed with cosine similarities. Unknown keys score 0.
+        """
+        return self.score_groups([{term: 0} for term in set(tokenize(query))], keys)[0]
+
+    def score_groups(self, term_groups: list[dict[str, int]], keys: Iterable[int]) -> tuple[np.ndarray, np.ndarray]:
+        """
+        score for a query given as groups of alternative terms with their edit distance to the typed term,
+        e.g. the near matches of each query syllable. In every group a key is scored on the closest term it
+        contains, so a rarer (higher IDF) neighbour never stands in for the term that was typed.
+        Returns (scores, distances): distances sums the edit distance of the term used in every group.
+        """
+        if self._pending:
+            self._compact()
+
+        keys = np.asarray(keys, dtype=np.int64).reshape(-1)
+        scores = np.zeros(len(keys), dtype=np.float32)
+        distances = np.zeros(len(keys), dtype=np.int64)
+        if len(keys) == 0 or self._num_docs == 0:
+            return scores, distances
+
+        in_range = (keys >= 0) & (keys < len(self.doc_lens))
+        doc_lens = np.where(in_range, self.doc_lens[np.where(in_range, keys, 0)], 0.0)
+        norms = K1 * (1 - B + B * doc_lens / (self._total_len / self._num_docs))
+
+        upper_bound = 0.0
+        for terms in term_groups:
+            group_scores = np.zeros(len(keys), dtype=np.float32)
+            group_distances = np.zeros(len(keys), dtype=np.int64)
+            scored = np.zeros(len(keys), dtype=bool)
+            group_bound = 0.0
+            for term, distance in sorted(terms.items(), key=lambda item: item[1]):
+                posting = self.postings.get(term)
+                if posting is None:
+                    continue
+                posting_keys, posting_tfs = posting
+                idf = math.log(1 + (self._num_docs - len(posting_keys) + 0.5) / (len(posting_keys) + 0.5))
+                group_bound = max(group_bound, idf * (K1 + 1))
+
+                positions = np.minimum(np.searchsorted(posting_keys, keys), len(posting_keys) - 1)
+                found = (posting_keys[positions] == keys) & ~scored
+                tfs = posting_tfs[positions[found]]
+                group_scores[found] = idf * tfs * (K1 + 1) / (tfs + norms[found])
+                group_distances[found] = distance
+                scored |= found
+            scores += group_scores
+            distances += group_distances
+            upper_bound += group_bound
+
+        return (scores / upper_bound if upper_bound else scores), distances
@@ -0,0 +1,114 @@
+"""
+SymSpell-style deletion dictionary over the OCR vocabulary, for typo tolerant OCR queries.
+
+OCR drops diacritics, breaks characters and splits words, so an operator's query rarely matches the
+stored text exactly. Every vocabulary term (a folded syllable, see ocr_bm25.syllables) is indexed under
+each string obtained by deleting up to max_distance characters from its prefix. A lookup generates the
+same deletions of the query term, so its candidates are a few dictionary hits instead of a scan over the
+vocabulary, and only those candidates are verified with an edit distance.
+"""
+
+from collections import defaultdict
+from typing import Iterable
+
+from .ocr_bm25 import syllables
+
+
+MAX_EDIT_DISTANCE = 2
+PREFIX_LENGTH = 7
+
+
+def edit_distance(left: str, right: str, max_distance: int) -> int:
+    """
+    Optimal string alignment distance (Levenshtein plus adjacent transpositions), or max_distance + 1 as
+    soon as it is known to exceed max_distance
+    """
+    if abs(len(left) - len(right)) > max_distance:
+        return max_distance + 1
+
+    previous2 = None
+    previous = list(range(len(right) + 1))
+    for i in range(1, len(left) + 1):
+        current = [i] + [0] * len(right)
+        for j in range(1, len(right) + 1):
+            cost = left[i - 1] != right[j - 1]
+            current[j] = min(previous[j] + 1, current[j - 1] + 1, previous[j - 1] + cost)
+            if (
+                previous2 is not None and i > 1 and j > 1
+                and left[i - 1] == right[j - 2] and left[i - 2] == right[j - 1]
+            ):
+                current[j] = min(current[j], previous2[j - 2] + 1)
+        if min(current) > max_distance:
+            return max_distance + 1
+        previous2, previous = previous, current
+    return previous[-1]
+
+
+def allowed_distance(term: str) -> int:
+    """
+    Edits tolerated for a query term: none up to 3 letters, one up to 6, then two. One edit away from a
+    short Vietnamese syllable is another real word (nam / nay / năm) rather than a misread of it.
+    """
+    return min(MAX_EDIT_DISTANCE, (len(term) - 1) // 3)
+
+
+class SymSpellIndex:
+    def __init__(self, max_distance: int = MAX_EDIT_DISTANCE, prefix_length: int = PREFIX_LENGTH):
+        self.max_distance = max_distance
+        self.prefix_length = prefix_length
+        self.frequencies: dict[str, int] = {}
+        self.deletes: dict[str, list[str]] = defaultdict(list)
+
+    def __len__(self) -> int:
+        return len(self.frequencies)
+
+    def _deletions(self, term: str, max_distance: int) -> set[str]:
+        """term's prefix and every string made by deleting up to max_distance of its characters"""
+        frontier = {term[:self.prefix_length]}
+        deletions = set(frontier)
+        for _ in range(max_distance):
+            frontier = {word[:i] + word[i + 1:] for word in frontier for i in range(len(word))}
+            deletions |= frontier
+        return deletions
+
+    def add(self, term: str, count: int = 1):
+        if term in self.frequencies:
+            self.frequencies[term] += count
+            return
+
+        self.frequencies[term] = count
+        for deletion in self._deletions(term, self.max_distance):
+            self.deletes[deletion].append(term)
+
+    def add_many(self, documents: Iterable[tuple[int, list[str]]]):
+        """Add the syllables of (key, OCR lines) documents, counting their occurrences"""
+        for _, lines in documents:
+            for line in lines:
+                for term in syllables(line):
+                    self.add(term)
+
+    def lookup(self, term: str, max_distance: int | None = None, limit: int | None = None) -> list[tuple[str, int]]:
+        """
+        Vocabulary terms within max_distance edits of term (allowed_distance(term) by default) as
+        (term, distance) pairs, closest and then most frequent first
+        """
+        if max_distance is None:
+            max_distance = allowed_distance(term)
+        max_distance = min(max_distance, self.max_distance)
+
+        candidates = set()
+        for deletion in self._deletions(term, max_distance):
+            candidates.update(self.deletes.get(deletion, ()))
+
+        matches = []
+        for candidate in candidates:
+            distance = 0 if candidate == term else edit_distance(term, candidate, max_distance)
+            if distance <= max_distance:
+                matches.append((candidate, distance))
+
+        matches.sort(key=lambda match: (match[1], -self.frequencies[match[0]], match[0]))
+        return matches[:limit]
+
+    def expand(self, query: str, limit: int | None = None) -> list[dict[str, int]]:
+        """Near matches of every syllable of query, {term: distance} per syllable"""
+        return [dict(self.lookup(term, limit=limit)) for term in syllables(query)]
@@ -0,0 +1,164 @@
+"""
+Trigram inverted index over diacritic-folded OCR text.
+
+`search_by_ocr` in Mongo is an unanchored `$regex`, i.e. a collection scan per query. Here every OCR line
+is folded ("Hôm nay" -> "hom nay"), cut into character trigrams, and each trigram keeps a sorted array of
+the keyframe keys containing it. A query intersects the postings of its own trigrams, then the few
+surviving candidates are verified with a plain substring check, so operators can type with or without
+diacritics and still get substring matches.
+"""
+
+from collections import defaultdict
+from typing import Iterable
+import re
+import unicodedata
+import numpy as np
+
+
+NGRAM = 3
+_WHITESPACE = re.compile(r"\s+")
+
+
+def fold_text(text: str) -> str:
+    """Lowercase, strip Vietnamese diacritics (including đ) and collapse whitespace"""
+    decomposed = unicodedata.normalize("NFD", text.lower().replace("đ", "d").replace("Đ", "d"))
+    stripped = "".join(ch for ch in decomposed if not unicodedata.combining(ch))
+    return _WHITESPACE.sub(" ", stripped).strip()
+
+
+def ngrams(text: str, n: int = NGRAM) -> set[str]:
+    return {text[i:i + n] for i in range(len(text) - n + 1)}
+
+
+class OcrTrigramIndex:
+    def __init__(self):
+        self.raw_texts: dict[int, str] = {}
+        self.folded_texts: dict[int, str] = {}
+        self.postings: dict[str, np.ndarray] = {}
+        self._pending: dict[str, list[int]] = defaultdict(list)
+        self.max_key = -1
+
+    def __len__(self) -> int:
+        return len(self.folded_texts)
+
+    def add(self, key: int, lines: Iterable[str]):
+        """
+        Index the OCR lines of one keyframe, re-adding a key replaces its text but keeps old postings,
+        which only cost an extra candidate that fails verification
+        """
+        lines = [line for line in lines if line and line.strip()]
+        if not lines:
+            return
+
+        folded_lines = [fold_text(line) for line in lines]
+        self.raw_texts[key] = "\n".join(lines)
+        self.folded_texts[key] = "\n".join(folded_lines)
+        self.max_key = max(self.max_key, key)
+
+        for gram in set().union(*(ngrams(line) for line in folded_lines)):
+            self._pending[gram].append(key)
+
+    def add_many(self, documents: Iterable[tuple[int, list[str]]]):
+        for key, lines in documents:
+            self.add(key, lines)
+        self._compact()
+
+    def _compact(self):
+        """Merge keys added since the last compaction into the sorted posting arrays"""
+        for gram, keys in self._pending.items():
+            new_keys = np.asarray(keys, dtype=np.int64)
+            existing = self.postings.get(gram)
+            self.postings[gram] = np.unique(
+                new_keys if existing is None else np.concatenate((existing, new_keys))
+            )
+        self._pending.clear()
+
+    def _candidates(self, folded_query: str) -> Iterable[int]:
+        if len(folded_query) < NGRAM:
+            return list(self.folded_texts)
+
+        postings = []
+        for gram in ngrams(folded_query):
+            keys = self.postings.get(gram)
+            if keys is None:
+                return []
+            postings.append(keys)
+
+        postings.sort(key=len)
+        candidates = postings[0]
+        for keys in postings[1:]:
+            candidates = np.intersect1d(candidates, keys, assume_unique=True)
+            if len(candidates) == 0:
+                break
+        return candidates.tolist()
+
+    def estimate(self, query: str) -> int:
+        """
+        Upper bound on the number of keyframes matching query, read off the posting lengths without
+        verifying any candidate
+        """
+        if self._pending:
+            self._compact()
+
+        folded_query = fold_text(query)
+        if not folded_query:
+            return 0
+        if len(folded_query) < NGRAM:
+            return len(self)
+        return min(len(self.postings.get(gram, ())) for gram in ngrams(folded_query))
+
+    def _score(self, key: int, folded_query: str, exact_query: str, case_sensitive: bool) -> float | None:
+        """Score of one keyframe against an already folded query, None when it does not match"""
+        folded = self.folded_texts.get(key)
+        if folded is None:
+            return None
+        occurrences = folded.count(folded_query)
+        if occurrences == 0:
+            return None
+
+        raw = self.raw_texts[key]
+        if case_sensitive and exact_query not in raw:
+            return None
+        exact = case_sensitive or exact_query.lower() in raw.lower()
+
+        coverage = min(1.0, occurrences * len(folded_query) / len(folded))
+        return 0.5 * exact + 0.5 * coverage
+
+    def search(self, query: str, limit: int | None = 100, case_sensitive: bool = False) -> list[tuple[int, float]]:
+        """
+        Return up to limit (key, score) pairs, best first, every match when limit is None. Matching is
+        diacritic and case insensitive unless case_sensitive, which requires the exact query as a substring.
+        Score in (0, 1]: half of it rewards an exact (diacritics kept) match, the other half how much of the
+        OCR text the query covers.
+        """
+        if self._pending:
+            self._compact()
+
+        folded_query = fold_text(query)
+        if not folded_query:
+            return []
+        exact_query = _WHITESPACE.sub(" ", query).strip()
+
+        hits = []
+        for key in self._candidates(folded_query):
+            score = self._score(key, folded_query, exact_query, case_sensitive)
+            if score is not None:
+                hits.append((key, score))
+
+        hits.sort(key=lambda hit: (-hit[1], hit[0]))
+        return hits[:limit]
+
+    def matches(self, keys: Iterable[int], query: str, case_sensitive: bool = False) -> np.ndarray:
+        """
+        Boolean mask aligned with keys, True where the keyframe's OCR text matches query as in search.
+        Checks only the given keys, e.g. the hits of an unfiltered vector search.
+        """
+        folded_query = fold_text(query)
+        exact_query = _WHITESPACE.sub(" ", query).strip()
+        return np.fromiter(
+            (
+                bool(folded_query) and self._score(int(key), folded_query, exact_query, case_sensitive) is not None
+                for key in keys
+            ),
+            dtype=bool
+        )
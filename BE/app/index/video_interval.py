@@ -0,0 +1,121 @@
+"""
+(group, video) -> [start, end) interval index over the keyframe ids.
+
+`mapping.py` assigns ids contiguously per `L{group}_V{video}` folder, so every video
+owns one (or a handful of) id runs. Group/video filters are resolved against these
+runs instead of scanning the whole id2index mapping on every request.
+"""
+
+from collections import defaultdict
+from itertools import chain
+from typing import Iterable
+import numpy as np
+
+from .id_bitmap import IdBitmap
+from .keyframe_table import KeyframeTable, MISSING
+
+
+Interval = tuple[int, int]
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> list[Interval]:
+    """Sort half-open [start, end) intervals and merge the overlapping/adjacent ones"""
+    merged: list[Interval] = []
+    for start, end in sorted(intervals):
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def ids_from_intervals(intervals: Iterable[Interval]) -> list[int]:
+    return list(chain.from_iterable(range(start, end) for start, end in intervals))
+
+
+class VideoIntervalIndex:
+    def __init__(self, intervals: dict[tuple[int, int], list[Interval]]):
+        self.intervals = intervals
+        self.num_ids = sum(end - start for runs in intervals.values() for start, end in runs)
+
+
+    @classmethod
+    def from_id2index(cls, id2index: dict[str, str]) -> "VideoIntervalIndex":
+        """
+        Build the index from the id2index mapping ({"0": "group/video/keyframe", ...})
+        """
+        entries = sorted(
+            (int(k), *map(int, v.split('/')[:2])) for k, v in id2index.items()
+        )
+
+        intervals: dict[tuple[int, int], list[Interval]] = defaultdict(list)
+        prev_key, prev_video = None, None
+        for key, group_num, video_num in entries:
+            runs = intervals[(group_num, video_num)]
+            if prev_video == (group_num, video_num) and key == prev_key + 1:
+                runs[-1] = (runs[-1][0], key + 1)
+            else:
+                runs.append((key, key + 1))
+            prev_key, prev_video = key, (group_num, video_num)
+
+        return cls(dict(intervals))
+
+
+    @classmethod
+    def from_keyframe_table(cls, table: KeyframeTable) -> "VideoIntervalIndex":
+        """
+        Same runs as from_id2index, computed with array ops on an already loaded KeyframeTable
+        """
+        keys = np.flatnonzero(table.group_nums != MISSING)
+        if len(keys) == 0:
+            return cls({})
+
+        group_nums = table.group_nums[keys]
+        video_nums = table.video_nums[keys]
+        breaks = np.flatnonzero(
+            (np.diff(keys) != 1) | (np.diff(group_nums) != 0) | (np.diff(video_nums) != 0)
+        ) + 1
+        starts = np.concatenate(([0], breaks))
+        ends = np.concatenate((breaks, [len(keys)]))
+
+        intervals: dict[tuple[int, int], list[Interval]] = defaultdict(list)
+        for start, end in zip(starts, ends):
+            video = (int(group_nums[start]), int(video_nums[start]))
+            intervals[video].append((int(keys[start]), int(keys[end - 1]) + 1))
+
+        return cls(dict(intervals))
+
+
+    def matching_intervals(
+        self,
+        groups: Iterable[int] | None = None,
+        videos: Iterable[int] | None = None,
+        invert: bool = False
+    ) -> list[Interval]:
+        """
+        Merged id intervals of the (group, video) pairs matching every given constraint.
+        None means no constraint on that field; invert=True returns the non-matching pairs instead.
+        """
+        groups = set(groups) if groups is not None else None
+        videos = set(videos) if videos is not None else None
+
+        selected = []
+        for (group_num, video_num), runs in self.intervals.items():
+            matched = (
+                (groups is None or group_num in groups) and
+                (videos is None or video_num in videos)
+            )
+            if matched != invert:
+                selected.extend(runs)
+        return merge_intervals(selected)
+
+
+    def matching_bitmap(
+        self,
+        groups: Iterable[int] | None = None,
+        videos: Iterable[int] | None = None,
+        invert: bool = False
+    ) -> IdBitmap:
+        """matching_intervals as an IdBitmap filter"""
+        return IdBitmap.from_intervals(self.matching_intervals(groups, videos, invert))
@@ -0,0 +1,244 @@
+"""
+In-process vector repositories. The index is memory-mapped from disk and searched inside the API process,
+so there is no network hop and no Milvus stack to run. Both classes follow the KeyframeVectorRepository contract.
+"""
+
+
+import os
+import sys
+ROOT_DIR = os.path.abspath(
+    os.path.join(
+        os.path.dirname(__file__), '../'
+    )
+)
+sys.path.insert(0, ROOT_DIR)
+
+
+import asyncio
+import numpy as np
+from usearch.index import Index as USearchIndex, MetricKind
+from common.repository import VectorBaseRepository
+from index import IdBitmap
+from schema.interface import MilvusSearchRequest, MilvusSearchResult, MilvusSearchResponse
+
+try:
+    import faiss
+except ImportError:
+    faiss = None
+
+
+
+OVERSAMPLE_FACTOR = 4
+
+
+def _split_filter(request: MilvusSearchRequest, num_entities: int) -> tuple[np.ndarray | None, np.ndarray | None]:
+    """
+    (include_ids, exclude_ids) equivalent to the request's id_filter and exclude_ids, at most one is set.
+    A filter keeping at most half of the index (or any filter of an exact request) is listed positively,
+    a larger one by its complement.
+    """
+    excluded = IdBitmap.from_ids(request.exclude_ids) if request.exclude_ids else IdBitmap()
+    if request.id_filter is None:
+        return None, excluded.to_ids() if excluded else None
+
+    allowed = (request.id_filter & IdBitmap.full(num_entities)) - excluded
+    if request.exact or len(allowed) * 2 <= num_entities:
+        return allowed.to_ids(), None
+
+    denied = allowed.complement(num_entities).to_ids()
+    return None, denied if len(denied) else None
+
+
+def _to_search_response(
+    ids: np.ndarray,
+    scores: np.ndarray,
+    embeddings: np.ndarray | None = None
+) -> MilvusSearchResponse:
+    results = [
+        MilvusSearchResult(
+            id_=int(id_),
+            distance=float(score),
+            embedding=embeddings[i].tolist() if embeddings is not None else None
+        )
+        for i, (id_, score) in enumerate(zip(ids, scores))
+    ]
+    return MilvusSearchResponse(results=results, total_found=len(results))
+
+
+class USearchVectorRepository(VectorBaseRepository):
+    def __init__(self, index: USearchIndex):
+        self.index = index
+        # usearch returns distances, the service ranks by similarity (higher is better) like Milvus COSINE/IP
+        self._is_similarity_metric = index.metric_kind in (MetricKind.Cos, MetricKind.IP)
+
+    @classmethod
+    def from_path(cls, index_path: str, memory_map: bool = True) -> "USearchVectorRepository":
+        return cls(USearchIndex.restore(index_path, view=memory_map))
+
+    def _search(self, embedding: np.ndarray, top_k: int, exclude_ids: np.ndarray | None):
+        size = len(self.index)
+        count = top_k if exclude_ids is None else top_k * OVERSAMPLE_FACTOR
+
+        # usearch has no pre-filter in its python API: oversample until enough hits survive the exclusion
+        while True:
+            count = min(count, size)
+            matches = self.index.search(embedding, count)
+            keys = np.asarray(matches.keys, dtype=np.int64)
+            distances = np.asarray(matches.distances, dtype=np.float32)
+
+            if exclude_ids is not None:
+                keep = ~np.isin(keys, exclude_ids, assume_unique=True)
+                keys, distances = keys[keep], distances[keep]
+
+            if len(keys) >= top_k or count >= size:
+                break
+            count *= OVERSAMPLE_FACTOR
+
+        scores = 1.0 - distances if self._is_similarity_metric else -distances
+        return keys[:top_k], scores[:top_k]
+
+    def _score_candidates(
+        self,
+        embedding: np.ndarray,
+        candidate_ids: np.ndarray,
+        top_k: int
+    ):
+        """Exact scores over the candidate vectors only, in the same scale as _search"""
+        if len(candidate_ids) == 0:
+            return candidate_ids, np.empty(0, dtype=np.float32)
+
+        vectors = np.asarray(self.index.get(candidate_ids), dtype=np.float32)
+        if self.index.metric_kind == MetricKind.Cos:
+            norms = np.linalg.norm(vectors, axis=1) * (np.linalg.norm(embedding) or 1.0)
+            scores = (vectors @ embedding) / np.where(norms == 0, 1.0, norms)
+        elif self.index.metric_kind == MetricKind.IP:
+            scores = vectors @ embedding
+        else:
+            scores = -((vectors - embedding) ** 2).sum(axis=1)
+
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        return candidate_ids[order], scores[order].astype(np.float32)
+
+    async def search_by_embedding(
+        self,
+        request: MilvusSearchRequest
+    ):
+        if request.scalar_filter is not None:
+            raise ValueError("usearch backend does not store group/video scalar fields")
+
+        embedding = np.asarray(request.embedding, dtype=np.float32)
+        include_ids, exclude_ids = _split_filter(request, len(self.index))
+
+        if include_ids is not None:
+            # usearch cannot pre-filter, but a positive candidate set is cheap to score exactly
+            keys, scores = await asyncio.to_thread(self._score_candidates, embedding, include_ids, request.top_k)
+        else:
+            keys, scores = await asyncio.to_thread(self._search, embedding, request.top_k, exclude_ids)
+        vectors = self.index.get(keys) if request.include_embedding and len(keys) else None
+        return _to_search_response(keys, scores, vectors)
+
+    @property
+    def num_entities(self) -> int:
+        return len(self.index)
+
+    def get_all_id(self) -> IdBitmap:
+        return IdBitmap.full(self.num_entities)
+
+
+class FaissVectorRepository(VectorBaseRepository):
+    def __init__(self, index):
+        if faiss is None:
+            raise ImportError("faiss is not installed, run `uv sync --extra faiss` to use the FAISS backend")
+
+        self.index = index
+        self._is_similarity_metric = index.metric_type == faiss.METRIC_INNER_PRODUCT
+        self._is_ivf = faiss.try_extract_index_ivf(index) is not None
+
+    @classmethod
+    def from_path(cls, index_path: str, memory_map: bool = True) -> "FaissVectorRepository":
+        if faiss is None:
+            raise ImportError("faiss is not installed, run `uv sync --extra faiss` to use the FAISS backend")
+
+        io_flags = faiss.IO_FLAG_MMAP | faiss.IO_FLAG_READ_ONLY if memory_map else 0
+        return cls(faiss.read_index(index_path, io_flags))
+
+    def _score_candidates(
+        self,
+        embedding: np.ndarray,
+        candidate_ids: np.ndarray,
+        top_k: int
+    ):
+        """Exact scores over the reconstructed candidate vectors, in the same scale as _search"""
+        if len(candidate_ids) == 0:
+            return candidate_ids, np.empty(0, dtype=np.float32)
+
+        vectors = self.index.reconstruct_batch(candidate_ids)
+        if self._is_similarity_metric:
+            query = embedding.reshape(1, -1).copy()
+            faiss.normalize_L2(query)
+            scores = vectors @ query[0]
+        else:
+            scores = -((vectors - embedding) ** 2).sum(axis=1)
+
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        return candidate_ids[order], scores[order].astype(np.float32)
+
+    def _search(
+        self,
+        embedding: np.ndarray,
+        top_k: int,
+        exclude_ids: np.ndarray | None,
+        include_ids: np.ndarray | None = None
+    ):
+        query = embedding.reshape(1, -1)
+        if self._is_similarity_metric:
+            # Index built on L2-normalized vectors, inner product == cosine similarity
+            faiss.normalize_L2(query)
+
+        selector = None
+        if include_ids is not None:
+            # Positive selector over the candidates, no need to enumerate every other id
+            if len(include_ids) == 0:
+                return include_ids, np.empty(0, dtype=np.float32)
+            selector = faiss.IDSelectorBatch(include_ids.size, faiss.swig_ptr(include_ids))
+        elif exclude_ids is not None:
+            # Keep the inner selector referenced, IDSelectorNot only holds a raw pointer to it
+            excluded = faiss.IDSelectorBatch(exclude_ids.size, faiss.swig_ptr(exclude_ids))
+            selector = faiss.IDSelectorNot(excluded)
+
+        params = None
+        if selector is not None:
+            params_cls = faiss.SearchParametersIVF if self._is_ivf else faiss.SearchParameters
+            params = params_cls(sel=selector)
+
+        scores, ids = self.index.search(query, top_k, params=params)
+        scores, ids = scores[0], ids[0]
+
+        found = ids >= 0
+        ids, scores = ids[found], scores[found]
+        return ids, scores if self._is_similarity_metric else -scores
+
+    async def search_by_embedding(
+        self,
+        request: MilvusSearchRequest
+    ):
+        if request.scalar_filter is not None:
+            raise ValueError("FAISS backend does not store group/video scalar fields")
+
+        embedding = np.asarray(request.embedding, dtype=np.float32)
+        include_ids, exclude_ids = _split_filter(request, self.index.ntotal)
+
+        if request.exact and include_ids is not None:
+            # A filtered IVF search only probes nprobe lists and can miss candidates
+            ids, scores = await asyncio.to_thread(self._score_candidates, embedding, include_ids, request.top_k)
+        else:
+            ids, scores = await asyncio.to_thread(self._search, embedding, request.top_k, exclude_ids, include_ids)
+        vectors = self.index.reconstruct_batch(ids) if request.include_embedding and len(ids) else None
+        return _to_search_response(ids, scores, vectors)
+
+    @property
+    def num_entities(self) -> int:
+        return self.index.ntotal
+
+    def get_all_id(self) -> IdBitmap:
+        return IdBitmap.full(self.num_entities)
@@ -15,10 +15,16 @@ sys.path.insert(0, ROOT_DIR)
 
 
 from typing import cast
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from itertools import cycle
+import asyncio
+import time
 from common.repository import MilvusBaseRepository
+from index import IdBitmap
 from pymilvus import Collection as MilvusCollection
 from pymilvus.client.search_result import SearchResult
-from schema.interface import  MilvusSearchRequest, MilvusSearchResult, MilvusSearchResponse
+from schema.interface import  MilvusSearchRequest, MilvusSearchResult, MilvusSearchResponse, KeyframeScalarFilter
 
 
 
@@ -26,52 +32,173 @@ from schema.interface import  MilvusSearchRequest, MilvusSearchResult, MilvusSea
 
 
 
+SCALAR_FIELDS = ("group_num", "video_num", "keyframe_num")
+
+
 class KeyframeVectorRepository(MilvusBaseRepository):
     def __init__(
         self, 
         collection: MilvusCollection,
-        search_params: dict
+        search_params: dict,
+        pool: list[MilvusCollection] | None = None,
+        stats_ttl_s: float = 60.0
     ):
+        """
+        pool: handles on the same collection opened through different connection aliases. Searches are
+        blocking gRPC calls, so they run on a thread per handle and concurrent queries overlap instead of
+        queuing behind one channel on the event loop.
+        stats_ttl_s: how long the entity count is trusted before it is refreshed in the background
+        """
         
         super().__init__(collection)
         self.search_params = search_params
+        self.pool = pool or [collection]
+        self._next_collection = cycle(self.pool)
+        self._executor = ThreadPoolExecutor(max_workers=len(self.pool), thread_name_prefix="milvus-search")
+        self.supports_scalar_filter = set(SCALAR_FIELDS).issubset(
+            field.name for field in collection.schema.fields
+        )
+        self.stats_ttl_s = stats_ttl_s
+        self._stats_refresh_pending = False
+        self.refresh_stats()
+
+    @staticmethod
+    def _build_scalar_expr(scalar_filter: KeyframeScalarFilter) -> list[str]:
+        clauses = []
+        for field, include, exclude in (
+            ("group_num", scalar_filter.include_groups, scalar_filter.exclude_groups),
+            ("video_num", scalar_filter.include_videos, scalar_filter.exclude_videos),
+        ):
+            if include:
+                clauses.append(f"{field} in {sorted(set(include))}")
+            if exclude:
+                clauses.append(f"{field} not in {sorted(set(exclude))}")
+        if scalar_filter.min_keyframe_num is not None:
+            clauses.append(f"keyframe_num >= {scalar_filter.min_keyframe_num}")
+        if scalar_filter.max_keyframe_num is not None:
+            clauses.append(f"keyframe_num <= {scalar_filter.max_keyframe_num}")
+        return clauses
+
+    def _build_expr(self, request: MilvusSearchRequest) -> str | None:
+        clauses = []
+        if request.scalar_filter is not None:
+            if not self.supports_scalar_filter:
+                raise ValueError(
+                    f"Collection '{self.collection.name}' has no {'/'.join(SCALAR_FIELDS)} fields, "
+                    "re-run embedding_migration.py with --mapping_path"
+                )
+            clauses.extend(self._build_scalar_expr(request.scalar_filter))
+        if request.exclude_ids:
+            clauses.append(f"id not in {request.exclude_ids}")
+        if request.id_filter is not None:
+            # The bitmap picks the shortest of an `in` list, range predicates or a `not in` list of its gaps,
+            # none depends on the cached entity count, which lags behind ingestion
+            clauses.append(request.id_filter.to_milvus_expr())
+
+        if not clauses:
+            return None
+        return " and ".join(f"({clause})" for clause in clauses)
     
-    async def search_by_embedding(
+    async def _search(
         self,
-        request: MilvusSearchRequest
-    ):
-        expr = None
-        if request.exclude_ids:
-            expr = f"id not in {request.exclude_ids}"
+        embeddings: list[list[float]],
+        limit: int,
+        expr: str | None,
+        include_embedding: bool
+    ) -> list[list[MilvusSearchResult]]:
+        collection = next(self._next_collection)
         
-        search_results= cast(SearchResult, self.collection.search(
-            data=[request.embedding],
+        search = partial(
+            collection.search,
+            data=embeddings,
             anns_field="embedding",
             param=self.search_params,
-            limit=request.top_k,
+            limit=limit,
             expr=expr ,
-            output_fields=["id", "embedding"],
-            _async=False
-        ))
-
+            # The primary key and distance always come back, vectors are only shipped when asked for
+            output_fields=["embedding"] if include_embedding else [],
+        )
+        loop = asyncio.get_running_loop()
+        search_results = cast(SearchResult, await loop.run_in_executor(self._executor, search))
 
-        results = []
-        for hits in search_results:
-            for hit in hits:
-                result = MilvusSearchResult(
+        return [
+            [
+                MilvusSearchResult(
                     id_=hit.id,
                     distance=hit.distance,
-                    embedding=hit.entity.get("embedding") if hasattr(hit, 'entity') else None
+                    embedding=hit.entity.get("embedding") if include_embedding else None
                 )
-                results.append(result)
+                for hit in hits
+            ]
+            for hits in search_results
+        ]
+
+    async def search_by_embedding(
+        self,
+        request: MilvusSearchRequest
+    ):
+        # request.exact needs no special path, Milvus brute-forces searches whose filter keeps few entities
+        expr = self._build_expr(request)
+        (results,) = await self._search([request.embedding], request.top_k, expr, request.include_embedding)
         
         return MilvusSearchResponse(
             results=results,
             total_found=len(results),
         )
+
+    async def search_by_embeddings(
+        self,
+        requests: list[MilvusSearchRequest]
+    ) -> list[MilvusSearchResponse]:
+        """
+        Requests sharing the same filter go out as one nq=N search with the largest top_k,
+        each answer is then cut back to its own top_k
+        """
+        exprs = {self._build_expr(request) for request in requests}
+        include_embedding = {request.include_embedding for request in requests}
+        if len(exprs) != 1 or len(include_embedding) != 1:
+            return await super().search_by_embeddings(requests)
+
+        all_results = await self._search(
+            [request.embedding for request in requests],
+            max(request.top_k for request in requests),
+            exprs.pop(),
+            include_embedding.pop()
+        )
+        return [
+            MilvusSearchResponse(results=results[:request.top_k], total_found=len(results[:request.top_k]))
+            for request, results in zip(requests, all_results)
+        ]
     
-    def get_all_id(self) -> list[int]:
-        return list(range(self.collection.num_entities))
+    @property
+    def num_entities(self) -> int:
+        """
+        Cached entity count, never a server round trip: it is read on the event loop by the hybrid planner.
+        Once older than stats_ttl_s, one refresh is queued on the search threads and this read (and any read
+        until the refresh completes) still returns the previous count.
+        """
+        if not self._stats_refresh_pending and time.monotonic() - self._stats_loaded_at > self.stats_ttl_s:
+            self._stats_refresh_pending = True
+            self._executor.submit(self._refresh_stats_in_background)
+        return self._num_entities
+
+    def refresh_stats(self):
+        """Blocking collection.num_entities round trip, run it off the event loop"""
+        self._num_entities = self.collection.num_entities
+        self._stats_loaded_at = time.monotonic()
+
+    def _refresh_stats_in_background(self):
+        # A failed refresh keeps the previous count, the next read after the TTL tries again
+        try:
+            self.refresh_stats()
+        finally:
+            self._stats_refresh_pending = False
+
+    def get_all_id(self) -> IdBitmap:
+        return IdBitmap.full(self.num_entities)
+
+    def close(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
 
 
 
@@ -15,53 +15,72 @@ sys.path.insert(0, ROOT_DIR)
 from typing import Any
 from models.keyframe import Keyframe
 from common.repository import MongoBaseRepository
-from schema.interface import KeyframeInterface
+from schema.interface import KeyframeRow
 
 
 
 
+KEYFRAME_PROJECTION = {"_id": 0, "key": 1, "video_num": 1, "group_num": 1, "keyframe_num": 1}
+
+
+def _to_rows(documents: list[dict[str, Any]]) -> list[KeyframeRow]:
+    return [
+        KeyframeRow(doc["key"], doc["video_num"], doc["group_num"], doc["keyframe_num"])
+        for doc in documents
+    ]
+
+
 class KeyframeRepository(MongoBaseRepository[Keyframe]):
+    async def _find_rows(self, query: dict[str, Any], limit: int = 0) -> list[KeyframeRow]:
+        """
+        Only the four id fields travel over the wire, ocr_results / object_counts are never decoded
+        """
+        documents = await self.find_raw(query, KEYFRAME_PROJECTION, limit=limit)
+        return _to_rows(documents)
+
     async def get_keyframe_by_list_of_keys(
         self, keys: list[int]
     ):
-        result = await self.find({"key": {"$in": keys}})
-        return [
-            KeyframeInterface(
-                key=keyframe.key,
-                video_num=keyframe.video_num,
-                group_num=keyframe.group_num,
-                keyframe_num=keyframe.keyframe_num
-            ) for keyframe in result
+        return await self._find_rows({"key": {"$in": keys}})
 
-        ]
+    async def get_all_keyframe_rows(self) -> list[tuple[int, int, int, int]]:
+        """
+        (key, group_num, video_num, keyframe_num) of every keyframe
+        """
+        rows = await self._find_rows({})
+        return [(row.key, row.group_num, row.video_num, row.keyframe_num) for row in rows]
+
+    async def get_ocr_documents(self, min_key: int = -1) -> list[tuple[int, list[str]]]:
+        """
+        (key, ocr_results) of every keyframe with OCR text and key > min_key, feeds the OCR index
+        """
+        documents = await self.find_raw(
+            {"key": {"$gt": min_key}, "ocr_results.0": {"$exists": True}},
+            {"_id": 0, "key": 1, "ocr_results": 1}
+        )
+        return [(doc["key"], doc["ocr_results"]) for doc in documents]
+
+    async def get_object_count_documents(self) -> list[tuple[int, dict[str, int]]]:
+        """
+        (key, object_counts) of every keyframe with detections, feeds the object-count matrix
+        """
+        documents = await self.find_raw(
+            {"object_counts": {"$exists": True, "$ne": {}}},
+            {"_id": 0, "key": 1, "object_counts": 1}
+        )
+        return [(doc["key"], doc["object_counts"]) for doc in documents]
 
     async def get_keyframe_by_video_num(
         self, 
         video_num: int,
     ):
-        result = await self.find({"video_num": video_num})
-        return [
-            KeyframeInterface(
-                key=keyframe.key,
-                video_num=keyframe.video_num,
-                group_num=keyframe.group_num,
-                keyframe_num=keyframe.keyframe_num
-            ) for keyframe in result
-        ]
+        return await self._find_rows({"video_num": video_num})
 
     async def get_keyframe_by_keyframe_num(
         self, 
         keyframe_num: int,
     ):
-        result = await self.find({"keyframe_num": keyframe_num})
-        return [
-            KeyframeInterface(
-                key=keyframe.key,
-                video_num=keyframe.video_num,
-                group_num=keyframe.group_num,
-                keyframe_num=keyframe.keyframe_num
-            ) for keyframe in result
-        ]
+        return await self._find_rows({"keyframe_num": keyframe_num})
 
     async def search_by_ocr(
         self,
@@ -75,15 +94,7 @@ class KeyframeRepository(MongoBaseRepository[Keyframe]):
         else:
             query = {"ocr_results": {"$elemMatch": {"$regex": ocr_query, "$options": "i"}}}
         
-        result = await self.find(query, limit=limit)
-        return [
-            KeyframeInterface(
-                key=keyframe.key,
-                video_num=keyframe.video_num,
-                group_num=keyframe.group_num,
-                keyframe_num=keyframe.keyframe_num
-            ) for keyframe in result
-        ]
+        return await self._find_rows(query, limit=limit)
     
 
     
@@ -101,7 +112,7 @@ class KeyframeRepository(MongoBaseRepository[Keyframe]):
             limit: số lượng kết quả tối đa
         
         Returns:
-            List[KeyframeInterface]
+            List[KeyframeRow]
         """
         query_conditions = [
             {f"object_counts.{obj}": {"$gte": count}}
@@ -110,15 +121,7 @@ class KeyframeRepository(MongoBaseRepository[Keyframe]):
         
         query = {"$and": query_conditions} if query_conditions else {}
         
-        result = await self.find(query, limit=limit)
-        return [
-            KeyframeInterface(
-                key=keyframe.key,
-                video_num=keyframe.video_num,
-                group_num=keyframe.group_num,
-                keyframe_num=keyframe.keyframe_num
-            ) for keyframe in result
-        ]
+        return await self._find_rows(query, limit=limit)
 
 
 
@@ -0,0 +1,184 @@
+"""
+Exact brute-force vector repository over a memory-mapped embedding matrix (.npy, float16 or float32).
+
+The scan is split into row chunks searched in parallel on a thread pool (numpy releases the GIL inside matmul),
+each chunk keeps its local top_k with argpartition and the partial results are merged at the end.
+Filters are plain boolean masks indexed by id, so filtered searches keep exact recall at no extra cost.
+"""
+
+
+import os
+import sys
+ROOT_DIR = os.path.abspath(
+    os.path.join(
+        os.path.dirname(__file__), '../'
+    )
+)
+sys.path.insert(0, ROOT_DIR)
+
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import numpy as np
+from common.repository import VectorBaseRepository
+from index import IdBitmap
+from schema.interface import MilvusSearchRequest, MilvusSearchResult, MilvusSearchResponse
+
+
+
+CHUNK_SIZE = 16384
+# Below num_entities / CANDIDATE_SCAN_RATIO filtered ids, gathering their rows beats a masked full scan
+CANDIDATE_SCAN_RATIO = 8
+
+
+class NumpyVectorRepository(VectorBaseRepository):
+    def __init__(
+        self,
+        embeddings: np.ndarray,
+        num_threads: int | None = None,
+        chunk_size: int = CHUNK_SIZE
+    ):
+        self.embeddings = embeddings
+        self.chunk_size = chunk_size
+        self.executor = ThreadPoolExecutor(
+            max_workers=num_threads or os.cpu_count(),
+            thread_name_prefix="numpy-search"
+        )
+        self.inv_norms = self._compute_inv_norms()
+
+    @classmethod
+    def from_path(cls, embedding_path: str, **kwargs) -> "NumpyVectorRepository":
+        return cls(np.load(embedding_path, mmap_mode='r'), **kwargs)
+
+    @property
+    def num_entities(self) -> int:
+        return self.embeddings.shape[0]
+
+    def _chunks(self):
+        return [
+            (start, min(start + self.chunk_size, self.num_entities))
+            for start in range(0, self.num_entities, self.chunk_size)
+        ]
+
+    def _compute_inv_norms(self) -> np.ndarray:
+        """Cosine similarity == dot product scaled by the inverse row norms, computed once at load"""
+        inv_norms = np.empty(self.num_entities, dtype=np.float32)
+        for start, end in self._chunks():
+            norms = np.linalg.norm(self.embeddings[start:end].astype(np.float32), axis=1)
+            norms[norms == 0] = 1.0
+            inv_norms[start:end] = 1.0 / norms
+        return inv_norms
+
+    def build_allow_mask(self, request: MilvusSearchRequest) -> np.ndarray | None:
+        """Combine id_filter and exclude_ids into one mask, None means every id is allowed"""
+        if request.id_filter is None and not request.exclude_ids:
+            return None
+
+        if request.id_filter is not None:
+            # Chunks left without any allowed id are then skipped by the scan
+            allow_mask = request.id_filter.to_mask(self.num_entities)
+        else:
+            allow_mask = np.ones(self.num_entities, dtype=bool)
+        if request.exclude_ids:
+            exclude_ids = np.asarray(request.exclude_ids, dtype=np.int64)
+            allow_mask[exclude_ids[exclude_ids < self.num_entities]] = False
+        return allow_mask
+
+    def _scan_chunk(
+        self,
+        start: int,
+        end: int,
+        query: np.ndarray,
+        top_k: int,
+        allow_mask: np.ndarray | None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        chunk_mask = allow_mask[start:end] if allow_mask is not None else None
+        if chunk_mask is not None and not chunk_mask.any():
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        scores = self.embeddings[start:end].astype(np.float32) @ query
+        scores *= self.inv_norms[start:end]
+        if chunk_mask is not None:
+            scores[~chunk_mask] = -np.inf
+
+        k = min(top_k, end - start)
+        local = np.argpartition(scores, -k)[-k:]
+        local = local[np.isfinite(scores[local])]
+        return local + start, scores[local]
+
+    async def search(
+        self,
+        embedding: np.ndarray,
+        top_k: int,
+        allow_mask: np.ndarray | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        Exact top_k cosine search restricted to the ids where allow_mask is True
+        Returns (ids, scores) sorted by descending score
+        """
+        query = np.asarray(embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+
+        loop = asyncio.get_running_loop()
+        partials = await asyncio.gather(*[
+            loop.run_in_executor(self.executor, self._scan_chunk, start, end, query, top_k, allow_mask)
+            for start, end in self._chunks()
+        ])
+        if not partials:
+            # Empty matrix, no chunk to scan
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        ids = np.concatenate([ids for ids, _ in partials])
+        scores = np.concatenate([scores for _, scores in partials])
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        return ids[order], scores[order]
+
+    def _score_candidates(
+        self,
+        embedding: np.ndarray,
+        candidate_ids: np.ndarray,
+        top_k: int
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """Exact cosine over the candidate rows only, cost proportional to the candidate count"""
+        query = np.asarray(embedding, dtype=np.float32)
+        query = query / (np.linalg.norm(query) or 1.0)
+
+        scores = (self.embeddings[candidate_ids].astype(np.float32) @ query) * self.inv_norms[candidate_ids]
+        order = np.argsort(-scores, kind="stable")[:top_k]
+        return candidate_ids[order], scores[order]
+
+    def _candidate_ids(self, request: MilvusSearchRequest) -> np.ndarray:
+        """Ids of a small id_filter that exist in the matrix, minus exclude_ids"""
+        candidate_ids = request.id_filter.to_ids()
+        candidate_ids = candidate_ids[candidate_ids < self.num_entities]
+        if request.exclude_ids:
+            candidate_ids = np.setdiff1d(candidate_ids, request.exclude_ids)
+        return candidate_ids
+
+    async def search_by_embedding(
+        self,
+        request: MilvusSearchRequest
+    ):
+        if request.scalar_filter is not None:
+            raise ValueError("numpy backend does not store group/video scalar fields")
+
+        if request.id_filter is not None and len(request.id_filter) * CANDIDATE_SCAN_RATIO <= self.num_entities:
+            ids, scores = await asyncio.to_thread(
+                self._score_candidates, request.embedding, self._candidate_ids(request), request.top_k
+            )
+        else:
+            ids, scores = await self.search(request.embedding, request.top_k, self.build_allow_mask(request))
+        vectors = self.embeddings[ids] if request.include_embedding else None
+
+        results = [
+            MilvusSearchResult(
+                id_=int(id_),
+                distance=float(score),
+                embedding=vectors[i].astype(np.float32).tolist() if vectors is not None else None
+            )
+            for i, (id_, score) in enumerate(zip(ids, scores))
+        ]
+        return MilvusSearchResponse(results=results, total_found=len(results))
+
+    def get_all_id(self) -> IdBitmap:
+        return IdBitmap.full(self.num_entities)
@@ -0,0 +1,97 @@
+"""
+Vector search over embedded OCR lines (migration/ocr_embedding_migration.py), answered per keyframe.
+
+The collection holds one vector per OCR line, its ids are line numbers and line_keys maps each line back to
+the keyframe key it was read from. Any vector backend can hold the lines (Milvus collection, usearch, FAISS
+or a numpy matrix), this class only asks it for the nearest lines and keeps the best line of every keyframe.
+"""
+
+
+import os
+import sys
+ROOT_DIR = os.path.abspath(
+    os.path.join(
+        os.path.dirname(__file__), '../'
+    )
+)
+sys.path.insert(0, ROOT_DIR)
+
+
+import numpy as np
+from common.repository import VectorBaseRepository
+from index import IdBitmap
+from schema.interface import MilvusSearchRequest
+
+
+# A keyframe usually shows a few near-duplicate lines (caption, ticker, logo), fetch this many per keyframe
+LINES_PER_KEYFRAME = 4
+# MilvusSearchRequest.top_k upper bound
+MAX_LINE_LIMIT = 1000
+
+
+class OcrLineVectorRepository:
+    def __init__(self, line_repo: VectorBaseRepository, line_keys: np.ndarray):
+        self.line_repo = line_repo
+        self.line_keys = np.asarray(line_keys, dtype=np.int64)
+        # The migration writes lines in key order, so the lines of a keyframe are one contiguous id range
+        self._keys_sorted = bool(np.all(self.line_keys[1:] >= self.line_keys[:-1]))
+
+    @classmethod
+    def from_path(cls, line_repo: VectorBaseRepository, line_keys_path: str) -> "OcrLineVectorRepository":
+        return cls(line_repo, np.load(line_keys_path))
+
+    def __len__(self) -> int:
+        return len(self.line_keys)
+
+    def line_filter(self, key_filter: IdBitmap) -> IdBitmap:
+        """Ids of the lines read from the keyframes in key_filter"""
+        if not self._keys_sorted:
+            return IdBitmap.from_ids(np.flatnonzero(key_filter.contains_many(self.line_keys)))
+
+        # One line range per keyframe, consecutive keyframes' ranges touch and are merged into one run
+        keys = key_filter.to_ids()
+        starts = np.searchsorted(self.line_keys, keys, side="left")
+        ends = np.searchsorted(self.line_keys, keys, side="right")
+        return IdBitmap.from_runs(starts, ends)
+
+    async def search(
+        self,
+        embedding: list[float],
+        top_k: int,
+        key_filter: IdBitmap | None = None
+    ) -> tuple[np.ndarray, np.ndarray]:
+        """
+        (sorted keys, similarities) of the keyframes owning the lines nearest to embedding, up to top_k
+        keyframes, each scored by the cosine similarity of its best line. key_filter restricts the search
+        itself to the lines of those keyframes, so a selective filter still yields its best matches.
+        """
+        id_filter = None
+        if key_filter is not None:
+            id_filter = self.line_filter(key_filter)
+            if not id_filter:
+                return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        search_response = await self.line_repo.search_by_embedding(
+            MilvusSearchRequest(
+                embedding=embedding,
+                top_k=min(top_k * LINES_PER_KEYFRAME, MAX_LINE_LIMIT),
+                id_filter=id_filter
+            )
+        )
+        line_ids = np.fromiter(
+            (hit.id_ for hit in search_response.results), dtype=np.int64, count=len(search_response.results)
+        )
+        similarities = np.fromiter(
+            (hit.distance for hit in search_response.results), dtype=np.float32, count=len(search_response.results)
+        )
+        known = (line_ids >= 0) & (line_ids < len(self.line_keys))
+        keys, similarities = self.line_keys[line_ids[known]], similarities[known]
+
+        # Best line first, np.unique then keeps the first (best) occurrence of every key
+        order = np.argsort(-similarities, kind="stable")
+        keys, similarities = keys[order], similarities[order]
+        best_keys, first = np.unique(keys, return_index=True)
+        best_similarities = similarities[first]
+
+        kept = np.sort(np.argsort(-best_similarities, kind="stable")[:top_k])
+        return best_keys[kept], best_similarities[kept]
@@ -5,13 +5,15 @@ from typing import List, Optional
 
 from schema.request import (
     TextSearchRequest,
+    BatchTextSearchRequest,
     TextSearchWithExcludeGroupsRequest,
     TextSearchWithSelectedGroupsAndVideosRequest,
     MetadataSearchRequest,
     HybridSearchRequest,
     ObjectSearchRequest,
+    MappingReloadRequest,
 )
-from schema.response import KeyframeServiceReponse, SingleKeyframeDisplay, KeyframeDisplay
+from schema.response import KeyframeServiceReponse, SingleKeyframeDisplay, KeyframeDisplay, BatchKeyframeDisplay, HybridKeyframeDisplay, MappingReloadResponse, EmbeddingCacheStatsResponse
 from controller.query_controller import QueryController
 from core.dependencies import get_query_controller
 from core.logger import SimpleLogger
@@ -85,6 +87,68 @@ async def search_keyframes(
 
 
 
+@router.post(
+    "/search/batch",
+    response_model=BatchKeyframeDisplay,
+    summary="Batch text search for keyframes",
+    description="""
+    Answer several independent text searches in one request.
+
+    All queries are encoded in a single model batch, searched with one multi-vector
+    vector search and resolved with one metadata lookup, which is much cheaper than
+    sending them one by one to `/search`.
+
+    **Parameters:**
+    - **queries**: List of text searches (1-64), each with its own `query`, `top_k` and `score_threshold`
+
+    **Returns:**
+    One result list per query, in the same order as the request.
+
+    **Example:**
+    ```json
+    {
+        "queries": [
+            {"query": "person walking in the park", "top_k": 5},
+            {"query": "sunset over mountains", "top_k": 10, "score_threshold": 0.2}
+        ]
+    }
+    ```
+    """,
+    response_description="Matching keyframes for every query, in request order"
+)
+async def search_keyframes_batch(
+    request: BatchTextSearchRequest,
+    controller: QueryController = Depends(get_query_controller)
+):
+    """
+    Search for keyframes for several text queries at once.
+    """
+
+    logger.info(f"Batch text search request: {len(request.queries)} queries")
+
+    batch_results = await controller.search_text_batch(
+        queries=[q.query for q in request.queries],
+        top_ks=[q.top_k for q in request.queries],
+        score_thresholds=[q.score_threshold for q in request.queries]
+    )
+
+    logger.info(f"Found {[len(results) for results in batch_results]} results for batch queries")
+
+    return BatchKeyframeDisplay(
+        results=[
+            KeyframeDisplay(
+                results=[
+                    SingleKeyframeDisplay(path=path, score=score)
+                    for path, score in map(controller.convert_model_to_path, results)
+                ]
+            )
+            for results in batch_results
+        ]
+    )
+
+
+
+
 @router.post(
     "/search/exclude-groups",
     response_model=KeyframeDisplay,
@@ -229,12 +293,13 @@ async def search_keyframes_selected_groups_videos(
     Search for keyframes based on OCR text results only (no embedding similarity).
     
     This endpoint searches through the OCR text extracted from keyframes to find 
-    matches based on text content.
+    matches based on text content, ranked by BM25 relevance of the OCR text.
     
     **Parameters:**
     - **ocr_query**: The OCR text to search for
     - **top_k**: Maximum number of results to return (1-500, default: 10)
     - **case_sensitive**: Whether the search should be case sensitive (default: False)
+    - **fuzzy**: Also match OCR words within 2 typos of the query words, e.g. `vlet nam` finds `Việt Nam` (default: False)
     
     **Returns:**
     List of keyframes with their paths and confidence scores.
@@ -262,7 +327,8 @@ async def search_keyframes_by_metadata(
     results = await controller.search_by_metadata_only(
         ocr_query=request.ocr_query,
         top_k=request.top_k,
-        case_sensitive=request.case_sensitive
+        case_sensitive=request.case_sensitive,
+        fuzzy=request.fuzzy
     )
     
     logger.info(f"Found {len(results)} results for OCR query: '{request.ocr_query}'")
@@ -278,7 +344,7 @@ async def search_keyframes_by_metadata(
 
 @router.post(
     "/search/hybrid",
-    response_model=KeyframeDisplay,
+    response_model=HybridKeyframeDisplay,
     summary="Enhanced hybrid search",
     description="""
     Search for keyframes using enhanced hybrid approach combining text embedding, OCR metadata, and object detection.
@@ -291,18 +357,28 @@ async def search_keyframes_by_metadata(
     **At least one search criteria must be provided.**
     
     **How it works:**
-    1. Filters by OCR and/or objects first (mandatory filters if provided)
-    2. Performs semantic search only within that filtered set (if query provided)
-    3. Results are ranked by embedding similarity (if query provided) or metadata relevance
+    1. Estimates how many keyframes pass the OCR and/or object filters and picks a plan:
+       `exact_scan` (few candidates, all scored), `filtered_ann` (candidates pushed into the vector search)
+       or `post_filter` (unselective filters checked on the hits of a plain, oversampled vector search)
+    2. Every result matches all provided filters. With both query and ocr_query results are ranked by
+       `embedding_weight * cosine + metadata_weight * BM25` of the OCR text, with query only by embedding
+       similarity, with ocr_query only by BM25
+    3. With `semantic_ocr`, OCR is no longer a filter: the keyframe and embedded OCR line collections are
+       searched concurrently and fused with `metadata_weight * similarity` of the best OCR line (plan
+       `semantic_ocr`). Lines and ocr_query are embedded by the multilingual OCR_TEXT_MODEL, so paraphrases
+       and other languages than the OCR's can match
+    4. The executed plan and its estimates are returned in `plan`
     
     **Parameters:**
     - **query**: Optional search text for semantic similarity
     - **ocr_query**: Optional OCR text to search for
-    - **object_filters**: Optional object detection filters with minimum counts
+    - **object_filters**: Optional object detection filters with minimum counts (each at least 1)
     - **top_k**: Maximum number of results to return
     - **score_threshold**: Minimum confidence score for embedding similarity
     - **case_sensitive**: Whether OCR search is case sensitive
-    - **embedding_weight/metadata_weight**: Kept for API compatibility
+    - **fuzzy**: Also match OCR words within 2 typos of the ocr_query words
+    - **semantic_ocr**: Match ocr_query by meaning against the embedded OCR lines, ignored unless the OCR vector collection is configured
+    - **embedding_weight/metadata_weight**: Weights of the embedding and OCR BM25 scores when both query and ocr_query are given
     
     **Example:**
     ```json
@@ -337,7 +413,7 @@ async def search_keyframes_hybrid(
     logger.info(f"Hybrid search request: query='{request.query}', ocr_query='{request.ocr_query}', "
                f"embedding_weight={request.embedding_weight}, metadata_weight={request.metadata_weight}")
     
-    results = await controller.search_by_hybrid(
+    results, plan = await controller.search_by_hybrid(
         query=request.query,
         ocr_query=request.ocr_query,
         object_filters=request.object_filters,
@@ -345,10 +421,12 @@ async def search_keyframes_hybrid(
         score_threshold=request.score_threshold,
         embedding_weight=request.embedding_weight,
         metadata_weight=request.metadata_weight,
-        case_sensitive=request.case_sensitive
+        case_sensitive=request.case_sensitive,
+        fuzzy=request.fuzzy,
+        semantic_ocr=request.semantic_ocr
     )
     
-    logger.info(f"Found {len(results)} results for hybrid query")
+    logger.info(f"Found {len(results)} results for hybrid query, plan={plan.plan.value}")
     
     display_results = list(
         map(
@@ -356,7 +434,7 @@ async def search_keyframes_hybrid(
             map(controller.convert_model_to_path, results)
         )
     )
-    return KeyframeDisplay(results=display_results)
+    return HybridKeyframeDisplay(results=display_results, plan=plan)
 
 
 @router.post(
@@ -370,7 +448,7 @@ async def search_keyframes_hybrid(
     with minimum occurrence counts.
     
     **Parameters:**
-    - **object_filters**: Dictionary of object names and minimum counts
+    - **object_filters**: Dictionary of object names and minimum counts (each at least 1)
     - **top_k**: Maximum number of results to return
     
     **Example:**
@@ -407,6 +485,78 @@ async def search_keyframes_by_objects(
     )
     return KeyframeDisplay(results=display_results)
 
-    
 
 
+@router.post(
+    "/mapping/reload",
+    response_model=MappingReloadResponse,
+    summary="Reload the id2index mapping",
+    description="""
+    Re-read the id2index mapping and swap it into the running query controller.
+
+    The new mapping is fully loaded before it replaces the old one, so requests that are
+    already in flight finish against the previous mapping. Use this to bring a new batch
+    live without restarting the server. When OCR_INDEX_ENABLED, the OCR indexes also pick up the
+    keyframes ingested since the last load, and when OBJECT_INDEX_ENABLED the object-count matrix is
+    rebuilt for the new table, before the response is returned.
+
+    **Parameters:**
+    - **id2index_path**: Optional name of the new mapping file, a `.json` file in the directory of the
+      configured ID2INDEX_PATH (default: the currently loaded file). Other paths are rejected with 403
+    """
+)
+async def reload_mapping(
+    request: MappingReloadRequest,
+    controller: QueryController = Depends(get_query_controller)
+):
+    """
+    Reload the id2index mapping without restarting the server.
+    """
+
+    logger.info(f"Mapping reload request: id2index_path={request.id2index_path}")
+
+    try:
+        video_index = await controller.reload_mapping(request.id2index_path)
+    except PermissionError as e:
+        logger.warning(f"Rejected mapping reload: {str(e)}")
+        raise HTTPException(
+            status_code=403,
+            detail="id2index_path must be a .json file in the mapping directory"
+        )
+    except (OSError, ValueError) as e:
+        logger.error(f"Failed to reload mapping: {str(e)}")
+        raise HTTPException(
+            status_code=400,
+            detail="Failed to reload mapping, see the server log"
+        )
+
+    logger.info(f"Mapping reloaded: {video_index.num_ids} ids in {len(video_index.intervals)} videos")
+
+    return MappingReloadResponse(
+        id2index_path=str(controller.id2index_path),
+        num_ids=video_index.num_ids,
+        num_videos=len(video_index.intervals)
+    )
+
+
+
+@router.get(
+    "/cache/stats",
+    response_model=EmbeddingCacheStatsResponse,
+    summary="Query embedding cache statistics",
+    description="""
+    Counters of the LRU cache of text query embeddings since the server started.
+
+    A low hit_rate under real traffic means EMBEDDING_CACHE_SIZE is too small for the
+    set of queries that repeat, a high evictions count points the same way.
+    """
+)
+async def embedding_cache_stats(
+    controller: QueryController = Depends(get_query_controller)
+):
+    info = controller.model_service.cache.cache_info()
+    lookups = info["hits"] + info["misses"]
+    return EmbeddingCacheStatsResponse(
+        **info,
+        hit_rate=info["hits"] / lookups if lookups else 0.0
+    )
@@ -1,5 +1,15 @@
-from pydantic import BaseModel, Field
-from typing import List, Optional
+from pydantic import BaseModel, ConfigDict, Field
+from typing import List, NamedTuple, Optional
+
+from index import IdBitmap
+
+class KeyframeRow(NamedTuple):
+    """Lean read-path result, same fields as KeyframeInterface without pydantic validation"""
+    key: int
+    video_num: int
+    group_num: int
+    keyframe_num: int
+
 
 class KeyframeInterface(BaseModel):
     key: int = Field(..., description="Keyframe key")
@@ -10,10 +20,33 @@ class KeyframeInterface(BaseModel):
 
 
 
+class KeyframeScalarFilter(BaseModel):
+    """Structured filter on the group_num/video_num/keyframe_num scalar fields, empty means no constraint"""
+    include_groups: Optional[List[int]] = Field(default=None, description="Only keep keyframes from these groups")
+    exclude_groups: Optional[List[int]] = Field(default=None, description="Drop keyframes from these groups")
+    include_videos: Optional[List[int]] = Field(default=None, description="Only keep keyframes from these videos")
+    exclude_videos: Optional[List[int]] = Field(default=None, description="Drop keyframes from these videos")
+    min_keyframe_num: Optional[int] = Field(default=None, description="Lowest keyframe number to keep")
+    max_keyframe_num: Optional[int] = Field(default=None, description="Highest keyframe number to keep")
+
+
 class MilvusSearchRequest(BaseModel):
+    model_config = ConfigDict(arbitrary_types_allowed=True)
+
     embedding: List[float] = Field(..., description="Query embedding vector")
     top_k: int = Field(default=10, ge=1, le=1000, description="Number of top results to return")
     exclude_ids: Optional[List[int]] = Field(default=None, description="IDs to exclude from search results")
+    id_filter: Optional[IdBitmap] = Field(default=None, description="Only IDs in this bitmap are searched")
+    exact: bool = Field(default=False, description="Score every ID of a small id_filter exactly instead of running an approximate filtered search")
+    scalar_filter: Optional[KeyframeScalarFilter] = Field(default=None, description="Filter on the group/video/keyframe scalar fields")
+    include_embedding: bool = Field(default=False, description="Also return the stored vector of every hit, e.g. for reranking")
+
+
+class SearchRounds(BaseModel):
+    """Counters of one adaptively oversampled search"""
+    rounds: int = Field(default=0, description="Number of searches issued")
+    limit: int = Field(..., description="Hits requested by the last round")
+    complete: bool = Field(default=False, description="No hit that passes the filters was left unfetched")
 
 
 class MilvusSearchResult(BaseModel):
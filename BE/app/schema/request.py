@@ -1,5 +1,9 @@
 from pydantic import BaseModel, Field
-from typing import List, Optional
+from typing import Annotated, List, Optional
+
+
+# An object filter asks for at least one detection, a min_count of 0 would match keyframes without the class
+ObjectMinCount = Annotated[int, Field(ge=1)]
 
 
 class BaseSearchRequest(BaseModel):
@@ -14,6 +18,11 @@ class TextSearchRequest(BaseSearchRequest):
     pass
 
 
+class BatchTextSearchRequest(BaseModel):
+    """Several independent text searches answered in one round"""
+    queries: List[TextSearchRequest] = Field(..., min_length=1, max_length=64, description="Text searches, each with its own top_k and score_threshold")
+
+
 class TextSearchWithExcludeGroupsRequest(BaseSearchRequest):
     """Text search request with group exclusion"""
     exclude_groups: List[int] = Field(
@@ -39,23 +48,29 @@ class MetadataSearchRequest(BaseModel):
     ocr_query: str = Field(..., description="OCR text to search for", min_length=1)
     top_k: int = Field(default=10, ge=1, le=500, description="Number of top results to return")
     case_sensitive: bool = Field(default=False, description="Whether search is case sensitive")
+    fuzzy: bool = Field(default=False, description="Also match OCR words within 2 typos of the query words (ignores case_sensitive)")
 
 
 class HybridSearchRequest(BaseModel):
     """Enhanced hybrid search combining text embedding, OCR metadata, and object detection"""
     query: Optional[str] = Field(default=None, description="Search query text for semantic similarity", min_length=1, max_length=1000)
     ocr_query: Optional[str] = Field(default=None, description="OCR text to search for")
-    object_filters: Optional[dict[str, int]] = Field(default=None, description="Object filters with minimum counts (e.g., {'person': 2, 'car': 1})")
+    object_filters: Optional[dict[str, ObjectMinCount]] = Field(default=None, description="Object filters with minimum counts (e.g., {'person': 2, 'car': 1})")
     top_k: int = Field(default=10, ge=1, le=500, description="Number of top results to return")
     score_threshold: float = Field(default=0.0, ge=0.0, le=1.0, description="Minimum confidence score threshold")
     case_sensitive: bool = Field(default=False, description="Whether OCR search is case sensitive")
-    embedding_weight: float = Field(default=0.7, ge=0.0, le=1.0, description="Weight for embedding similarity (kept for compatibility)")
-    metadata_weight: float = Field(default=0.3, ge=0.0, le=1.0, description="Weight for metadata match (kept for compatibility)")
+    fuzzy: bool = Field(default=False, description="Also match OCR words within 2 typos of the OCR query words (ignores case_sensitive)")
+    semantic_ocr: bool = Field(default=False, description="Match the OCR query by meaning against the embedded OCR lines instead of by its words, needs the OCR vector collection")
+    embedding_weight: float = Field(default=0.7, ge=0.0, le=1.0, description="Weight of the embedding cosine similarity in the fused score")
+    metadata_weight: float = Field(default=0.3, ge=0.0, le=1.0, description="Weight of the OCR relevance (BM25, or line similarity with semantic_ocr) in the fused score")
 
 
 class ObjectSearchRequest(BaseModel):
     """Search request for object detection-based search"""
-    object_filters: dict[str, int] = Field(..., description="Object filters with minimum counts (e.g., {'person': 2, 'car': 1})")
+    object_filters: dict[str, ObjectMinCount] = Field(..., description="Object filters with minimum counts (e.g., {'person': 2, 'car': 1})")
     top_k: int = Field(default=10, ge=1, le=500, description="Number of top results to return")
 
 
+class MappingReloadRequest(BaseModel):
+    """Request to reload the id2index mapping used for group/video filtering"""
+    id2index_path: Optional[str] = Field(default=None, description="Name of the new id2index JSON file in the mapping directory, defaults to the currently loaded one")
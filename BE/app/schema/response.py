@@ -1,5 +1,6 @@
 from pydantic import BaseModel, Field
 from typing import List, Optional
+from enum import Enum
 
 
 class KeyframeServiceReponse(BaseModel):
@@ -14,4 +15,47 @@ class SingleKeyframeDisplay(BaseModel):
     score: float
 
 class KeyframeDisplay(BaseModel):
-    results: list[SingleKeyframeDisplay]
\ No newline at end of file
+    results: list[SingleKeyframeDisplay]
+
+class BatchKeyframeDisplay(BaseModel):
+    results: list[KeyframeDisplay]
+
+
+class HybridPlan(str, Enum):
+    METADATA_ONLY = "metadata_only"
+    ANN = "ann"
+    EXACT_SCAN = "exact_scan"
+    FILTERED_ANN = "filtered_ann"
+    POST_FILTER = "post_filter"
+    SEMANTIC_OCR = "semantic_ocr"
+
+
+class HybridPlanReport(BaseModel):
+    plan: HybridPlan = Field(..., description="How the hybrid query was executed")
+    num_entities: int = Field(..., description="Number of vectors in the collection")
+    filter_estimates: dict[str, Optional[int]] = Field(default_factory=dict, description="Estimated keyframes matching each filter, None without index statistics")
+    estimated_candidates: Optional[int] = Field(default=None, description="Estimated keyframes passing every filter")
+    candidates: Optional[int] = Field(default=None, description="Keyframes passing every filter, when they were materialized")
+    ann_limit: Optional[int] = Field(default=None, description="Hits requested by the last round of the unfiltered vector search of post_filter")
+    rounds: Optional[int] = Field(default=None, description="Oversampling rounds post_filter needed")
+    post_filtered: Optional[int] = Field(default=None, description="Hits of the unfiltered vector search that passed the filters")
+    fallback: Optional[HybridPlan] = Field(default=None, description="Plan re-run after post_filter ran out of rounds before top_k hits passed")
+
+
+class HybridKeyframeDisplay(KeyframeDisplay):
+    plan: HybridPlanReport
+
+
+class MappingReloadResponse(BaseModel):
+    id2index_path: str
+    num_ids: int
+    num_videos: int
+
+
+class EmbeddingCacheStatsResponse(BaseModel):
+    hits: int
+    misses: int
+    evictions: int
+    size: int
+    max_size: int
+    hit_rate: float
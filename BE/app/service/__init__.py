@@ -1,3 +1,5 @@
 from .model_service import ModelService
+from .encoder_executor import EncoderExecutor
+from .embedding_batcher import EmbeddingBatcher
 from .search_service import KeyframeQueryService
 
@@ -0,0 +1,101 @@
+import asyncio
+import numpy as np
+
+from .model_service import ModelService, normalize_query
+from .encoder_executor import EncoderExecutor
+
+
+class EmbeddingBatcher:
+    """
+    Dynamic micro-batching in front of ModelService.
+
+    Queries arriving within max_wait_ms of each other (or until max_batch_size is reached) are
+    tokenized and encoded in one forward pass, and every caller gets back its own row.
+    Cache hits are answered immediately without joining a batch, the encoding itself runs on the
+    EncoderExecutor so the event loop keeps serving other requests meanwhile.
+    """
+
+    def __init__(
+        self,
+        model_service: ModelService,
+        max_batch_size: int = 32,
+        max_wait_ms: float = 5.0,
+        encoder: EncoderExecutor | None = None
+    ):
+        self.model_service = model_service
+        self.encoder = encoder or EncoderExecutor(model_service)
+        self.max_batch_size = max_batch_size
+        self.max_wait = max_wait_ms / 1000
+        self._pending: dict[str, list[asyncio.Future]] = {}
+        self._flush_handle: asyncio.TimerHandle | None = None
+        self._running: set[asyncio.Task] = set()
+        self.batches = 0
+        self.batched_queries = 0
+
+    async def embed(self, query_text: str) -> np.ndarray:
+        """
+        Return (1, ndim) numpy.ndarray, same contract as ModelService.embedding
+        """
+        cached = self.model_service.cache.get(self.model_service.cache_key(query_text))
+        if cached is not None:
+            return cached.copy()
+
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        # Identical queries waiting in the same window share one row of the batch
+        self._pending.setdefault(normalize_query(query_text), []).append(future)
+
+        if len(self._pending) >= self.max_batch_size:
+            self._flush()
+        elif self._flush_handle is None:
+            self._flush_handle = loop.call_later(self.max_wait, self._flush)
+
+        return (await future).copy()
+
+    async def embed_many(self, query_texts: list[str]) -> np.ndarray:
+        """
+        Return (len(query_texts), ndim) numpy.ndarray, the cache misses are encoded together in one batch
+        """
+        cache, cache_key = self.model_service.cache, self.model_service.cache_key
+        rows: list[np.ndarray | None] = [cache.get(cache_key(text)) for text in query_texts]
+
+        missing = list(dict.fromkeys(
+            normalize_query(text) for text, row in zip(query_texts, rows) if row is None
+        ))
+        if missing:
+            encoded = dict(zip(missing, await self.encoder.encode_batch(missing)))
+            rows = [
+                row if row is not None else encoded[normalize_query(text)][None, :]
+                for text, row in zip(query_texts, rows)
+            ]
+
+        return np.concatenate(rows, axis=0)
+
+    def _flush(self):
+        if self._flush_handle is not None:
+            self._flush_handle.cancel()
+            self._flush_handle = None
+
+        batch, self._pending = self._pending, {}
+        if batch:
+            task = asyncio.get_running_loop().create_task(self._run_batch(batch))
+            self._running.add(task)
+            task.add_done_callback(self._running.discard)
+
+    async def _run_batch(self, batch: dict[str, list[asyncio.Future]]):
+        texts = list(batch)
+        try:
+            embeddings = await self.encoder.encode_batch(texts)
+        except Exception as e:
+            for futures in batch.values():
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+            return
+
+        self.batches += 1
+        self.batched_queries += len(texts)
+        for row, futures in zip(embeddings, batch.values()):
+            for future in futures:
+                if not future.done():
+                    future.set_result(row[None, :])
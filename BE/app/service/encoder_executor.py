@@ -0,0 +1,85 @@
+import asyncio
+import multiprocessing
+from concurrent.futures import Executor, ProcessPoolExecutor, ThreadPoolExecutor
+import numpy as np
+
+from .model_service import ModelService
+
+
+_worker_model_service: ModelService | None = None
+
+
+def _init_worker(model_name: str, onnx_path: str | None = None):
+    global _worker_model_service
+    import open_clip
+    import torch
+
+    # One pool worker per core already, keep torch from oversubscribing them
+    torch.set_num_threads(1)
+    model, _, preprocess = open_clip.create_model_and_transforms(model_name, pretrained="openai")
+    tokenizer = open_clip.get_tokenizer(model_name)
+
+    text_encoder = None
+    if onnx_path:
+        from .onnx_text_encoder import OnnxTextEncoder
+        text_encoder = OnnxTextEncoder(onnx_path, num_threads=1)
+
+    _worker_model_service = ModelService(
+        model=model, preprocess=preprocess, tokenizer=tokenizer, device="cpu", model_name=model_name,
+        cache_size=0, text_encoder=text_encoder
+    )
+
+
+def _encode_in_worker(query_texts: list[str]) -> np.ndarray:
+    return _worker_model_service.encode_batch(query_texts)
+
+
+class EncoderExecutor:
+    """
+    Runs the CLIP text forward pass off the event loop.
+
+    kind="thread" shares the already loaded ModelService (torch releases the GIL while encoding),
+    kind="process" loads one model per worker process. At most max_workers + max_queue_size batches
+    are in flight, further callers wait for a slot instead of piling up unbounded work.
+    """
+
+    def __init__(
+        self,
+        model_service: ModelService,
+        kind: str = "thread",
+        max_workers: int = 1,
+        max_queue_size: int = 64
+    ):
+        self.model_service = model_service
+        self.kind = kind
+        self._slots = asyncio.Semaphore(max_workers + max_queue_size)
+        self._executor = self._create_executor(kind, max_workers)
+
+    def _create_executor(self, kind: str, max_workers: int) -> Executor:
+        if kind == "thread":
+            return ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="clip-encoder")
+        if kind == "process":
+            text_encoder = self.model_service.text_encoder
+            return ProcessPoolExecutor(
+                max_workers=max_workers,
+                mp_context=multiprocessing.get_context("spawn"),
+                initializer=_init_worker,
+                initargs=(self.model_service.model_name, text_encoder.onnx_path if text_encoder else None)
+            )
+        raise ValueError(f"Unknown encoder executor kind: {kind}")
+
+    async def encode_batch(self, query_texts: list[str]) -> np.ndarray:
+        """
+        Return (len(query_texts), ndim) numpy.ndarray, same contract as ModelService.encode_batch
+        """
+        loop = asyncio.get_running_loop()
+        async with self._slots:
+            if self.kind == "thread":
+                return await loop.run_in_executor(self._executor, self.model_service.encode_batch, query_texts)
+
+            query_embeddings = await loop.run_in_executor(self._executor, _encode_in_worker, query_texts)
+            self.model_service.cache_embeddings(query_texts, query_embeddings)
+            return query_embeddings
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
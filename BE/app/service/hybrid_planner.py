@@ -0,0 +1,78 @@
+"""
+Chooses how search_by_hybrid runs its vector search, from cheap statistics of the metadata filters.
+
+Each filter's match count is estimated without evaluating it (OCR trigram posting lengths, per-class
+object count histograms) and the estimates are combined assuming the filters are independent:
+
+- exact_scan: few candidates, every one of them is materialized and scored exactly
+- filtered_ann: a selective filter, the materialized candidates are pushed into the ANN search
+- post_filter: an unselective filter, the plain ANN search is oversampled by 1 / selectivity and only its
+  hits are checked against the filters, nothing is materialized. The service doubles the oversampling
+  while too few hits pass, and falls back to filtered_ann when it runs out of rounds.
+
+Filters served by Mongo have no statistics, they keep the capped filtered_ann route.
+"""
+
+import os
+import sys
+ROOT_DIR = os.path.abspath(
+    os.path.join(
+        os.path.dirname(__file__), '../'
+    )
+)
+sys.path.insert(0, ROOT_DIR)
+
+
+import math
+
+from schema.response import HybridPlan, HybridPlanReport
+
+
+# Below this many candidates scoring all of them costs less than any index traversal
+EXACT_SCAN_MAX_CANDIDATES = 2048
+# Above this fraction of the collection a filtered ANN search degrades towards a scan of the filter,
+# while an unfiltered search only needs 1 / selectivity times more hits
+POST_FILTER_MIN_SELECTIVITY = 0.05
+POST_FILTER_OVERSAMPLE = 2.0
+# MilvusSearchRequest.top_k upper bound
+MAX_ANN_LIMIT = 1000
+
+
+def plan_hybrid(
+    filter_estimates: dict[str, int | None],
+    num_entities: int,
+    top_k: int,
+    has_embedding: bool
+) -> HybridPlanReport:
+    """
+    filter_estimates: estimated matching keyframes per filter name, None when the filter has no statistics
+    """
+    report = HybridPlanReport(plan=HybridPlan.FILTERED_ANN, num_entities=num_entities, filter_estimates=filter_estimates)
+
+    if not filter_estimates:
+        report.plan = HybridPlan.ANN if has_embedding else HybridPlan.METADATA_ONLY
+        return report
+
+    if all(estimate is not None for estimate in filter_estimates.values()):
+        selectivity = 1.0
+        for estimate in filter_estimates.values():
+            selectivity *= min(estimate, num_entities) / num_entities if num_entities else 0.0
+        report.estimated_candidates = int(round(selectivity * num_entities))
+    else:
+        selectivity = None
+
+    if not has_embedding:
+        report.plan = HybridPlan.METADATA_ONLY
+        return report
+    if selectivity is None:
+        return report
+
+    if report.estimated_candidates <= max(EXACT_SCAN_MAX_CANDIDATES, top_k):
+        report.plan = HybridPlan.EXACT_SCAN
+        return report
+
+    ann_limit = math.ceil(top_k * POST_FILTER_OVERSAMPLE / selectivity)
+    if selectivity >= POST_FILTER_MIN_SELECTIVITY and ann_limit <= MAX_ANN_LIMIT:
+        report.plan = HybridPlan.POST_FILTER
+        report.ann_limit = ann_limit
+    return report
@@ -1,6 +1,15 @@
+
 import torch
 import numpy as np
 
+from .embedding_cache import EmbeddingLRUCache
+
+
+def normalize_query(query_text: str) -> str:
+    # The CLIP tokenizer lowercases and collapses whitespace itself, so these variants share one embedding
+    return " ".join(query_text.lower().split())
+
+
 class ModelService:
     def __init__(
         self,
@@ -8,6 +17,9 @@ class ModelService:
         preprocess,
         tokenizer,
         device: str = None,  # None để tự detect
+        model_name: str = "",
+        cache_size: int = 4096,
+        text_encoder=None,  # OnnxTextEncoder, replaces model.encode_text on CPU
     ):
         # tự chọn device: GPU nếu có, CPU nếu không
         if device is None:
@@ -18,19 +30,60 @@ class ModelService:
         self.model = model.to(self.device)
         self.preprocess = preprocess
         self.tokenizer = tokenizer
+        self.model_name = model_name
+        self.text_encoder = text_encoder
+        self.cache = EmbeddingLRUCache(max_size=cache_size)
         self.model.eval()
 
-    def embedding(self, query_text: str) -> np.ndarray:
+    def cache_key(self, query_text: str) -> tuple[str, str]:
+        return (self.model_name, normalize_query(query_text))
+
+    def encode_batch(self, query_texts: list[str]) -> np.ndarray:
         """
-        Return (1, ndim 1024) numpy.ndarray
+        Tokenize and encode every text in a single forward pass, bypassing the cache lookup
+        Return (len(query_texts), ndim) numpy.ndarray, each row is also stored in the cache
         """
+        if self.text_encoder is not None:
+            query_embeddings = self.text_encoder.encode(self.tokenizer(query_texts).numpy())
+            self.cache_embeddings(query_texts, query_embeddings)
+            return query_embeddings
+
         with torch.no_grad():
-            text_tokens = self.tokenizer([query_text]).to(self.device)
-            query_embedding = (
+            text_tokens = self.tokenizer(query_texts).to(self.device)
+            query_embeddings = (
                 self.model.encode_text(text_tokens)
                 .cpu()
                 .detach()
                 .numpy()
                 .astype(np.float32)
             )
-        return query_embedding
+        self.cache_embeddings(query_texts, query_embeddings)
+        return query_embeddings
+
+    def cache_embeddings(self, query_texts: list[str], query_embeddings: np.ndarray):
+        for query_text, query_embedding in zip(query_texts, query_embeddings):
+            self.cache.put(self.cache_key(query_text), query_embedding[None, :])
+
+    def embedding_batch(self, query_texts: list[str]) -> np.ndarray:
+        """
+        Return (len(query_texts), ndim) numpy.ndarray, only the cache misses go through the model
+        """
+        rows: list[np.ndarray | None] = [self.cache.get(self.cache_key(text)) for text in query_texts]
+
+        missing = list(dict.fromkeys(
+            normalize_query(text) for text, row in zip(query_texts, rows) if row is None
+        ))
+        if missing:
+            encoded = dict(zip(missing, self.encode_batch(missing)))
+            rows = [
+                row if row is not None else encoded[normalize_query(text)][None, :]
+                for text, row in zip(query_texts, rows)
+            ]
+
+        return np.concatenate(rows, axis=0)
+
+    def embedding(self, query_text: str) -> np.ndarray:
+        """
+        Return (1, ndim 1024) numpy.ndarray
+        """
+        return self.embedding_batch([query_text])
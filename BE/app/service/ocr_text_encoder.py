@@ -0,0 +1,27 @@
+"""
+Multilingual sentence encoder for semantic OCR search, separate from the CLIP text tower.
+
+OCR lines and ocr_query only have to share a space with each other, not with the keyframe images, so they
+are embedded by a paraphrase model trained on 50+ languages: an English query lands next to the Vietnamese
+OCR line meaning the same thing. migration/ocr_embedding_migration.py and the API must use the same model.
+"""
+
+import numpy as np
+from sentence_transformers import SentenceTransformer
+
+
+class OcrTextEncoder:
+    def __init__(self, model_name: str, device: str = "cpu"):
+        self.model_name = model_name
+        self.model = SentenceTransformer(model_name, device=device)
+
+    def encode(self, texts: list[str], batch_size: int = 64, show_progress_bar: bool = False) -> np.ndarray:
+        """Return (len(texts), ndim) float32 L2-normalized embeddings"""
+        embeddings = self.model.encode(
+            texts,
+            batch_size=batch_size,
+            convert_to_numpy=True,
+            normalize_embeddings=True,
+            show_progress_bar=show_progress_bar
+        )
+        return embeddings.astype(np.float32)
@@ -0,0 +1,66 @@
+"""
+ONNX Runtime serving path for the CLIP text tower, optionally int8-quantized, for CPU-only deployments.
+Build the model file with migration/onnx_text_encoder_export.py, which also checks parity against torch.
+"""
+
+import os
+import numpy as np
+import onnxruntime as ort
+
+
+INPUT_NAME = "text_tokens"
+OUTPUT_NAME = "text_embedding"
+
+
+def export_text_encoder(model, tokenizer, output_path: str, opset: int = 17):
+    """Export model.encode_text to ONNX with a dynamic batch axis"""
+    import torch
+
+    class TextTower(torch.nn.Module):
+        def __init__(self, clip_model):
+            super().__init__()
+            self.clip_model = clip_model
+
+        def forward(self, text_tokens):
+            return self.clip_model.encode_text(text_tokens)
+
+    text_tower = TextTower(model.cpu().eval())
+    dummy_tokens = tokenizer(["a photo of a cat", "a person walking in the park"])
+
+    with torch.no_grad():
+        torch.onnx.export(
+            text_tower,
+            (dummy_tokens,),
+            output_path,
+            input_names=[INPUT_NAME],
+            output_names=[OUTPUT_NAME],
+            dynamic_axes={INPUT_NAME: {0: "batch"}, OUTPUT_NAME: {0: "batch"}},
+            opset_version=opset,
+        )
+
+
+def quantize_text_encoder(onnx_path: str, output_path: str):
+    """Dynamic int8 weight quantization, activations stay float and are quantized on the fly"""
+    from onnxruntime.quantization import QuantType, quantize_dynamic
+
+    quantize_dynamic(onnx_path, output_path, weight_type=QuantType.QInt8)
+
+
+class OnnxTextEncoder:
+    def __init__(self, onnx_path: str, num_threads: int | None = None):
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        options.intra_op_num_threads = num_threads or os.cpu_count()
+
+        self.onnx_path = onnx_path
+        self.session = ort.InferenceSession(onnx_path, options, providers=["CPUExecutionProvider"])
+
+    def encode(self, text_tokens: np.ndarray) -> np.ndarray:
+        """
+        text_tokens: (batch, context_length) int64 tokens from the open_clip tokenizer
+        Return (batch, ndim) float32 embeddings, same as model.encode_text
+        """
+        (embeddings,) = self.session.run(
+            [OUTPUT_NAME], {INPUT_NAME: np.asarray(text_tokens, dtype=np.int64)}
+        )
+        return embeddings.astype(np.float32)
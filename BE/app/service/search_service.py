@@ -8,26 +8,57 @@ ROOT_DIR = os.path.abspath(
 sys.path.insert(0, ROOT_DIR)
 
 
-from repository.milvus import KeyframeVectorRepository
+from typing import Callable
+import asyncio
+import time
+import numpy as np
+
+from common.repository import VectorBaseRepository
+from index import IdBitmap, KeyframeTable, ObjectCountMatrix, OcrBm25Index, OcrTrigramIndex, SymSpellIndex, merge_intervals
 from repository.milvus import MilvusSearchRequest
 from repository.mongo import KeyframeRepository
+from repository.ocr_vector import OcrLineVectorRepository
+from schema.interface import KeyframeScalarFilter, MilvusSearchResult, SearchRounds
+
+from schema.response import KeyframeServiceReponse, HybridPlan, HybridPlanReport
+from service.hybrid_planner import MAX_ANN_LIMIT, plan_hybrid
+
+OVERSAMPLE_GROWTH = 2
+FUSION_POOL_FACTOR = 4
+FUZZY_EXPANSIONS = 10
 
-from schema.response import KeyframeServiceReponse
 
 class KeyframeQueryService:
     def __init__(
             self,
-            keyframe_vector_repo: KeyframeVectorRepository,
+            keyframe_vector_repo: VectorBaseRepository,
             keyframe_mongo_repo: KeyframeRepository,
+            keyframe_table: KeyframeTable | None = None,
+            ocr_index: OcrTrigramIndex | None = None,
+            object_index: ObjectCountMatrix | None = None,
+            ocr_bm25: OcrBm25Index | None = None,
+            ocr_symspell: SymSpellIndex | None = None,
+            ocr_vector_repo: OcrLineVectorRepository | None = None,
+            oversample_budget_ms: float = 200.0,
         ):
 
         self.keyframe_vector_repo = keyframe_vector_repo
         self.keyframe_mongo_repo= keyframe_mongo_repo
+        self.keyframe_table = keyframe_table
+        self.ocr_index = ocr_index
+        self.object_index = object_index
+        self.ocr_bm25 = ocr_bm25
+        self.ocr_symspell = ocr_symspell
+        self.ocr_vector_repo = ocr_vector_repo
+        self.oversample_budget_ms = oversample_budget_ms
 
 
+    @property
+    def supports_scalar_filter(self) -> bool:
+        return self.keyframe_vector_repo.supports_scalar_filter
+
     async def _retrieve_keyframes(self, ids: list[int]):
         keyframes = await self.keyframe_mongo_repo.get_keyframe_by_list_of_keys(ids)
-        print(keyframes[:5])
 
         keyframe_map = {k.key: k for k in keyframes}
         return_keyframe = [
@@ -40,33 +71,72 @@ class KeyframeQueryService:
         text_embedding: list[float],
         top_k: int,
         score_threshold: float | None = None,
-        exclude_indices: list[int] | None = None
+        exclude_indices: list[int] | None = None,
+        scalar_filter: KeyframeScalarFilter | None = None,
+        id_filter: IdBitmap | None = None,
+        exact: bool = False
     ) -> list[KeyframeServiceReponse]:
 
         search_request = MilvusSearchRequest(
             embedding=text_embedding,
             top_k=top_k,
-            exclude_ids=exclude_indices
+            exclude_ids=exclude_indices,
+            id_filter=id_filter,
+            exact=exact,
+            scalar_filter=scalar_filter
         )
 
         search_response = await self.keyframe_vector_repo.search_by_embedding(search_request)
 
+        sorted_results = self._rank_results(search_response.results, score_threshold)
+
+        return await self._resolve_keyframes(sorted_results)
+
+    async def _resolve_keyframes(
+        self,
+        sorted_results: list[MilvusSearchResult]
+    ) -> list[KeyframeServiceReponse]:
+        """
+        Map result ids to group/video/keyframe numbers, from the in-memory table when one is loaded
+        """
+        if self.keyframe_table is None:
+            keyframes = await self._retrieve_keyframes([result.id_ for result in sorted_results])
+            keyframe_map = {k.key: k for k in keyframes}
+            return self._to_service_responses(sorted_results, keyframe_map)
+
+        ids = np.fromiter((result.id_ for result in sorted_results), dtype=np.int64, count=len(sorted_results))
+        found, group_nums, video_nums, keyframe_nums = self.keyframe_table.lookup(ids)
 
+        return [
+            KeyframeServiceReponse(
+                key=int(ids[i]),
+                video_num=int(video_nums[i]),
+                group_num=int(group_nums[i]),
+                keyframe_num=int(keyframe_nums[i]),
+                confidence_score=sorted_results[i].distance
+            )
+            for i in np.flatnonzero(found)
+        ]
+
+    @staticmethod
+    def _rank_results(
+        results: list[MilvusSearchResult],
+        score_threshold: float | None
+    ) -> list[MilvusSearchResult]:
         filtered_results = [
-            result for result in search_response.results
+            result for result in results
             if score_threshold is None or result.distance > score_threshold
         ]
 
-        sorted_results = sorted(
+        return sorted(
             filtered_results, key=lambda r: r.distance, reverse=True
         )
 
-        sorted_ids = [result.id_ for result in sorted_results]
-
-        keyframes = await self._retrieve_keyframes(sorted_ids)
-
-
-        keyframe_map = {k.key: k for k in keyframes}
+    @staticmethod
+    def _to_service_responses(
+        sorted_results: list[MilvusSearchResult],
+        keyframe_map: dict
+    ) -> list[KeyframeServiceReponse]:
         response = []
 
         for result in sorted_results:
@@ -93,6 +163,36 @@ class KeyframeQueryService:
         return await self._search_keyframes(text_embedding, top_k, score_threshold, None)
 
 
+    async def search_by_text_batch(
+        self,
+        text_embeddings: list[list[float]],
+        top_ks: list[int],
+        score_thresholds: list[float | None]
+    ) -> list[list[KeyframeServiceReponse]]:
+        """
+        Answer N independent text searches with one multi-vector search and at most one Mongo round trip
+        """
+        search_requests = [
+            MilvusSearchRequest(embedding=embedding, top_k=top_k)
+            for embedding, top_k in zip(text_embeddings, top_ks)
+        ]
+        search_responses = await self.keyframe_vector_repo.search_by_embeddings(search_requests)
+
+        ranked = [
+            self._rank_results(search_response.results, score_threshold)
+            for search_response, score_threshold in zip(search_responses, score_thresholds)
+        ]
+
+        if self.keyframe_table is not None:
+            return [await self._resolve_keyframes(results) for results in ranked]
+
+        all_ids = list({result.id_ for results in ranked for result in results})
+        keyframes = await self.keyframe_mongo_repo.get_keyframe_by_list_of_keys(all_ids)
+        keyframe_map = {k.key: k for k in keyframes}
+
+        return [self._to_service_responses(results, keyframe_map) for results in ranked]
+
+
     async def search_by_text_range(
         self,
         text_embedding: list[float],
@@ -103,15 +203,23 @@ class KeyframeQueryService:
         """
         range_queries: a bunch of start end indices, and we just search inside these, ignore everything
         """
+        # Inclusive (start, end) pairs -> merged half-open intervals, stored as run containers
+        intervals = merge_intervals((start, end + 1) for start, end in range_queries)
+        return await self.search_by_text_id_filter(
+            text_embedding, top_k, score_threshold, IdBitmap.from_intervals(intervals)
+        )
 
-        all_ids = self.keyframe_vector_repo.get_all_id()
-        allowed_ids = set()
-        for start, end in range_queries:
-            allowed_ids.update(range(start, end + 1))
-
-        exclude_ids = [id_ for id_ in all_ids if id_ not in allowed_ids]
-
-        return await self._search_keyframes(text_embedding, top_k, score_threshold, exclude_ids)
+    async def search_by_text_id_filter(
+        self,
+        text_embedding: list[float],
+        top_k: int,
+        score_threshold: float | None,
+        id_filter: IdBitmap
+    ):
+        """
+        Search only the ids in id_filter
+        """
+        return await self._search_keyframes(text_embedding, top_k, score_threshold, id_filter=id_filter)
 
     async def search_by_text_exclude_ids(
         self,
@@ -125,34 +233,291 @@ class KeyframeQueryService:
         """
         return await self._search_keyframes(text_embedding, top_k, score_threshold, exclude_ids)
 
+    async def search_by_text_scalar_filter(
+        self,
+        text_embedding: list[float],
+        top_k: int,
+        score_threshold: float | None,
+        scalar_filter: KeyframeScalarFilter
+    ):
+        """
+        Filter on the group/video/keyframe scalar fields inside the vector search itself,
+        requires a collection migrated with scalar fields (see supports_scalar_filter)
+        """
+        return await self._search_keyframes(text_embedding, top_k, score_threshold, scalar_filter=scalar_filter)
+
+    @property
+    def supports_semantic_ocr(self) -> bool:
+        return self.ocr_vector_repo is not None
+
+    @property
+    def supports_fuzzy_ocr(self) -> bool:
+        return self.ocr_symspell is not None and self.ocr_bm25 is not None
+
+    def _fuzzy_ocr_matches(self, ocr_query: str) -> tuple[np.ndarray, np.ndarray]:
+        """
+        (sorted keys, scores) of the keyframes containing, for every syllable of ocr_query, one of its
+        vocabulary terms within allowed_distance edits, case ignored. Keyframes rank by the total edit
+        distance of their closest terms, then by BM25: the score is (max_distance - distance + BM25)
+        / (max_distance + 1), so exact spellings always come first and scores stay in [0, 1).
+        """
+        term_groups = self.ocr_symspell.expand(ocr_query, limit=FUZZY_EXPANSIONS)
+        if not term_groups or not all(term_groups):
+            return np.empty(0, dtype=np.int64), np.empty(0, dtype=np.float32)
+
+        keys = self.ocr_bm25.matching_keys(term_groups)
+        relevance, distances = self.ocr_bm25.score_groups(term_groups, keys)
+        max_distance = sum(max(terms.values()) for terms in term_groups)
+        return keys, ((max_distance - distances + relevance) / (max_distance + 1)).astype(np.float32)
+
+    @staticmethod
+    def _ranked_ocr_hits(keys: np.ndarray, scores: np.ndarray, limit: int | None) -> list[MilvusSearchResult]:
+        return [
+            MilvusSearchResult(id_=int(keys[i]), distance=float(scores[i]))
+            for i in np.argsort(-scores, kind="stable")[:limit]
+        ]
+
+    async def _ocr_hits(
+        self,
+        ocr_query: str,
+        limit: int | None,
+        case_sensitive: bool = False,
+        fuzzy: bool = False
+    ) -> list[MilvusSearchResult]:
+        """
+        Keyframes whose OCR text contains ocr_query, best first, as (id_, score) results.
+        Served by the in-memory trigram index when loaded, ranked by BM25 when that index is loaded too,
+        otherwise by a Mongo regex scan (score 1.0). fuzzy matches near spellings instead (see
+        _fuzzy_ocr_matches), it needs the in-memory indexes and is ignored without them.
+        """
+        if fuzzy and self.supports_fuzzy_ocr:
+            return self._ranked_ocr_hits(*self._fuzzy_ocr_matches(ocr_query), limit)
+
+        if self.ocr_index is not None and self.ocr_bm25 is not None:
+            keys = [key for key, _ in self.ocr_index.search(ocr_query, limit=None, case_sensitive=case_sensitive)]
+            return self._ranked_ocr_hits(np.asarray(keys, dtype=np.int64), self.ocr_bm25.score(ocr_query, keys), limit)
+
+        if self.ocr_index is not None:
+            return [
+                MilvusSearchResult(id_=key, distance=score)
+                for key, score in self.ocr_index.search(ocr_query, limit=limit, case_sensitive=case_sensitive)
+            ]
+
+        keyframes = await self.keyframe_mongo_repo.search_by_ocr(
+            ocr_query=ocr_query,
+            case_sensitive=case_sensitive,
+            limit=limit
+        )
+        return [MilvusSearchResult(id_=kf.key, distance=1.0) for kf in keyframes]
+
     async def search_by_metadata_only(
         self,
         ocr_query: str,
         top_k: int = 10,
-        case_sensitive: bool = False
+        case_sensitive: bool = False,
+        fuzzy: bool = False
     ) -> list[KeyframeServiceReponse]:
         """Search keyframes by OCR metadata only"""
         
-        keyframes = await self.keyframe_mongo_repo.search_by_ocr(
-            ocr_query=ocr_query,
-            case_sensitive=case_sensitive,
-            limit=top_k
-        )
+        ocr_hits = await self._ocr_hits(ocr_query, top_k, case_sensitive, fuzzy)
+        response = await self._resolve_keyframes(ocr_hits)
         
-        # Convert to simple response format
-        response = []
-        for kf_interface in keyframes:
-            response.append(
-                KeyframeServiceReponse(
-                    key=kf_interface.key,
-                    video_num=kf_interface.video_num,
-                    group_num=kf_interface.group_num,
-                    keyframe_num=kf_interface.keyframe_num,
-                    confidence_score=1.0  # Full confidence for metadata-only search
+        return response[:top_k]
+
+    async def _object_hits(
+        self,
+        object_filters: dict[str, int],
+        limit: int
+    ) -> list[MilvusSearchResult]:
+        """
+        Keyframes with at least min_count of every requested object, in key order, scored 1.0.
+        Served by the object-count matrix when loaded, otherwise by a Mongo scan.
+        """
+        if self.object_index is not None:
+            keys = self.object_index.keys(object_filters, limit=limit)
+        else:
+            keyframes = await self.keyframe_mongo_repo.search_by_objects(
+                object_filters=object_filters,
+                limit=limit
+            )
+            keys = [kf.key for kf in keyframes]
+        return [MilvusSearchResult(id_=int(key), distance=1.0) for key in keys]
+
+    async def _object_candidates(
+        self,
+        object_filters: dict[str, int],
+        limit: int | None
+    ) -> IdBitmap:
+        """
+        Keyframes passing the object filters as an id filter. The object-count matrix yields every match,
+        the Mongo fallback only the first limit of them.
+        """
+        if self.object_index is not None:
+            return self.object_index.bitmap(object_filters)
+
+        object_keyframes = await self.keyframe_mongo_repo.search_by_objects(
+            object_filters=object_filters,
+            limit=limit
+        )
+        return IdBitmap.from_ids([kf.key for kf in object_keyframes])
+
+    def _filter_estimates(
+        self,
+        ocr_query: str | None,
+        object_filters: dict[str, int] | None
+    ) -> dict[str, int | None]:
+        """Estimated matches of each hybrid filter from the in-memory index statistics, None without an index"""
+        estimates = {}
+        if ocr_query:
+            estimates["ocr"] = self.ocr_index.estimate(ocr_query) if self.ocr_index is not None else None
+        if object_filters:
+            estimates["objects"] = (
+                self.object_index.estimate(object_filters) if self.object_index is not None else None
+            )
+        return estimates
+
+    def _hybrid_filter_mask(
+        self,
+        hits: list[MilvusSearchResult],
+        ocr_query: str | None,
+        object_filters: dict[str, int] | None,
+        case_sensitive: bool = False,
+        ocr_keys: np.ndarray | None = None
+    ) -> np.ndarray:
+        """
+        Which hits pass the OCR and object filters, checked on the in-memory indexes.
+        ocr_keys: keys already known to match the OCR query (fuzzy matching), replaces the substring check
+        """
+        keys = np.fromiter((hit.id_ for hit in hits), dtype=np.int64, count=len(hits))
+        keep = np.ones(len(hits), dtype=bool)
+        if ocr_keys is not None:
+            keep &= np.isin(keys, ocr_keys)
+        elif ocr_query:
+            keep &= self.ocr_index.matches(keys, ocr_query, case_sensitive)
+        if object_filters:
+            keep &= self.object_index.matches(keys, object_filters)
+        return keep
+
+    def _fuse_ocr_scores(
+        self,
+        hits: list[MilvusSearchResult],
+        ocr_query: str,
+        embedding_weight: float,
+        metadata_weight: float,
+        ocr_matches: tuple[np.ndarray, np.ndarray] | None = None
+    ) -> list[MilvusSearchResult]:
+        """
+        Rescore vector hits as embedding_weight * cosine + metadata_weight * BM25 of their OCR text, computed
+        for the whole list at once, best first. ocr_matches: precomputed (sorted keys, relevance) of fuzzy or
+        semantic matching, replacing the BM25 of ocr_query
+        """
+        keys = np.fromiter((hit.id_ for hit in hits), dtype=np.int64, count=len(hits))
+        similarities = np.fromiter((hit.distance for hit in hits), dtype=np.float32, count=len(hits))
+        if ocr_matches is None:
+            relevance = self.ocr_bm25.score(ocr_query, keys)
+        else:
+            match_keys, match_scores = ocr_matches
+            relevance = np.zeros(len(keys), dtype=np.float32)
+            if len(match_keys):
+                positions = np.minimum(np.searchsorted(match_keys, keys), len(match_keys) - 1)
+                found = match_keys[positions] == keys
+                relevance[found] = match_scores[positions[found]]
+        fused = embedding_weight * similarities + metadata_weight * relevance
+
+        return [
+            MilvusSearchResult(id_=int(keys[i]), distance=float(fused[i]))
+            for i in np.argsort(-fused, kind="stable")
+        ]
+
+    async def _oversampled_hits(
+        self,
+        text_embedding: list[float],
+        top_k: int,
+        score_threshold: float | None,
+        keep: Callable[[list[MilvusSearchResult]], np.ndarray],
+        limit: int
+    ) -> tuple[list[MilvusSearchResult], SearchRounds]:
+        """
+        Unfiltered search for limit hits, keeping those that pass keep and the score threshold. Until top_k
+        survive, the search is re-run with twice the limit (k*2, k*4, ...). It stops early once no deeper hit
+        can survive: the collection is exhausted or the weakest hit is already at or below the threshold.
+        It gives up at MAX_ANN_LIMIT hits or once the latency budget is spent, then rounds.complete is False.
+        """
+        deadline = time.monotonic() + self.oversample_budget_ms / 1000
+        rounds = SearchRounds(rounds=0, limit=limit)
+        while True:
+            rounds.rounds += 1
+            rounds.limit = limit
+            search_response = await self.keyframe_vector_repo.search_by_embedding(
+                MilvusSearchRequest(embedding=text_embedding, top_k=limit)
+            )
+            hits = self._rank_results(search_response.results, None)
+            survivors = self._rank_results(
+                [hit for hit, kept in zip(hits, keep(hits)) if kept], score_threshold
+            )
+
+            below_threshold = score_threshold is not None and hits and hits[-1].distance <= score_threshold
+            if len(survivors) >= top_k or len(hits) < limit or below_threshold:
+                rounds.complete = True
+                return survivors[:top_k], rounds
+            if limit >= MAX_ANN_LIMIT or time.monotonic() >= deadline:
+                return survivors[:top_k], rounds
+            limit = min(limit * OVERSAMPLE_GROWTH, MAX_ANN_LIMIT)
+
+    async def _semantic_ocr_hybrid(
+        self,
+        text_embedding: list[float] | None,
+        ocr_embedding: list[float],
+        object_filters: dict[str, int] | None,
+        top_k: int,
+        score_threshold: float | None,
+        embedding_weight: float,
+        metadata_weight: float,
+        report: HybridPlanReport
+    ) -> tuple[list[KeyframeServiceReponse], HybridPlanReport]:
+        """
+        Hybrid search where the OCR relevance of a keyframe is the similarity of its best embedded OCR line
+        to ocr_embedding, so paraphrases match. The keyframe and OCR line collections are searched
+        concurrently and fused over the union of their hits, the object filters restrict both searches.
+        Keyframes found by their OCR only get their cosine from a second search restricted to them.
+        """
+        pool_k = min(top_k * FUSION_POOL_FACTOR, MAX_ANN_LIMIT)
+
+        candidates = None
+        if object_filters:
+            candidate_limit = None if self.object_index is not None else top_k * 10
+            candidates = await self._object_candidates(object_filters, limit=candidate_limit)
+            report.candidates = len(candidates)
+            if not candidates:
+                return [], report
+
+        searches = [self.ocr_vector_repo.search(ocr_embedding, pool_k, key_filter=candidates)]
+        if text_embedding is not None:
+            searches.append(self.keyframe_vector_repo.search_by_embedding(
+                MilvusSearchRequest(embedding=text_embedding, top_k=pool_k, id_filter=candidates)
+            ))
+        (ocr_keys, ocr_similarities), *vector_responses = await asyncio.gather(*searches)
+
+        if text_embedding is None:
+            return await self._resolve_keyframes(self._ranked_ocr_hits(ocr_keys, ocr_similarities, top_k)), report
+
+        hits = vector_responses[0].results
+        hit_keys = np.fromiter((hit.id_ for hit in hits), dtype=np.int64, count=len(hits))
+        missing = np.setdiff1d(ocr_keys, hit_keys, assume_unique=True)
+        if len(missing):
+            search_response = await self.keyframe_vector_repo.search_by_embedding(
+                MilvusSearchRequest(
+                    embedding=text_embedding,
+                    top_k=len(missing),
+                    id_filter=IdBitmap.from_ids(missing),
+                    exact=True
                 )
             )
-        
-        return response[:top_k]
+            hits = hits + search_response.results
+        hits = self._rank_results(hits, score_threshold)
+
+        hits = self._fuse_ocr_scores(hits, None, embedding_weight, metadata_weight, (ocr_keys, ocr_similarities))
+        return await self._resolve_keyframes(hits[:top_k]), report
 
     async def search_by_hybrid(
         self,
@@ -161,224 +526,138 @@ class KeyframeQueryService:
         object_filters: dict[str, int] = None,
         top_k: int = 10,
         score_threshold: float | None = 0.5,
-        embedding_weight: float = 0.7,  # Kept for API compatibility but not used
-        metadata_weight: float = 0.3,   # Kept for API compatibility but not used
-        case_sensitive: bool = False
-    ) -> list[KeyframeServiceReponse]:
+        embedding_weight: float = 0.7,
+        metadata_weight: float = 0.3,
+        case_sensitive: bool = False,
+        fuzzy: bool = False,
+        ocr_embedding: list[float] | None = None
+    ) -> tuple[list[KeyframeServiceReponse], HybridPlanReport]:
         """
-        Enhanced Hybrid search: Filter by OCR and/or objects first, then rank by embedding similarity
+        Enhanced Hybrid search: Filter by OCR and/or objects, then rank by embedding similarity and OCR relevance
         
         This approach:
-        1. Filter by OCR (if provided) and objects (if provided) as mandatory filters
-        2. Search embeddings only within that filtered set (if embedding provided)
-        3. Rank by embedding similarity or return filtered results
+        1. Estimate how selective the OCR and object filters are and pick a plan (see hybrid_planner)
+        2. Search embeddings within the filtered set (exact_scan, filtered_ann), or search everything
+           and drop the hits failing the filters (post_filter)
+        3. Rank by embedding_weight * cosine + metadata_weight * BM25 of the OCR text, or return the
+           filtered results ranked by BM25 without an embedding
         
-        This ensures all results match all provided filters and is much faster than naive hybrid approaches.
-        The embedding_weight and metadata_weight parameters are kept for API compatibility but not used
-        since we use filters as binary filters (must match) and embedding for ranking.
+        This ensures all results match all provided filters. Returns the results and the executed plan.
+        score_threshold applies to the cosine similarity, before fusion. fuzzy lets OCR terms match within
+        edit distance 2 (see _fuzzy_ocr_matches). With ocr_embedding, the embedded ocr_query, and the OCR line
+        collection loaded, OCR becomes a ranking signal instead of a filter (see _semantic_ocr_hybrid).
         """
         
-        candidate_ids = None
-        
-        # Step 1: Get OCR candidates if OCR query provided
-        if ocr_query:
-            ocr_keyframes = await self.keyframe_mongo_repo.search_by_ocr(
-                ocr_query=ocr_query,
-                case_sensitive=case_sensitive,
-                limit=top_k * 10  # Get more candidates
+        if ocr_embedding is not None and ocr_query and self.supports_semantic_ocr:
+            report = HybridPlanReport(
+                plan=HybridPlan.SEMANTIC_OCR,
+                num_entities=self.keyframe_vector_repo.num_entities,
+                filter_estimates=self._filter_estimates(None, object_filters)
             )
-            candidate_ids = set(kf.key for kf in ocr_keyframes)
-        
-        # Step 2: Get object candidates if object filters provided
-        if object_filters:
-            object_keyframes = await self.keyframe_mongo_repo.search_by_objects(
-                object_filters=object_filters,
-                limit=top_k * 10  # Get more candidates
+            return await self._semantic_ocr_hybrid(
+                text_embedding, ocr_embedding, object_filters, top_k, score_threshold,
+                embedding_weight, metadata_weight, report
             )
-            object_candidate_ids = set(kf.key for kf in object_keyframes)
-            
-            # Intersect with OCR candidates if both filters are provided
-            if candidate_ids is not None:
-                candidate_ids = candidate_ids.intersection(object_candidate_ids)
-            else:
-                candidate_ids = object_candidate_ids
         
-        # If no filters provided but text_embedding available, search all (fallback to regular text search)
-        if candidate_ids is None and text_embedding is not None:
-            return await self.search_by_text(text_embedding, top_k, score_threshold)
+        # With an OCR query the vector search fetches a deeper pool, the fused ranking then picks top_k
+        fuse = text_embedding is not None and bool(ocr_query) and self.ocr_bm25 is not None
+        pool_k = min(top_k * FUSION_POOL_FACTOR, MAX_ANN_LIMIT) if fuse else top_k
         
-        # If no metadata filters provided and no text embedding, return empty
-        if candidate_ids is None:
-            return []
-        
-        # If no candidates found after filtering, return empty
-        if not candidate_ids:
-            return []
+        # Fuzzy OCR matches are resolved once from postings, their exact count replaces the estimate
+        estimates = self._filter_estimates(ocr_query, object_filters)
+        ocr_matches = None
+        if fuzzy and ocr_query and self.supports_fuzzy_ocr:
+            ocr_matches = self._fuzzy_ocr_matches(ocr_query)
+            estimates["ocr"] = len(ocr_matches[0])
         
-        # If we have candidates but no text embedding, return the metadata results directly
-        if text_embedding is None:
-            # Get keyframe details for the candidates
-            metadata_results = []
-            if ocr_query:
-                ocr_keyframes = await self.keyframe_mongo_repo.search_by_ocr(
-                    ocr_query=ocr_query,
-                    case_sensitive=case_sensitive,
-                    limit=top_k
-                )
-                for kf in ocr_keyframes:
-                    if kf.key in candidate_ids:
-                        metadata_results.append(
-                            KeyframeServiceReponse(
-                                key=kf.key,
-                                video_num=kf.video_num,
-                                group_num=kf.group_num,
-                                keyframe_num=kf.keyframe_num,
-                                confidence_score=1.0  # Full confidence for metadata-only search
-                            )
-                        )
-            elif object_filters:
-                object_keyframes = await self.keyframe_mongo_repo.search_by_objects(
-                    object_filters=object_filters,
-                    limit=top_k
-                )
-                for kf in object_keyframes:
-                    if kf.key in candidate_ids:
-                        metadata_results.append(
-                            KeyframeServiceReponse(
-                                key=kf.key,
-                                video_num=kf.video_num,
-                                group_num=kf.group_num,
-                                keyframe_num=kf.keyframe_num,
-                                confidence_score=1.0  # Full confidence for metadata-only search
-                            )
-                        )
-            return metadata_results[:top_k]
-        
-        # Step 3: Create exclude list for vector search (search only within candidates)
-        all_vector_ids = self.keyframe_vector_repo.get_all_id()
-        exclude_ids = [id_ for id_ in all_vector_ids if id_ not in candidate_ids]
-        
-        # Step 4: Perform vector search on filtered candidates
-        vector_results = await self._search_keyframes(
-            text_embedding=text_embedding,
-            top_k=top_k,
-            score_threshold=score_threshold,
-            exclude_indices=exclude_ids
+        report = plan_hybrid(
+            estimates,
+            self.keyframe_vector_repo.num_entities,
+            top_k,
+            text_embedding is not None
         )
         
-    async def search_by_hybrid(
-        self,
-        text_embedding: list[float] = None,
-        ocr_query: str = None,
-        object_filters: dict[str, int] = None,
-        top_k: int = 10,
-        score_threshold: float | None = 0.5,
-        embedding_weight: float = 0.7,  # Kept for API compatibility but not used
-        metadata_weight: float = 0.3,   # Kept for API compatibility but not used
-        case_sensitive: bool = False
-    ) -> list[KeyframeServiceReponse]:
-        """
-        Enhanced Hybrid search: Filter by OCR and/or objects first, then rank by embedding similarity
+        # No filters provided: regular text search
+        if report.plan == HybridPlan.ANN:
+            return await self.search_by_text(text_embedding, top_k, score_threshold), report
         
-        This approach:
-        1. Filter by OCR (if provided) and objects (if provided) as mandatory filters
-        2. Search embeddings only within that filtered set (if embedding provided)
-        3. Rank by embedding similarity or return filtered results
-        
-        This ensures all results match all provided filters and is much faster than naive hybrid approaches.
-        The embedding_weight and metadata_weight parameters are kept for API compatibility but not used
-        since we use filters as binary filters (must match) and embedding for ranking.
-        """
+        # Unselective filters: plain search oversampled until top_k hits pass the filters
+        if report.plan == HybridPlan.POST_FILTER:
+            hits, rounds = await self._oversampled_hits(
+                text_embedding,
+                pool_k,
+                score_threshold,
+                lambda hits: self._hybrid_filter_mask(
+                    hits, ocr_query, object_filters, case_sensitive,
+                    ocr_keys=ocr_matches[0] if ocr_matches is not None else None
+                ),
+                min(report.ann_limit * pool_k // top_k, MAX_ANN_LIMIT)
+            )
+            report.rounds, report.ann_limit, report.post_filtered = rounds.rounds, rounds.limit, len(hits)
+            if rounds.complete:
+                if fuse:
+                    hits = self._fuse_ocr_scores(hits, ocr_query, embedding_weight, metadata_weight, ocr_matches)
+                return await self._resolve_keyframes(hits[:top_k]), report
+            report.fallback = HybridPlan.FILTERED_ANN
         
-        candidate_ids = None
+        # Without index statistics the Mongo fallbacks are capped as they scan the collection
+        candidate_limit = None if report.estimated_candidates is not None else top_k * 10
+        candidates = None
+        ocr_hits = []
         
         # Step 1: Get OCR candidates if OCR query provided
-        if ocr_query:
-            ocr_keyframes = await self.keyframe_mongo_repo.search_by_ocr(
-                ocr_query=ocr_query,
-                case_sensitive=case_sensitive,
-                limit=top_k * 10  # Get more candidates
-            )
-            candidate_ids = set(kf.key for kf in ocr_keyframes)
+        if ocr_matches is not None:
+            ocr_hits = self._ranked_ocr_hits(*ocr_matches, limit=None)
+            candidates = IdBitmap.from_ids(ocr_matches[0])
+        elif ocr_query:
+            ocr_hits = await self._ocr_hits(ocr_query, limit=candidate_limit, case_sensitive=case_sensitive)
+            candidates = IdBitmap.from_ids([hit.id_ for hit in ocr_hits])
         
-        # Step 2: Get object candidates if object filters provided
+        # Step 2: Get object candidates if object filters provided, intersected with the OCR ones
         if object_filters:
-            object_keyframes = await self.keyframe_mongo_repo.search_by_objects(
-                object_filters=object_filters,
-                limit=top_k * 10  # Get more candidates
-            )
-            object_candidate_ids = set(kf.key for kf in object_keyframes)
-            
-            # Intersect with OCR candidates if both filters are provided
-            if candidate_ids is not None:
-                candidate_ids = candidate_ids.intersection(object_candidate_ids)
-            else:
-                candidate_ids = object_candidate_ids
-        
-        # If no filters provided but text_embedding available, search all (fallback to regular text search)
-        if candidate_ids is None and text_embedding is not None:
-            return await self.search_by_text(text_embedding, top_k, score_threshold)
+            object_candidates = await self._object_candidates(object_filters, limit=candidate_limit)
+            candidates = object_candidates if candidates is None else candidates & object_candidates
         
         # If no metadata filters provided and no text embedding, return empty
-        if candidate_ids is None:
-            return []
+        if candidates is None:
+            return [], report
         
         # If no candidates found after filtering, return empty
-        if not candidate_ids:
-            return []
+        report.candidates = len(candidates)
+        if not candidates:
+            return [], report
         
         # If we have candidates but no text embedding, return the metadata results directly
         if text_embedding is None:
             # Get keyframe details for the candidates
             metadata_results = []
             if ocr_query:
-                ocr_keyframes = await self.keyframe_mongo_repo.search_by_ocr(
-                    ocr_query=ocr_query,
-                    case_sensitive=case_sensitive,
-                    limit=top_k
+                # OCR hits are already ranked, keep the ones that also pass the object filters
+                metadata_results = await self._resolve_keyframes(
+                    [hit for hit in ocr_hits if hit.id_ in candidates][:top_k]
                 )
-                for kf in ocr_keyframes:
-                    if kf.key in candidate_ids:
-                        metadata_results.append(
-                            KeyframeServiceReponse(
-                                key=kf.key,
-                                video_num=kf.video_num,
-                                group_num=kf.group_num,
-                                keyframe_num=kf.keyframe_num,
-                                confidence_score=1.0  # Full confidence for metadata-only search
-                            )
-                        )
             elif object_filters:
-                object_keyframes = await self.keyframe_mongo_repo.search_by_objects(
-                    object_filters=object_filters,
-                    limit=top_k
+                metadata_results = await self._resolve_keyframes(
+                    await self._object_hits(object_filters, limit=top_k)
                 )
-                for kf in object_keyframes:
-                    if kf.key in candidate_ids:
-                        metadata_results.append(
-                            KeyframeServiceReponse(
-                                key=kf.key,
-                                video_num=kf.video_num,
-                                group_num=kf.group_num,
-                                keyframe_num=kf.keyframe_num,
-                                confidence_score=1.0  # Full confidence for metadata-only search
-                            )
-                        )
-            return metadata_results[:top_k]
-        
-        # Step 3: Create exclude list for vector search (search only within candidates)
-        all_vector_ids = self.keyframe_vector_repo.get_all_id()
-        exclude_ids = [id_ for id_ in all_vector_ids if id_ not in candidate_ids]
+            return metadata_results[:top_k], report
         
-        # Step 4: Perform vector search on filtered candidates
-        vector_results = await self._search_keyframes(
-            text_embedding=text_embedding,
-            top_k=top_k,
-            score_threshold=score_threshold,
-            exclude_indices=exclude_ids
+        # Step 3: Perform vector search restricted to the candidates, scoring all of them when few
+        search_response = await self.keyframe_vector_repo.search_by_embedding(
+            MilvusSearchRequest(
+                embedding=text_embedding,
+                top_k=pool_k,
+                id_filter=candidates,
+                exact=report.plan == HybridPlan.EXACT_SCAN
+            )
         )
+        hits = self._rank_results(search_response.results, score_threshold)
+        
+        # Step 4: Fuse the cosine and BM25 scores of the pool
+        if fuse:
+            hits = self._fuse_ocr_scores(hits, ocr_query, embedding_weight, metadata_weight, ocr_matches)
         
-        return vector_results
+        return await self._resolve_keyframes(hits[:top_k]), report
 
     async def search_by_objects_only(
         self,
@@ -387,22 +666,7 @@ class KeyframeQueryService:
     ) -> list[KeyframeServiceReponse]:
         """Search keyframes by object detection results only"""
         
-        keyframes = await self.keyframe_mongo_repo.search_by_objects(
-            object_filters=object_filters,
-            limit=top_k
-        )
-        
-        # Convert to response format
-        response = []
-        for kf_interface in keyframes:
-            response.append(
-                KeyframeServiceReponse(
-                    key=kf_interface.key,
-                    video_num=kf_interface.video_num,
-                    group_num=kf_interface.group_num,
-                    keyframe_num=kf_interface.keyframe_num,
-                    confidence_score=1.0  # Full confidence for object-only search
-                )
-            )
+        object_hits = await self._object_hits(object_filters, limit=top_k)
+        response = await self._resolve_keyframes(object_hits)
         
         return response[:top_k]
@@ -0,0 +1,74 @@
+"""
+Measures what shipping the stored vectors with every Milvus hit costs, compared with ids + distances only.
+
+    python benchmark/milvus_projection_bench.py --top_k 500 --num_queries 50
+"""
+
+import numpy as np
+from pymilvus import Collection, connections
+import argparse
+import asyncio
+import time
+import os
+import sys
+
+APP_FOLDER = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'app'))
+sys.path.insert(0, APP_FOLDER)
+
+from core.settings import KeyFrameIndexMilvusSetting
+from repository.milvus import KeyframeVectorRepository
+from schema.interface import MilvusSearchRequest
+
+
+def embedding_dim(collection: Collection) -> int:
+    field = next(f for f in collection.schema.fields if f.name == "embedding")
+    return int(field.params["dim"])
+
+
+async def run(repository: KeyframeVectorRepository, queries: np.ndarray, top_k: int, include_embedding: bool):
+    timings, payload_bytes = [], 0
+    for query in queries:
+        request = MilvusSearchRequest(embedding=query.tolist(), top_k=top_k, include_embedding=include_embedding)
+        start = time.perf_counter()
+        response = await repository.search_by_embedding(request)
+        timings.append((time.perf_counter() - start) * 1000)
+        payload_bytes += sum(
+            8 + 4 + (len(result.embedding) * 4 if result.embedding else 0)
+            for result in response.results
+        )
+    return float(np.median(timings)), float(np.percentile(timings, 95)), payload_bytes / len(queries)
+
+
+async def main(args):
+    setting = KeyFrameIndexMilvusSetting()
+    connections.connect(alias="default", host=setting.HOST, port=setting.PORT)
+    collection = Collection(setting.COLLECTION_NAME, using="default")
+    collection.load()
+
+    repository = KeyframeVectorRepository(
+        collection=collection,
+        search_params={"metric_type": setting.METRIC_TYPE, "params": setting.SEARCH_PARAMS}
+    )
+    rng = np.random.default_rng(0)
+    queries = rng.standard_normal((args.num_queries, embedding_dim(collection))).astype(np.float32)
+
+    # warm up both paths before timing
+    await run(repository, queries[:3], args.top_k, include_embedding=True)
+
+    report = {}
+    for include_embedding in (True, False):
+        report[include_embedding] = await run(repository, queries, args.top_k, include_embedding)
+        p50, p95, payload = report[include_embedding]
+        label = "ids + distances + vectors" if include_embedding else "ids + distances"
+        print(f"{label:>28}: p50 {p50:7.2f} ms | p95 {p95:7.2f} ms | ~{payload / 1024:8.1f} KiB/query")
+
+    saved_ms = report[True][0] - report[False][0]
+    saved_kib = (report[True][2] - report[False][2]) / 1024
+    print(f"Projection saves ~{saved_kib:.1f} KiB and {saved_ms:.2f} ms (p50) per query at top_k={args.top_k}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark Milvus search with and without vector output fields.")
+    parser.add_argument("--top_k", type=int, default=500)
+    parser.add_argument("--num_queries", type=int, default=50)
+    asyncio.run(main(parser.parse_args()))
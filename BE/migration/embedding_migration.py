@@ -4,6 +4,7 @@ from pymilvus import Collection, connections, FieldSchema, CollectionSchema, Dat
 from typing import Optional
 from tqdm import tqdm
 import argparse
+import json
 import os
 import sys
 
@@ -32,6 +33,23 @@ def load_embeddings(embedding_file_path: str) -> np.ndarray:
     return embeddings
 
 
+def load_scalar_fields(mapping_path: str, num_vectors: int) -> tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """Load (group_num, video_num, keyframe_num) per id from the id2index mapping ({"0": "group/video/keyframe"})"""
+    mapping = json.load(open(mapping_path, "r"))
+
+    scalars = np.full((3, num_vectors), -1, dtype=np.int64)
+    for key, value in mapping.items():
+        key = int(key)
+        if key < num_vectors:
+            scalars[:, key] = [int(part) for part in value.split('/')]
+
+    missing = int((scalars[0] < 0).sum())
+    if missing:
+        print(f"Warning: {missing} embeddings have no entry in {mapping_path}, stored with -1 scalars")
+
+    return scalars[0], scalars[1], scalars[2]
+
+
 class MilvusEmbeddingInjector:
     def __init__(
         self,
@@ -66,15 +84,35 @@ class MilvusEmbeddingInjector:
         connections.connect(alias=alias, **conn_params)
         print(f"Connected to Milvus at {host}:{port}")
 
-    def create_collection(self, embedding_dim: int, index_params: Optional[dict] = None):
-        fields = [
-            FieldSchema(name="id", dtype=DataType.INT64, is_primary=True, auto_id=False),
-            FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=embedding_dim)
-        ]
+    def create_collection(
+        self,
+        embedding_dim: int,
+        index_params: Optional[dict] = None,
+        with_scalar_fields: bool = False
+    ):
+        fields = [FieldSchema(name="id", dtype=DataType.INT64, is_primary=True, auto_id=False)]
+        if with_scalar_fields:
+            fields += [
+                FieldSchema(name="group_num", dtype=DataType.INT64, is_partition_key=True),
+                FieldSchema(name="video_num", dtype=DataType.INT64),
+                FieldSchema(name="keyframe_num", dtype=DataType.INT64),
+            ]
+        fields.append(FieldSchema(name="embedding", dtype=DataType.FLOAT_VECTOR, dim=embedding_dim))
+
         schema = CollectionSchema(fields, f"Collection for {self.collection_name} embeddings")
-        collection = Collection(self.collection_name, schema, using=self.alias)
+        if with_scalar_fields:
+            collection = Collection(
+                self.collection_name, schema, using=self.alias, num_partitions=self.setting.NUM_PARTITIONS
+            )
+        else:
+            collection = Collection(self.collection_name, schema, using=self.alias)
         print(f"Created collection '{self.collection_name}' with dimension {embedding_dim}")
 
+        if with_scalar_fields:
+            for field_name in ("group_num", "video_num", "keyframe_num"):
+                collection.create_index(field_name, {"index_type": "STL_SORT"})
+            print("Created scalar indexes for group_num, video_num, keyframe_num")
+
         if index_params is None:
             index_params = {
                 "metric_type": self.setting.METRIC_TYPE,
@@ -88,6 +126,7 @@ class MilvusEmbeddingInjector:
         self,
         embedding_file_path: str,
         batch_size: int = 10000,
+        mapping_path: Optional[str] = None,
     ):
         print(f"Loading embeddings from {embedding_file_path}")
         embeddings = load_embeddings(embedding_file_path)
@@ -95,18 +134,26 @@ class MilvusEmbeddingInjector:
         num_vectors, embedding_dim = embeddings.shape
         print(f"Loaded {num_vectors} embeddings with dimension {embedding_dim}")
 
+        scalars = None
+        if mapping_path:
+            scalars = load_scalar_fields(mapping_path, num_vectors)
+            print(f"Loaded group/video/keyframe fields from {mapping_path}")
+
         if utility.has_collection(self.collection_name, using=self.alias):
             print(f"Dropping existing collection '{self.collection_name}' before creation...")
             utility.drop_collection(self.collection_name, using=self.alias)
 
-        collection = self.create_collection(embedding_dim)
+        collection = self.create_collection(embedding_dim, with_scalar_fields=scalars is not None)
 
         print(f"Inserting {num_vectors} embeddings in batches of {batch_size}")
         for i in tqdm(range(0, num_vectors, batch_size), desc="Inserting batches"):
             end_idx = min(i + batch_size, num_vectors)
             batch_embeddings = embeddings[i:end_idx].tolist()
             batch_ids = list(range(i, end_idx))
-            entities = [batch_ids, batch_embeddings]
+            if scalars is not None:
+                entities = [batch_ids, *(field[i:end_idx].tolist() for field in scalars), batch_embeddings]
+            else:
+                entities = [batch_ids, batch_embeddings]
             collection.insert(entities)
 
         collection.flush()
@@ -129,7 +176,8 @@ class MilvusEmbeddingInjector:
 
 def inject_embeddings_simple(
     embedding_file_path: str,
-    setting: KeyFrameIndexMilvusSetting
+    setting: KeyFrameIndexMilvusSetting,
+    mapping_path: Optional[str] = None
 ):
     injector = MilvusEmbeddingInjector(
         setting=setting,
@@ -139,7 +187,8 @@ def inject_embeddings_simple(
     )
     injector.inject_embeddings(
         embedding_file_path=embedding_file_path,
-        batch_size=setting.BATCH_SIZE
+        batch_size=setting.BATCH_SIZE,
+        mapping_path=mapping_path
     )
     count = injector.get_collection_info()
     print(f"Successfully injected embeddings! Total entities: {count}")
@@ -150,10 +199,15 @@ if __name__ == "__main__":
     parser.add_argument(
         "--file_path", type=str, help="Path to embedding file (.npy or .pt/.pth)"
     )
+    parser.add_argument(
+        "--mapping_path", type=str, default=None,
+        help="Path to id2index mapping.json, stores group_num/video_num/keyframe_num as scalar fields"
+    )
     args = parser.parse_args()
 
     setting = KeyFrameIndexMilvusSetting()
     inject_embeddings_simple(
         embedding_file_path=args.file_path,
-        setting=setting
+        setting=setting,
+        mapping_path=args.mapping_path
     )
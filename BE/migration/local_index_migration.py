@@ -0,0 +1,69 @@
+import numpy as np
+from tqdm import tqdm
+import argparse
+import os
+import sys
+
+ROOT_FOLDER = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_FOLDER)
+
+from migration.embedding_migration import load_embeddings
+
+
+def build_usearch_index(embeddings: np.ndarray, output_path: str, batch_size: int = 10000):
+    from usearch.index import Index
+
+    num_vectors, embedding_dim = embeddings.shape
+    index = Index(ndim=embedding_dim, metric="cos", dtype="f16")
+
+    for i in tqdm(range(0, num_vectors, batch_size), desc="Adding batches"):
+        end_idx = min(i + batch_size, num_vectors)
+        index.add(np.arange(i, end_idx), embeddings[i:end_idx].astype(np.float32))
+
+    index.save(output_path)
+    print(f"Saved usearch index with {len(index)} vectors to {output_path}")
+
+
+def build_faiss_index(embeddings: np.ndarray, output_path: str, batch_size: int = 10000):
+    try:
+        import faiss
+    except ImportError as e:
+        raise ImportError("faiss is not installed, run `uv sync --extra faiss` to build a FAISS index") from e
+
+    num_vectors, embedding_dim = embeddings.shape
+    # Flat inner product over L2-normalized vectors == cosine similarity, same ranking as Milvus COSINE
+    index = faiss.IndexFlatIP(embedding_dim)
+
+    for i in tqdm(range(0, num_vectors, batch_size), desc="Adding batches"):
+        end_idx = min(i + batch_size, num_vectors)
+        batch = np.ascontiguousarray(embeddings[i:end_idx], dtype=np.float32)
+        faiss.normalize_L2(batch)
+        index.add(batch)
+
+    faiss.write_index(index, output_path)
+    print(f"Saved FAISS index with {index.ntotal} vectors to {output_path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build an on-disk usearch/FAISS index for the in-process vector backend.")
+    parser.add_argument(
+        "--file_path", type=str, required=True, help="Path to embedding file (.npy or .pt/.pth)"
+    )
+    parser.add_argument(
+        "--backend", type=str, choices=["usearch", "faiss"], default="usearch", help="Index format to build"
+    )
+    parser.add_argument(
+        "--output", type=str, required=True, help="Where to write the index (USEARCH_INDEX_PATH / FAISS_INDEX_PATH)"
+    )
+    parser.add_argument(
+        "--batch_size", type=int, default=10000
+    )
+    args = parser.parse_args()
+
+    embeddings = load_embeddings(args.file_path)
+    print(f"Loaded {embeddings.shape[0]} embeddings with dimension {embeddings.shape[1]}")
+
+    if args.backend == "usearch":
+        build_usearch_index(embeddings, args.output, args.batch_size)
+    else:
+        build_faiss_index(embeddings, args.output, args.batch_size)
@@ -0,0 +1,117 @@
+import numpy as np
+import torch
+from motor.motor_asyncio import AsyncIOMotorClient
+import argparse
+import asyncio
+import os
+import sys
+
+ROOT_FOLDER = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_FOLDER)
+
+from app.core.settings import AppSettings, KeyFrameIndexMilvusSetting, MongoDBSettings
+from app.models.keyframe import Keyframe
+from app.service.ocr_text_encoder import OcrTextEncoder
+from migration.embedding_migration import MilvusEmbeddingInjector
+from migration.local_index_migration import build_usearch_index, build_faiss_index
+
+
+EMBEDDING_FILE = "ocr_embeddings.npy"
+LINE_KEYS_FILE = "ocr_line_keys.npy"
+
+
+async def load_ocr_lines(min_length: int) -> tuple[np.ndarray, list[str]]:
+    """(keys, lines) of every OCR line in Mongo, one row per distinct line of a keyframe, in key order"""
+    setting = MongoDBSettings()
+    client = AsyncIOMotorClient(
+        host=setting.MONGO_HOST,
+        port=setting.MONGO_PORT,
+        username=setting.MONGO_USER,
+        password=setting.MONGO_PASSWORD,
+    )
+    cursor = client[setting.MONGO_DB][Keyframe.Settings.name].find(
+        {"ocr_results.0": {"$exists": True}},
+        {"_id": 0, "key": 1, "ocr_results": 1},
+        batch_size=1000
+    ).sort("key", 1)
+
+    keys, lines = [], []
+    async for doc in cursor:
+        for line in dict.fromkeys(" ".join(line.split()) for line in doc["ocr_results"]):
+            if len(line) >= min_length:
+                keys.append(doc["key"])
+                lines.append(line)
+    client.close()
+    return np.asarray(keys, dtype=np.int64), lines
+
+
+def encode_lines(lines: list[str], model_name: str, batch_size: int) -> np.ndarray:
+    """
+    L2-normalized embeddings of lines from the multilingual OCR text encoder, encoded once per distinct text
+    in batches of batch_size on CPU. Consecutive keyframes repeat the same captions and tickers, so most
+    rows share an embedding.
+    """
+    texts, inverse = np.unique(np.asarray(lines, dtype=object), return_inverse=True)
+    print(f"Encoding {len(texts)} distinct texts out of {len(lines)} lines with {model_name}")
+
+    encoder = OcrTextEncoder(model_name, device="cpu")
+    embeddings = encoder.encode(texts.tolist(), batch_size=batch_size, show_progress_bar=True)
+    return embeddings[inverse]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(
+        description="Embed every OCR line into a second vector collection, keyed back to its keyframe."
+    )
+    parser.add_argument(
+        "--output_dir", type=str, required=True,
+        help=f"Where to write {EMBEDDING_FILE} and {LINE_KEYS_FILE} (OCR_LINE_KEYS_PATH)"
+    )
+    parser.add_argument(
+        "--backend", type=str, choices=["milvus", "usearch", "faiss", "numpy"], default="milvus",
+        help="Vector collection to fill (OCR_VECTOR_BACKEND)"
+    )
+    parser.add_argument(
+        "--batch_size", type=int, default=256, help="Texts per forward pass of the text encoder"
+    )
+    parser.add_argument(
+        "--num_threads", type=int, default=None, help="torch CPU threads, defaults to every core"
+    )
+    parser.add_argument(
+        "--model", type=str, default=None,
+        help="sentence-transformers model name, defaults to OCR_TEXT_MODEL (the API must use the same one)"
+    )
+    parser.add_argument(
+        "--min_length", type=int, default=3, help="Skip OCR lines shorter than this many characters"
+    )
+    args = parser.parse_args()
+
+    if args.num_threads:
+        torch.set_num_threads(args.num_threads)
+    os.makedirs(args.output_dir, exist_ok=True)
+
+    keys, lines = asyncio.run(load_ocr_lines(args.min_length))
+    print(f"Loaded {len(lines)} OCR lines of {len(np.unique(keys))} keyframes")
+
+    embeddings = encode_lines(lines, args.model or AppSettings().OCR_TEXT_MODEL, args.batch_size)
+    embedding_path = os.path.join(args.output_dir, EMBEDDING_FILE)
+    line_keys_path = os.path.join(args.output_dir, LINE_KEYS_FILE)
+    # Row i of the collection is line i, line_keys[i] is the keyframe key it was read from
+    np.save(embedding_path, embeddings)
+    np.save(line_keys_path, keys)
+    print(f"Saved {embeddings.shape} embeddings to {embedding_path} and their keys to {line_keys_path}")
+
+    if args.backend == "milvus":
+        setting = KeyFrameIndexMilvusSetting()
+        injector = MilvusEmbeddingInjector(
+            setting=setting,
+            collection_name=setting.OCR_COLLECTION_NAME,
+            host=setting.HOST,
+            port=setting.PORT
+        )
+        injector.inject_embeddings(embedding_file_path=embedding_path, batch_size=setting.BATCH_SIZE)
+        injector.get_collection_info()
+    elif args.backend == "usearch":
+        build_usearch_index(embeddings, os.path.join(args.output_dir, "ocr.usearch"))
+    elif args.backend == "faiss":
+        build_faiss_index(embeddings, os.path.join(args.output_dir, "ocr.faiss"))
@@ -0,0 +1,110 @@
+import numpy as np
+import torch
+import open_clip
+import argparse
+import time
+import os
+import sys
+
+ROOT_FOLDER = os.path.abspath(os.path.join(os.path.dirname(__file__), '..'))
+sys.path.insert(0, ROOT_FOLDER)
+
+from app.core.settings import AppSettings
+from app.service.onnx_text_encoder import OnnxTextEncoder, export_text_encoder, quantize_text_encoder
+
+
+PARITY_QUERIES = [
+    "person walking in the park",
+    "sunset over mountains",
+    "a red car driving on the highway at night",
+    "news anchor sitting at a desk",
+    "firefighters spraying water on a burning house",
+    "a crowd of people watching fireworks",
+    "close up of a doctor holding a heart for transplant",
+    "Hôm nay trời mưa to ở Hà Nội",
+    "trái tim được vận chuyển cấp tốc về Huế",
+    "two dogs playing with a ball on the beach",
+]
+
+
+def cosine_rows(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    a = a / np.linalg.norm(a, axis=1, keepdims=True)
+    b = b / np.linalg.norm(b, axis=1, keepdims=True)
+    return (a * b).sum(axis=1)
+
+
+def median_latency_ms(fn, repeats: int) -> float:
+    fn()  # warm up
+    timings = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        timings.append((time.perf_counter() - start) * 1000)
+    return float(np.median(timings))
+
+
+def check_parity_and_latency(model, tokenizer, encoder: OnnxTextEncoder, min_cosine: float, repeats: int) -> bool:
+    tokens = tokenizer(PARITY_QUERIES)
+
+    with torch.no_grad():
+        torch_embeddings = model.encode_text(tokens).numpy().astype(np.float32)
+    onnx_embeddings = encoder.encode(tokens.numpy())
+
+    cosines = cosine_rows(torch_embeddings, onnx_embeddings)
+    print(f"Parity ({encoder.onnx_path}): min cosine {cosines.min():.5f}, mean cosine {cosines.mean():.5f}")
+
+    for batch_size in (1, len(PARITY_QUERIES)):
+        batch_tokens = tokens[:batch_size]
+
+        def run_torch():
+            with torch.no_grad():
+                model.encode_text(batch_tokens)
+
+        torch_ms = median_latency_ms(run_torch, repeats)
+        onnx_ms = median_latency_ms(lambda: encoder.encode(batch_tokens.numpy()), repeats)
+        print(
+            f"Latency batch={batch_size}: torch {torch_ms:.2f} ms, onnx {onnx_ms:.2f} ms "
+            f"({torch_ms / onnx_ms:.2f}x)"
+        )
+
+    passed = bool(cosines.min() >= min_cosine)
+    print("Parity check PASSED" if passed else f"Parity check FAILED: min cosine below {min_cosine}")
+    return passed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Export the CLIP text tower to ONNX and check it against torch.")
+    parser.add_argument(
+        "--output", type=str, required=True, help="Path of the exported fp32 .onnx file"
+    )
+    parser.add_argument(
+        "--quantize", action="store_true", help="Also write a dynamic int8 quantized model next to --output"
+    )
+    parser.add_argument(
+        "--min_cosine", type=float, default=0.99, help="Minimum per-query cosine similarity against torch"
+    )
+    parser.add_argument(
+        "--repeats", type=int, default=20, help="Timed runs per latency measurement"
+    )
+    args = parser.parse_args()
+
+    model_name = AppSettings().MODEL_NAME
+    model, _, _ = open_clip.create_model_and_transforms(model_name, pretrained="openai")
+    model = model.cpu().eval()
+    tokenizer = open_clip.get_tokenizer(model_name)
+
+    export_text_encoder(model, tokenizer, args.output)
+    print(f"Exported {model_name} text tower to {args.output}")
+    onnx_paths = [args.output]
+
+    if args.quantize:
+        quantized_path = os.path.splitext(args.output)[0] + ".int8.onnx"
+        quantize_text_encoder(args.output, quantized_path)
+        print(f"Quantized model written to {quantized_path}")
+        onnx_paths.append(quantized_path)
+
+    results = [
+        check_parity_and_latency(model, tokenizer, OnnxTextEncoder(path), args.min_cosine, args.repeats)
+        for path in onnx_paths
+    ]
+    sys.exit(0 if all(results) else 1)
@@ -0,0 +1,5 @@
+import os
+import sys
+
+# The app modules import each other as top-level packages (from index import ...), as they run from app/
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..", "app")))
@@ -0,0 +1,96 @@
+import asyncio
+
+import numpy as np
+import pytest
+
+from index import KeyframeTable, ObjectCountMatrix
+from repository.numpy_index import NumpyVectorRepository
+from schema.response import HybridPlan
+from service.hybrid_planner import EXACT_SCAN_MAX_CANDIDATES, plan_hybrid
+from service.search_service import KeyframeQueryService
+
+
+NUM_ENTITIES = 1_000_000
+
+
+def test_no_filter_is_a_plain_ann_search():
+    assert plan_hybrid({}, NUM_ENTITIES, 10, has_embedding=True).plan == HybridPlan.ANN
+    assert plan_hybrid({}, NUM_ENTITIES, 10, has_embedding=False).plan == HybridPlan.METADATA_ONLY
+
+
+def test_few_candidates_are_scanned_exactly():
+    report = plan_hybrid({"ocr": EXACT_SCAN_MAX_CANDIDATES}, NUM_ENTITIES, 10, has_embedding=True)
+    assert report.plan == HybridPlan.EXACT_SCAN
+    assert report.estimated_candidates == EXACT_SCAN_MAX_CANDIDATES
+
+
+def test_selective_filter_is_pushed_into_the_ann_search():
+    # 1% of the collection: too many to scan, too few for oversampling
+    report = plan_hybrid({"ocr": 10_000}, NUM_ENTITIES, 10, has_embedding=True)
+    assert report.plan == HybridPlan.FILTERED_ANN
+    assert report.ann_limit is None
+
+
+def test_filter_without_statistics_keeps_filtered_ann():
+    report = plan_hybrid({"ocr": None, "objects": 500_000}, NUM_ENTITIES, 10, has_embedding=True)
+    assert report.plan == HybridPlan.FILTERED_ANN
+    assert report.estimated_candidates is None
+
+
+def test_unselective_filters_post_filter_an_oversampled_search():
+    # Independent filters: half the collection times a fifth of it
+    report = plan_hybrid({"ocr": 500_000, "objects": 200_000}, NUM_ENTITIES, 10, has_embedding=True)
+    assert report.plan == HybridPlan.POST_FILTER
+    assert report.estimated_candidates == 100_000
+    assert report.ann_limit == 10 * 2 * 10
+
+
+def make_service(num_entities: int, matching: np.ndarray) -> tuple[KeyframeQueryService, np.ndarray]:
+    rng = np.random.default_rng(0)
+    embeddings = rng.standard_normal((num_entities, 16)).astype(np.float32)
+    object_index = ObjectCountMatrix.from_rows(((int(key), {"person": 1}) for key in matching), num_entities)
+    service = KeyframeQueryService(
+        keyframe_vector_repo=NumpyVectorRepository(embeddings),
+        keyframe_mongo_repo=None,
+        keyframe_table=KeyframeTable.from_rows((key, 1, key // 100, key % 100) for key in range(num_entities)),
+        object_index=object_index
+    )
+    return service, embeddings
+
+
+def expected_keys(embeddings: np.ndarray, query: np.ndarray, matching: np.ndarray, top_k: int) -> list[int]:
+    similarities = embeddings[matching] @ query / np.linalg.norm(embeddings[matching], axis=1)
+    return matching[np.argsort(-similarities)[:top_k]].tolist()
+
+
+def test_post_filter_returns_the_filtered_top_k():
+    num_entities, top_k = 5000, 10
+    matching = np.arange(0, num_entities, 2)
+    service, embeddings = make_service(num_entities, matching)
+    query = embeddings[7]
+
+    results, report = asyncio.run(service.search_by_hybrid(
+        text_embedding=query.tolist(), object_filters={"person": 1}, top_k=top_k, score_threshold=None
+    ))
+
+    assert report.plan == HybridPlan.POST_FILTER
+    assert report.fallback is None
+    assert [result.key for result in results] == expected_keys(embeddings, query, matching, top_k)
+
+
+def test_post_filter_falls_back_to_filtered_ann(monkeypatch):
+    num_entities, top_k = 5000, 20
+    # 25 matches, but the estimate claims half the collection: oversampling runs out before top_k pass
+    matching = np.arange(0, num_entities, 200)
+    service, embeddings = make_service(num_entities, matching)
+    monkeypatch.setattr(service.object_index, "estimate", lambda object_filters: num_entities // 2)
+    query = embeddings[7]
+
+    results, report = asyncio.run(service.search_by_hybrid(
+        text_embedding=query.tolist(), object_filters={"person": 1}, top_k=top_k, score_threshold=None
+    ))
+
+    assert report.plan == HybridPlan.POST_FILTER
+    assert report.fallback == HybridPlan.FILTERED_ANN
+    assert report.post_filtered < top_k
+    assert [result.key for result in results] == expected_keys(embeddings, query, matching, top_k)
@@ -0,0 +1,104 @@
+import numpy as np
+import pytest
+
+from index import IdBitmap
+from index.id_bitmap import CHUNK_BITS
+
+
+UNIVERSE = 3 << CHUNK_BITS
+
+
+def random_ids(rng: np.random.Generator, kind: str) -> np.ndarray:
+    """Ids that produce each container kind, spread over several chunks"""
+    if kind == "sparse":
+        return rng.choice(UNIVERSE, size=200, replace=False)
+    if kind == "dense":
+        return np.flatnonzero(rng.random(UNIVERSE) < 0.6)
+    starts = rng.choice(UNIVERSE - 5000, size=20, replace=False)
+    return np.unique(np.concatenate([np.arange(start, start + rng.integers(1, 5000)) for start in starts]))
+
+
+KINDS = ["sparse", "dense", "runs"]
+
+
+def as_set(bitmap: IdBitmap) -> set[int]:
+    return set(bitmap.to_ids().tolist())
+
+
+@pytest.mark.parametrize("left_kind", KINDS)
+@pytest.mark.parametrize("right_kind", KINDS)
+def test_set_operations_match_python_sets(left_kind, right_kind):
+    rng = np.random.default_rng(len(left_kind) * 31 + len(right_kind))
+    left_ids, right_ids = random_ids(rng, left_kind), random_ids(rng, right_kind)
+    left, right = IdBitmap.from_ids(left_ids), IdBitmap.from_ids(right_ids)
+    left_set, right_set = set(left_ids.tolist()), set(right_ids.tolist())
+
+    assert as_set(left) == left_set
+    assert as_set(left & right) == left_set & right_set
+    assert as_set(left | right) == left_set | right_set
+    assert as_set(left - right) == left_set - right_set
+    assert as_set(left.complement(UNIVERSE)) == set(range(UNIVERSE)) - left_set
+    assert len(left & right) == len(left_set & right_set)
+
+
+@pytest.mark.parametrize("kind", KINDS)
+def test_conversions_round_trip(kind):
+    rng = np.random.default_rng(7)
+    ids = np.unique(random_ids(rng, kind))
+    bitmap = IdBitmap.from_ids(ids)
+
+    mask = np.zeros(UNIVERSE, dtype=bool)
+    mask[ids] = True
+    assert IdBitmap.from_mask(mask) == bitmap
+    assert np.array_equal(bitmap.to_mask(UNIVERSE), mask)
+    assert IdBitmap.from_intervals(bitmap.to_intervals()) == bitmap
+
+    probes = rng.integers(-10, UNIVERSE + 10, size=1000)
+    assert np.array_equal(bitmap.contains_many(probes), np.isin(probes, ids))
+
+
+def test_from_runs_matches_from_intervals():
+    rng = np.random.default_rng(3)
+    for num_runs in (0, 1, 50, 3000):
+        bounds = np.sort(rng.choice(UNIVERSE, size=2 * num_runs, replace=False))
+        starts, ends = bounds[0::2], bounds[1::2]
+        # Touching and empty runs, as line_filter produces them
+        starts[1::3] = ends[0:-1:3][:len(starts[1::3])]
+        ends[2::5] = starts[2::5]
+        bitmap = IdBitmap.from_runs(starts, ends)
+        assert bitmap == IdBitmap.from_intervals(zip(starts.tolist(), ends.tolist()))
+        assert as_set(bitmap) == {id_ for start, end in zip(starts, ends) for id_ in range(start, end)}
+
+
+def test_intervals_merge_across_chunks():
+    chunk = 1 << CHUNK_BITS
+    bitmap = IdBitmap.from_intervals([(chunk - 3, chunk + 3), (5, 7), (6, 9)])
+    assert bitmap.to_intervals() == [(5, 9), (chunk - 3, chunk + 3)]
+
+
+def evaluate_milvus_expr(expr: str, universe: int) -> set[int]:
+    """Ids of range(universe) selected by expr, the subset of Milvus boolean syntax to_milvus_expr writes"""
+    # Same semantics as Python, with the `in` lists as sets to keep the scan linear
+    code = compile(expr.replace("[", "{").replace("]", "}"), "<milvus expr>", "eval")
+    return {id_ for id_ in range(universe) if eval(code, {}, {"id": id_})}
+
+
+@pytest.mark.parametrize("ids", [
+    [],
+    [3],
+    [1, 5, 9, 400],                            # in list
+    list(range(10, 300)) + list(range(500, 900)),  # ranges
+    [id_ for id_ in range(20, 1000) if id_ not in (37, 512)],  # span minus gaps
+    list(range(100, 200)),                     # span without gaps
+])
+def test_to_milvus_expr_selects_exactly_the_ids(ids):
+    expr = IdBitmap.from_ids(ids).to_milvus_expr()
+    assert evaluate_milvus_expr(expr, 1100) == set(ids)
+
+
+def test_to_milvus_expr_random_bitmaps():
+    rng = np.random.default_rng(11)
+    for _ in range(20):
+        mask = rng.random(2000) < rng.choice([0.01, 0.5, 0.99])
+        bitmap = IdBitmap.from_mask(mask)
+        assert evaluate_milvus_expr(bitmap.to_milvus_expr(), 2100) == set(np.flatnonzero(mask).tolist())
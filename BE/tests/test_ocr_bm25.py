@@ -0,0 +1,77 @@
+import math
+from collections import Counter
+
+import numpy as np
+import pytest
+
+from index import OcrBm25Index
+from index.ocr_bm25 import B, K1, tokenize
+
+
+DOCUMENTS = [
+    (0, ["Hôm nay trời đẹp", "tin tức thời sự"]),
+    (1, ["thời tiết hôm nay"]),
+    (2, ["giá vàng hôm nay tăng", "giá xăng"]),
+    (5, ["HÔM NAY"]),
+    (7, ["bóng đá"]),
+]
+
+
+def reference_scores(query: str, keys: list[int]) -> list[float]:
+    """Textbook BM25 over the tokenized documents, divided by the best score the query could reach"""
+    counts = {key: Counter(tokenize("\n".join(lines))) for key, lines in DOCUMENTS}
+    avg_len = sum(sum(tf.values()) for tf in counts.values()) / len(counts)
+
+    scores, upper_bound = [0.0] * len(keys), 0.0
+    for term in set(tokenize(query)):
+        df = sum(term in tf for tf in counts.values())
+        if df == 0:
+            continue
+        idf = math.log(1 + (len(counts) - df + 0.5) / (df + 0.5))
+        upper_bound += idf * (K1 + 1)
+        for i, key in enumerate(keys):
+            tf = counts.get(key, Counter())[term]
+            if tf:
+                doc_len = sum(counts[key].values())
+                scores[i] += idf * tf * (K1 + 1) / (tf + K1 * (1 - B + B * doc_len / avg_len))
+    return [score / upper_bound if upper_bound else score for score in scores]
+
+
+@pytest.fixture
+def index() -> OcrBm25Index:
+    index = OcrBm25Index()
+    index.add_many(DOCUMENTS)
+    return index
+
+
+@pytest.mark.parametrize("query", ["hôm nay", "hom nay troi", "giá vàng", "thời", "bóng rổ", "không có"])
+def test_score_matches_reference_bm25(index, query):
+    keys = [0, 1, 2, 3, 5, 7, 42]
+    assert index.score(query, keys) == pytest.approx(reference_scores(query, keys), abs=1e-6)
+
+
+def test_whole_word_outranks_loose_syllables(index):
+    index.add_many([(10, ["nay hôm"])])
+    scores = index.score("hôm nay", [5, 10])
+    assert scores[0] > scores[1] > 0
+
+
+def test_incremental_adds_score_like_a_single_build():
+    incremental = OcrBm25Index()
+    incremental.add_many(DOCUMENTS[:2])
+    incremental.add_many(DOCUMENTS[2:])
+    keys = [key for key, _ in DOCUMENTS]
+    assert incremental.score("hôm nay", keys) == pytest.approx(reference_scores("hôm nay", keys), abs=1e-6)
+
+
+def test_score_groups_uses_the_closest_term(index):
+    # "nay" is typed, "hom" stands in for a typo of it: the key containing "nay" is scored on "nay"
+    scores, distances = index.score_groups([{"nay": 0, "hom": 1}], [1, 7])
+    assert distances.tolist() == [0, 0]
+    assert scores[0] > 0 and scores[1] == 0
+    assert np.all(scores < 1)
+
+
+def test_matching_keys_needs_every_group(index):
+    assert index.matching_keys([["hom"], ["vang", "xang"]]).tolist() == [2]
+    assert index.matching_keys([["hom"], ["khong"]]).tolist() == []
@@ -0,0 +1,67 @@
+import numpy as np
+
+from index import SymSpellIndex
+from index.ocr_symspell import allowed_distance, edit_distance
+
+
+def reference_distance(left: str, right: str) -> int:
+    """Unbounded optimal string alignment distance"""
+    table = [[i + j if i * j == 0 else 0 for j in range(len(right) + 1)] for i in range(len(left) + 1)]
+    for i in range(1, len(left) + 1):
+        for j in range(1, len(right) + 1):
+            table[i][j] = min(
+                table[i - 1][j] + 1,
+                table[i][j - 1] + 1,
+                table[i - 1][j - 1] + (left[i - 1] != right[j - 1])
+            )
+            if i > 1 and j > 1 and left[i - 1] == right[j - 2] and left[i - 2] == right[j - 1]:
+                table[i][j] = min(table[i][j], table[i - 2][j - 2] + 1)
+    return table[-1][-1]
+
+
+def random_word(rng: np.random.Generator, alphabet: str = "abcdeghn") -> str:
+    return "".join(rng.choice(list(alphabet), size=rng.integers(2, 10)))
+
+
+def test_edit_distance_is_exact_within_the_bound():
+    rng = np.random.default_rng(0)
+    for _ in range(500):
+        left, right = random_word(rng), random_word(rng)
+        expected = reference_distance(left, right)
+        distance = edit_distance(left, right, 2)
+        assert distance == expected if expected <= 2 else distance > 2
+    assert edit_distance("thoi", "htoi", 2) == 1
+
+
+def test_lookup_matches_a_vocabulary_scan():
+    rng = np.random.default_rng(1)
+    vocabulary = {random_word(rng) for _ in range(500)}
+    index = SymSpellIndex()
+    for term in vocabulary:
+        index.add(term)
+
+    for _ in range(100):
+        query = random_word(rng)
+        for max_distance in (1, 2):
+            expected = {term for term in vocabulary if reference_distance(query, term) <= max_distance}
+            assert {term for term, _ in index.lookup(query, max_distance=max_distance)} == expected
+
+
+def test_lookup_ranks_closest_then_most_frequent():
+    index = SymSpellIndex()
+    index.add_many([
+        (0, ["thời sự"]), (1, ["thời tiết"]), (2, ["thoai"]), (3, ["thoai"]), (4, ["thoi"])
+    ])
+    assert index.lookup("thoi", max_distance=1) == [("thoi", 0), ("thoai", 1)]
+    assert index.lookup("thoi", max_distance=1, limit=1) == [("thoi", 0)]
+
+
+def test_short_syllables_are_not_expanded():
+    assert allowed_distance("nay") == 0
+    assert allowed_distance("truong") == 1
+    assert allowed_distance("nghieng") == 2
+
+    index = SymSpellIndex()
+    index.add_many([(0, ["hôm nay năm"])])
+    assert index.expand("nam hom") == [{"nam": 0}, {"hom": 0}]
+    assert index.expand("nqm") == [{}]